@@ -12,7 +12,7 @@ from __future__ import annotations
 
 import os
 import sys
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Dict
 
 try:
@@ -31,6 +31,7 @@ except Exception:
 
 try:
     from influxdb_client import InfluxDBClient
+    from influxdb_client.client.query_api import QueryApi
 except Exception as e:
     print("ERROR: Missing dependency 'influxdb-client'. Install with:", file=sys.stderr)
     print("       pip install influxdb-client", file=sys.stderr)
@@ -47,6 +48,7 @@ INFLUX_CONFIG = {
 }
 
 CR_TZ = ZoneInfo("America/Costa_Rica")
+UTC = timezone.utc
 
 
 ###################################
@@ -62,7 +64,7 @@ def local_to_utc_iso(date_str: str, time_str: str) -> str:
     dt_local = datetime.strptime(f"{date_str} {time_str}", "%Y-%m-%d %H:%M").replace(
         tzinfo=CR_TZ
     )
-    return dt_local.astimezone(ZoneInfo("UTC")).strftime("%Y-%m-%dT%H:%M:%SZ")
+    return dt_local.astimezone(UTC).strftime("%Y-%m-%dT%H:%M:%SZ")
 
 
 ###################################
@@ -84,16 +86,17 @@ def build_predicate(measurement: str, tags: Dict[str, str]) -> str:
 ###################################
 # flux_filter_expr
 # Argumentos:
-#   - measurement (str): Nombre de la medición en InfluxDB
 #   - tags (Dict[str, str]): Diccionario de tags para filtrar
 # Return: str - Expresión de filtro Flux para consultas de previsualización
-# Descripcion: Construye expresión de filtro Flux para consultas de preview (soporta measurement y tags)
+# Descripcion: Construye expresión de filtro Flux para consultas de preview (soporta measurement y tags).
+#              Los valores no se interpolan: se referencian como params.measurement y
+#              params.tag_N, que se envían aparte como parámetros de la consulta.
 ###################################
-def flux_filter_expr(measurement: str, tags: Dict[str, str]) -> str:
-    """Construye expresión de filtro Flux para queries de previsualización"""
-    clauses = [f'r._measurement == "{measurement}"']
-    for k, v in tags.items():
-        clauses.append(f'r.{k} == "{v}"')
+def flux_filter_expr(tags: Dict[str, str]) -> str:
+    """Construye expresión de filtro Flux parametrizada para queries de previsualización"""
+    clauses = ["r._measurement == params.measurement"]
+    for i, k in enumerate(tags):
+        clauses.append(f"r.{k} == params.tag_{i}")
     inner = " and ".join(clauses)
     return f"fn: (r) => {inner}"
 
@@ -101,7 +104,7 @@ def flux_filter_expr(measurement: str, tags: Dict[str, str]) -> str:
 ###################################
 # preview_count
 # Argumentos:
-#   - client (InfluxDBClient): Cliente de InfluxDB conectado
+#   - query_api (QueryApi): API de consultas obtenida una sola vez del cliente
 #   - bucket (str): Nombre del bucket en InfluxDB
 #   - org (str): Organización en InfluxDB
 #   - start_utc (str): Timestamp UTC de inicio en formato ISO8601
@@ -112,7 +115,7 @@ def flux_filter_expr(measurement: str, tags: Dict[str, str]) -> str:
 # Descripcion: Cuenta cuántos puntos coinciden con el rango, medición y tags especificados
 ###################################
 def preview_count(
-    client: InfluxDBClient,
+    query_api: QueryApi,
     bucket: str,
     org: str,
     start_utc: str,
@@ -121,28 +124,48 @@ def preview_count(
     tags: Dict[str, str],
 ) -> int:
     """Cuenta puntos que coinciden con rango + measurement + tags en InfluxDB"""
-    query_api = client.query_api()
-    flt = flux_filter_expr(measurement, tags)
+    flt = flux_filter_expr(tags)
     flux = f"""
-from(bucket: "{bucket}")
-  |> range(start: {start_utc}, stop: {stop_utc})
+from(bucket: params.bucket)
+  |> range(start: time(v: params.start), stop: time(v: params.stop))
   |> filter({flt})
-  |> group()
+  |> group(columns: [])
   |> count(column: "_value")
-  |> sum(column: "_value")
 """
-    tables = query_api.query(flux, org=org)
+    params = {
+        "bucket": bucket,
+        "start": start_utc,
+        "stop": stop_utc,
+        "measurement": measurement,
+    }
+    for i, v in enumerate(tags.values()):
+        params[f"tag_{i}"] = v
+    # query_stream itera los registros sin construir la lista de FluxTable en memoria
+    records = query_api.query_stream(flux, org=org, params=params)
     total = 0
-    for table in tables:
-        for record in table.records:
-            if record.get_value() is not None:
-                try:
-                    total += int(record.get_value())
-                except Exception:
-                    pass
+    for record in records:
+        if record.get_value() is not None:
+            try:
+                total += int(record.get_value())
+            except Exception:
+                pass
     return total
 
 
+###################################
+# connect_influx
+# Argumentos: Ninguno
+# Return: InfluxDBClient - Cliente configurado con INFLUX_CONFIG
+# Descripcion: Crea el cliente de InfluxDB. Se llama solo cuando se va a consultar o eliminar,
+#              para no abrir conexiones si el usuario cancela la operación.
+###################################
+def connect_influx() -> InfluxDBClient:
+    """Crea cliente InfluxDB con la configuración del script"""
+    return InfluxDBClient(
+        url=INFLUX_CONFIG["url"], token=INFLUX_CONFIG["token"], org=INFLUX_CONFIG["org"]
+    )
+
+
 ###################################
 # main
 # Argumentos: Ninguno
@@ -205,36 +228,35 @@ def main() -> None:
     print("============================")
     print()
 
-    with InfluxDBClient(
-        url=INFLUX_CONFIG["url"], token=INFLUX_CONFIG["token"], org=INFLUX_CONFIG["org"]
-    ) as client:
-        # Preview count
-        try:
-            total = preview_count(
-                client,
-                INFLUX_CONFIG["bucket"],
-                INFLUX_CONFIG["org"],
-                start_utc,
-                stop_utc,
-                INFLUX_CONFIG["measurement"],
-                tags,
-            )
-            print(f"Puntos encontrados que coinciden: {total}")
-        except Exception as e:
-            print(f"WARNING: Preview count failed: {e}", file=sys.stderr)
-            total = -1
+    # Preview opcional: si se omite, no se conecta a InfluxDB hasta confirmar DELETE
+    want_preview = input("¿Mostrar conteo de puntos antes de eliminar? (si/no) [si]: ")
+    if want_preview.strip().lower() in ["", "si", "sí", "s", "yes", "y"]:
+        with connect_influx() as client:
+            try:
+                total = preview_count(
+                    client.query_api(),
+                    INFLUX_CONFIG["bucket"],
+                    INFLUX_CONFIG["org"],
+                    start_utc,
+                    stop_utc,
+                    INFLUX_CONFIG["measurement"],
+                    tags,
+                )
+                print(f"Puntos encontrados que coinciden: {total}")
+            except Exception as e:
+                print(f"WARNING: Preview count failed: {e}", file=sys.stderr)
 
-        print()
-        confirm = input(
-            "¿Confirmar eliminación de estos datos? Escriba 'DELETE' para confirmar: "
-        ).strip()
-        if confirm != "DELETE":
-            print("Operación cancelada por el usuario.")
-            return
+    print()
+    confirm = input(
+        "¿Confirmar eliminación de estos datos? Escriba 'DELETE' para confirmar: "
+    ).strip()
+    if confirm != "DELETE":
+        print("Operación cancelada por el usuario.")
+        return
 
+    with connect_influx() as client:
         try:
-            delete_api = client.delete_api()
-            delete_api.delete(
+            client.delete_api().delete(
                 start=start_utc,
                 stop=stop_utc,  # stop is exclusive
                 predicate=predicate,
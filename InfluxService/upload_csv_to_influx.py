@@ -7,8 +7,10 @@ CSV files format: data_YYYYMMDD_HHMMSS.csv
 Located in: archivos_csv/
 
 Usage:
-    python upload_csv_to_influx.py
-    (Will prompt for CSV file selection and time range interactively)
+    python upload_csv_to_influx.py [--check]
+    (Will prompt for CSV file selection and time range interactively;
+     several files can be selected as "1,3,5" or "todos")
+    --check: run an InfluxDB health check before uploading
 """
 
 from __future__ import annotations
@@ -16,9 +18,12 @@ from __future__ import annotations
 import csv
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, time
+from functools import lru_cache
+from math import isfinite
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import List, Optional, Tuple
 
 try:
     from zoneinfo import ZoneInfo
@@ -33,8 +38,8 @@ except Exception:
         raise
 
 try:
-    from influxdb_client import InfluxDBClient, Point, WritePrecision
-    from influxdb_client.client.write_api import SYNCHRONOUS
+    from influxdb_client import InfluxDBClient, WritePrecision
+    from influxdb_client.client.write_api import WriteOptions
 except Exception as e:
     print("ERROR: Missing dependency 'influxdb-client'. Install with:", file=sys.stderr)
     print("       pip install influxdb-client", file=sys.stderr)
@@ -47,12 +52,49 @@ INFLUX_CONFIG = {
     "token": os.getenv("INFLUX_TOKEN", "your-influxdb-token-here"),
     "org": os.getenv("INFLUX_ORG", "your-org"),
     "bucket": os.getenv("INFLUX_BUCKET", "your-bucket"),
+    "enable_gzip": True,  # Lotes de miles de líneas con nombres de campo repetidos
 }
 
 # Timezone Costa Rica
 CR_TZ = ZoneInfo("America/Costa_Rica")
 CSV_FOLDER = "archivos_csv"
 
+# Puntos acumulados por cada llamada a write_api.write (una petición HTTP por lote)
+WRITE_BATCH_SIZE = 5000
+
+# Archivos CSV subidos en paralelo (escrituras HTTP limitadas por I/O)
+UPLOAD_WORKERS = 4
+
+# Measurement y tags fijos, pre-serializados en formato line protocol
+MEASUREMENT = "solar_panel_measurement"
+TAG_STR = ",system=raspberry_pi,location=solar_farm"
+
+# Mapeo de columnas CSV a fields InfluxDB
+FIELD_MAPPINGS: Tuple[Tuple[str, str], ...] = (
+    ("V0[V]", "panel1_voltage"),
+    ("V1[V]", "panel2_voltage"),
+    ("I0[A]", "panel1_current"),
+    ("I1[A]", "panel2_current"),
+    ("P0[W]", "panel1_power"),
+    ("P1[W]", "panel2_power"),
+    ("E0[Wh]", "panel1_energy"),
+    ("E1[Wh]", "panel2_energy"),
+    ("Irr[W/m2]", "irradiance"),
+    ("Rain[mm]", "rain_accumulation"),
+    ("Wind_Speed[m/s]", "wind_speed"),
+    ("Wind_Direction", "wind_direction"),
+    ("DHT_HUM[%]", "ambient_humidity"),
+    ("DHT_TEMP[°C]", "ambient_temperature"),
+)
+
+# Columnas CSV y fields InfluxDB de los termistores T0-T19
+THERMISTOR_COLUMNS = tuple(f"T{i}[°C]" for i in range(20))
+THERMISTOR_NAMES = tuple(f"thermistor_{i:02d}_temp" for i in range(20))
+
+# Columnas resueltas por archivo: (índice, field, es_dirección_viento) y (índice, field)
+FieldColumns = Tuple[Tuple[int, str, bool], ...]
+ThermistorColumns = Tuple[Tuple[int, str], ...]
+
 
 ###################################
 # get_available_csv_files
@@ -68,7 +110,15 @@ def get_available_csv_files() -> List[Path]:
         print(f"ERROR: Folder '{CSV_FOLDER}' does not exist.", file=sys.stderr)
         return []
 
-    csv_files = sorted(csv_folder.glob("data_*.csv"))
+    # Los nombres codifican la fecha, ordenar por nombre basta (sin glob ni rutas completas)
+    csv_files = sorted(
+        (
+            p
+            for p in csv_folder.iterdir()
+            if p.name.startswith("data_") and p.suffix == ".csv"
+        ),
+        key=lambda p: p.name,
+    )
     return csv_files
 
 
@@ -77,8 +127,10 @@ def get_available_csv_files() -> List[Path]:
 # Argumentos:
 #   - filename (str): Nombre del archivo CSV
 # Return: Optional[datetime] - Datetime en timezone CR o None si formato inválido
-# Descripcion: Extrae fecha y hora del nombre de archivo con formato data_YYYYMMDD_HHMMSS.csv
+# Descripcion: Extrae fecha y hora del nombre de archivo con formato data_YYYYMMDD_HHMMSS.csv.
+#              Resultado cacheado por nombre de archivo (se consulta varias veces desde main).
 ###################################
+@lru_cache(maxsize=None)
 def parse_filename_datetime(filename: str) -> Optional[datetime]:
     """Extrae datetime del nombre de archivo data_YYYYMMDD_HHMMSS.csv"""
     try:
@@ -93,81 +145,92 @@ def parse_filename_datetime(filename: str) -> Optional[datetime]:
 
 
 ###################################
-# create_point_from_csv_row
+# resolve_csv_columns
+# Argumentos:
+#   - header (List[str]): Fila de encabezado del CSV
+# Return: Tuple - (índice de DateTime o None, columnas de fields, columnas de termistores)
+# Descripcion: Resuelve una sola vez por archivo los índices de las columnas conocidas.
+#              Las columnas ausentes en el encabezado se descartan para no revisarlas por fila.
+###################################
+def resolve_csv_columns(
+    header: List[str],
+) -> Tuple[Optional[int], FieldColumns, ThermistorColumns]:
+    """Resuelve índices de columnas CSV a partir del encabezado"""
+    col_idx = {name: i for i, name in enumerate(header)}
+    field_cols = tuple(
+        (col_idx[csv_col], influx_field, csv_col == "Wind_Direction")
+        for csv_col, influx_field in FIELD_MAPPINGS
+        if csv_col in col_idx
+    )
+    therm_cols = tuple(
+        (col_idx[temp_col], field_name)
+        for temp_col, field_name in zip(THERMISTOR_COLUMNS, THERMISTOR_NAMES)
+        if temp_col in col_idx
+    )
+    return col_idx.get("DateTime"), field_cols, therm_cols
+
+
+###################################
+# create_line_from_csv_row
 # Argumentos:
-#   - row (Dict[str, str]): Fila de datos del CSV como diccionario
+#   - row (List[str]): Fila de datos del CSV como lista de valores
 #   - timestamp (datetime): Timestamp en timezone CR de la columna DateTime del CSV
-# Return: Optional[Point] - Punto de InfluxDB o None si error
-# Descripcion: Crea un Point de InfluxDB desde una fila CSV, mapeando columnas a fields
-#              y agregando tags del sistema. Incluye datos de paneles, termistores y ambiente.
+#   - field_cols (Tuple): Columnas (índice, field, es_dirección_viento) de resolve_csv_columns
+#   - therm_cols (Tuple): Columnas (índice, field) de termistores de resolve_csv_columns
+# Return: Optional[str] - Línea en formato line protocol o None si no hay fields válidos
+# Descripcion: Construye directamente la línea de line protocol de InfluxDB desde una fila
+#              CSV, mapeando columnas a fields y agregando tags del sistema. Evita crear
+#              un objeto Point por fila. Incluye datos de paneles, termistores y ambiente.
 ###################################
-def create_point_from_csv_row(
-    row: Dict[str, str], timestamp: datetime
-) -> Optional[Point]:
-    """Crea Point de InfluxDB desde fila CSV con todos los campos mapeados"""
+def create_line_from_csv_row(
+    row: List[str],
+    timestamp: datetime,
+    field_cols: FieldColumns,
+    therm_cols: ThermistorColumns,
+) -> Optional[str]:
+    """Crea línea de line protocol desde fila CSV con todos los campos mapeados"""
     try:
-        point = Point("solar_panel_measurement").time(
-            timestamp.astimezone(ZoneInfo("UTC")), WritePrecision.NS
-        )
-
-        # Mapeo de columnas CSV a fields InfluxDB
-        field_mappings = {
-            "V0[V]": "panel1_voltage",
-            "V1[V]": "panel2_voltage",
-            "I0[A]": "panel1_current",
-            "I1[A]": "panel2_current",
-            "P0[W]": "panel1_power",
-            "P1[W]": "panel2_power",
-            "E0[Wh]": "panel1_energy",
-            "E1[Wh]": "panel2_energy",
-            "Irr[W/m2]": "irradiance",
-            "Rain[mm]": "rain_accumulation",
-            "Wind_Speed[m/s]": "wind_speed",
-            "Wind_Direction": "wind_direction",
-            "DHT_HUM[%]": "ambient_humidity",
-            "DHT_TEMP[°C]": "ambient_temperature",
-        }
+        fields: List[str] = []
 
         # Agregar fields principales
-        for csv_col, influx_field in field_mappings.items():
-            if csv_col in row and row[csv_col].strip():
+        for idx, influx_field, is_wind in field_cols:
+            raw = row[idx].strip()
+            if raw:
                 try:
                     # Special handling for Wind_Direction: extract degrees only
-                    if csv_col == "Wind_Direction":
-                        wind_val = row[csv_col].strip()
+                    if is_wind:
                         # Extract number before ° symbol or parenthesis
                         # Format examples: "90.0°(E)", "180.0°(S)", "270.0°(W)"
-                        if "°" in wind_val:
-                            wind_val = wind_val.split("°")[0]
-                        elif "(" in wind_val:
-                            wind_val = wind_val.split("(")[0]
-                        value = float(wind_val)
+                        value = float(raw.partition("°")[0].partition("(")[0])
                     else:
-                        value = float(row[csv_col].strip())
+                        value = float(raw)
 
-                    point.field(influx_field, value)
+                    # Line protocol no acepta NaN/inf (Point los omitía)
+                    if isfinite(value):
+                        fields.append(f"{influx_field}={value!r}")
                 except (ValueError, TypeError):
                     pass
 
         # Agregar termistores T0-T19
-        for i in range(20):
-            temp_col = f"T{i}[°C]"
-            if temp_col in row and row[temp_col].strip():
+        for idx, field_name in therm_cols:
+            raw = row[idx].strip()
+            if raw:
                 try:
-                    temp_val = float(row[temp_col].strip())
-                    if not (temp_val != temp_val):  # Check for NaN
-                        point.field(f"thermistor_{i:02d}_temp", temp_val)
+                    temp_val = float(raw)
+                    if isfinite(temp_val):  # Omitir NaN/inf
+                        fields.append(f"{field_name}={temp_val!r}")
                 except (ValueError, TypeError):
                     pass
 
-        # Tags adicionales
-        point.tag("system", "raspberry_pi")
-        point.tag("location", "solar_farm")
+        if not fields:
+            return None
 
-        return point
+        # Timestamps del CSV tienen resolución de segundos; epoch es independiente de tz
+        ts_ns = int(timestamp.timestamp()) * 1_000_000_000
+        return f"{MEASUREMENT}{TAG_STR} {','.join(fields)} {ts_ns}"
 
     except Exception as e:
-        print(f"Error creating point: {e}")
+        print(f"Error creating line: {e}")
         return None
 
 
@@ -182,6 +245,8 @@ def create_point_from_csv_row(
 # Return: int - Número de puntos subidos exitosamente
 # Descripcion: Sube archivo CSV a InfluxDB filtrando filas por rango de tiempo.
 #              Maneja rangos que cruzan medianoche. Procesa BOM UTF-8 si existe.
+#              Lee el archivo en streaming (memoria O(fila), no O(archivo)).
+#              Los puntos se envían en lotes de WRITE_BATCH_SIZE en lugar de uno por fila.
 ###################################
 def upload_csv_with_time_filter(
     client: InfluxDBClient,
@@ -191,75 +256,178 @@ def upload_csv_with_time_filter(
     file_date: datetime,
 ) -> int:
     """Sube CSV a InfluxDB filtrando por rango de tiempo, retorna puntos subidos"""
-    write_api = client.write_api(write_options=SYNCHRONOUS)
+    write_errors: List[Tuple[int, Exception]] = []
+
+    def on_write_error(conf, data, exception) -> None:
+        # El WriteApi con batching escribe en segundo plano: los errores llegan aquí
+        newline = b"\n" if isinstance(data, bytes) else "\n"
+        write_errors.append((data.count(newline) + 1, exception))
+
+    write_api = client.write_api(
+        write_options=WriteOptions(
+            batch_size=WRITE_BATCH_SIZE,
+            flush_interval=1000,
+            jitter_interval=0,
+            retry_interval=5000,
+        ),
+        error_callback=on_write_error,
+    )
     points_uploaded = 0
     points_skipped = 0
+    batch: List[str] = []
+
+    # Referencias locales para evitar búsquedas de atributos/globales por fila
+    _strptime = datetime.strptime
+    _cr_tz = CR_TZ
+    normal_range = start_time <= end_time
+    start_str = start_time.strftime("%H:%M:%S")
+    end_str = end_time.strftime("%H:%M:%S")
+    upload_error: Optional[Exception] = None
 
     try:
-        with open(csv_path, "r", encoding="utf-8") as f:
-            # Remove BOM if present
-            content = f.read()
-            if content.startswith("\ufeff"):
-                content = content[1:]
+        # utf-8-sig elimina el BOM si existe; el archivo se lee fila a fila
+        with open(csv_path, "r", encoding="utf-8-sig", newline="") as f:
+            reader = csv.reader(f, skipinitialspace=True)
 
-            reader = csv.DictReader(content.splitlines(), skipinitialspace=True)
+            # Resolver índices de columnas una sola vez desde el encabezado
+            header = next(reader, [])
+            dt_idx, field_cols, therm_cols = resolve_csv_columns(header)
+            if dt_idx is None:
+                raise ValueError("Columna 'DateTime' no encontrada en el encabezado")
+            n_cols = len(header)
 
             for row in reader:
+                # Completar filas cortas para acceder por índice sin IndexError
+                if len(row) < n_cols:
+                    row.extend([""] * (n_cols - len(row)))
+
                 # Parse timestamp from DateTime column
-                if "DateTime" not in row or not row["DateTime"].strip():
+                dt_str = row[dt_idx].strip()
+                if not dt_str:
                     continue
 
                 try:
                     # DateTime format in CSV (assuming format like: YYYY-MM-DD HH:MM:SS)
-                    dt_str = row["DateTime"].strip()
-                    timestamp = datetime.strptime(dt_str, "%Y-%m-%d %H:%M:%S").replace(
-                        tzinfo=CR_TZ
-                    )
+                    if len(dt_str) == 19:
+                        # Formato fijo: filtrar por la subcadena HH:MM:SS antes de
+                        # construir el datetime (orden lexicográfico == orden temporal)
+                        row_hms = dt_str[11:19]
+                        timestamp = None
+                    else:
+                        timestamp = _strptime(dt_str, "%Y-%m-%d %H:%M:%S").replace(
+                            tzinfo=_cr_tz
+                        )
+                        row_hms = timestamp.strftime("%H:%M:%S")
 
                     # Filter by time range
-                    row_time = timestamp.time()
-
                     # Handle time range that crosses midnight
-                    if start_time <= end_time:
+                    if normal_range:
                         # Normal range (e.g., 08:00 to 17:00)
-                        if not (start_time <= row_time <= end_time):
+                        if not (start_str <= row_hms <= end_str):
                             points_skipped += 1
                             continue
                     else:
                         # Range crosses midnight (e.g., 23:00 to 02:00)
-                        if not (row_time >= start_time or row_time <= end_time):
+                        if not (row_hms >= start_str or row_hms <= end_str):
                             points_skipped += 1
                             continue
 
-                    point = create_point_from_csv_row(row, timestamp)
-                    if point:
-                        write_api.write(
-                            INFLUX_CONFIG["bucket"], INFLUX_CONFIG["org"], point
+                    if timestamp is None:
+                        # Cortar por posición evita strptime por fila
+                        timestamp = datetime(
+                            int(dt_str[0:4]),
+                            int(dt_str[5:7]),
+                            int(dt_str[8:10]),
+                            int(dt_str[11:13]),
+                            int(dt_str[14:16]),
+                            int(dt_str[17:19]),
+                            tzinfo=_cr_tz,
                         )
-                        points_uploaded += 1
+
+                    line = create_line_from_csv_row(
+                        row, timestamp, field_cols, therm_cols
+                    )
+                    if line:
+                        batch.append(line)
+                        if len(batch) >= WRITE_BATCH_SIZE:
+                            write_api.write(
+                                INFLUX_CONFIG["bucket"],
+                                INFLUX_CONFIG["org"],
+                                record=batch,
+                                write_precision=WritePrecision.NS,
+                            )
+                            points_uploaded += len(batch)
+                            batch = []
 
                 except Exception as e:
                     print(f"Warning: Error processing row: {e}")
                     continue
 
-        print(f"✓ Uploaded {points_uploaded} points from {csv_path.name}")
-        print(f"  Skipped {points_skipped} points outside time range")
+            # Enviar puntos restantes del último lote parcial
+            if batch:
+                write_api.write(
+                    INFLUX_CONFIG["bucket"],
+                    INFLUX_CONFIG["org"],
+                    record=batch,
+                    write_precision=WritePrecision.NS,
+                )
+                points_uploaded += len(batch)
+                batch = []
 
     except Exception as e:
-        print(f"✗ Error uploading {csv_path.name}: {e}", file=sys.stderr)
+        upload_error = e
 
     finally:
+        # close() envía los lotes pendientes antes de revisar errores de escritura
         write_api.close()
 
+    if write_errors:
+        points_uploaded -= sum(lines for lines, _ in write_errors)
+        upload_error = upload_error or write_errors[0][1]
+
+    if upload_error is not None:
+        print(f"✗ Error uploading {csv_path.name}: {upload_error}", file=sys.stderr)
+    else:
+        print(f"✓ Uploaded {points_uploaded} points from {csv_path.name}")
+        print(f"  Skipped {points_skipped} points outside time range")
+
     return points_uploaded
 
 
+###################################
+# parse_file_selection
+# Argumentos:
+#   - selection (str): Texto ingresado por el usuario ("2", "1,3,5" o "todos")
+#   - total (int): Cantidad de archivos disponibles
+# Return: List[int] - Índices (base 0) de los archivos seleccionados, sin duplicados
+# Descripcion: Interpreta la selección de archivos. Lanza ValueError con un mensaje para el
+#              usuario si la selección es inválida o está fuera de rango.
+###################################
+def parse_file_selection(selection: str, total: int) -> List[int]:
+    """Convierte la selección del usuario en índices de archivos"""
+    if selection.lower() in ["todos", "all"]:
+        return list(range(total))
+
+    indices: List[int] = []
+    for part in selection.split(","):
+        try:
+            idx = int(part.strip()) - 1
+        except ValueError:
+            raise ValueError("Por favor ingrese números válidos separados por coma")
+        if not 0 <= idx < total:
+            raise ValueError(f"Por favor ingrese números entre 1 y {total}")
+        if idx not in indices:
+            indices.append(idx)
+    return indices
+
+
 ###################################
 # main
 # Argumentos: Ninguno
 # Return: None
-# Descripcion: Función principal interactiva que permite seleccionar archivo CSV de archivos_csv/,
-#              especificar rango de tiempo, y subir datos filtrados a InfluxDB tras confirmación.
+# Descripcion: Función principal interactiva que permite seleccionar uno o varios archivos CSV de
+#              archivos_csv/, especificar rango de tiempo, y subir datos filtrados a InfluxDB tras
+#              confirmación. Los archivos se suben en paralelo con un ThreadPoolExecutor.
 ###################################
 def main() -> None:
     print("=== CSV to InfluxDB Uploader ===")
@@ -282,26 +450,27 @@ def main() -> None:
 
     print()
 
-    # Step 2: Select CSV file
+    # Step 2: Select CSV files
     while True:
+        selection = input(
+            f"Seleccione los archivos CSV (1-{len(csv_files)}, ej: 1,3,5 o 'todos'): "
+        ).strip()
         try:
-            selection = input(
-                f"Seleccione el archivo CSV (1-{len(csv_files)}): "
-            ).strip()
-            idx = int(selection) - 1
-            if 0 <= idx < len(csv_files):
-                selected_csv = csv_files[idx]
-                break
-            else:
-                print(f"Por favor ingrese un número entre 1 y {len(csv_files)}")
-        except ValueError:
-            print("Por favor ingrese un número válido")
+            selected_csvs = [
+                csv_files[i] for i in parse_file_selection(selection, len(csv_files))
+            ]
+            break
+        except ValueError as e:
+            print(e)
 
-    file_dt = parse_filename_datetime(selected_csv.name)
     print()
-    print(f"Archivo seleccionado: {selected_csv.name}")
-    if file_dt:
-        print(f"Fecha del archivo: {file_dt.strftime('%Y-%m-%d')}")
+    print("Archivos seleccionados:")
+    for csv_file in selected_csvs:
+        file_dt = parse_filename_datetime(csv_file.name)
+        if file_dt:
+            print(f"  {csv_file.name} (fecha: {file_dt.strftime('%Y-%m-%d')})")
+        else:
+            print(f"  {csv_file.name}")
     print()
 
     # Step 3: Get time range
@@ -347,27 +516,43 @@ def main() -> None:
             url=INFLUX_CONFIG["url"],
             token=INFLUX_CONFIG["token"],
             org=INFLUX_CONFIG["org"],
+            enable_gzip=INFLUX_CONFIG["enable_gzip"],
         ) as client:
-            # Test connection
-            health = client.health()
-            if health.status != "pass":
-                print(
-                    f"ERROR: InfluxDB health check failed: {health.status}",
-                    file=sys.stderr,
-                )
-                sys.exit(1)
-
-            print("✓ Conectado a InfluxDB")
-            print()
-
-            # Upload CSV with time filtering
-            total_points = upload_csv_with_time_filter(
-                client, selected_csv, start_time, end_time, file_dt
-            )
+            # Health check opcional: los errores de conexión ya se reportan al escribir
+            if "--check" in sys.argv[1:]:
+                health = client.health()
+                if health.status != "pass":
+                    print(
+                        f"ERROR: InfluxDB health check failed: {health.status}",
+                        file=sys.stderr,
+                    )
+                    sys.exit(1)
+
+                print("✓ Conectado a InfluxDB")
+                print()
+
+            # Upload CSVs with time filtering, un WriteApi por archivo en paralelo
+            with ThreadPoolExecutor(
+                max_workers=min(UPLOAD_WORKERS, len(selected_csvs))
+            ) as executor:
+                futures = [
+                    executor.submit(
+                        upload_csv_with_time_filter,
+                        client,
+                        csv_file,
+                        start_time,
+                        end_time,
+                        parse_filename_datetime(csv_file.name),
+                    )
+                    for csv_file in selected_csvs
+                ]
+                total_points = sum(future.result() for future in futures)
 
             print()
             print(f"=== Resumen ===")
-            print(f"Archivo procesado: {selected_csv.name}")
+            print(f"Archivos procesados: {len(selected_csvs)}")
+            for csv_file in selected_csvs:
+                print(f"  {csv_file.name}")
             print(
                 f"Rango de tiempo: {start_time.strftime('%H:%M')} - {end_time.strftime('%H:%M')}"
             )
@@ -1,9 +1,25 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import signal
 import sys
+import threading
 import time
 
+DEBUG_REPORT_INTERVAL = 10  # Segundos entre mensajes [DEBUG]
+
+
+# Reporte periódico en un hilo aparte: el hilo principal queda dormido en signal.pause()
+def start_debug_reporter(report):
+    stop = threading.Event()
+
+    def loop():
+        while not stop.wait(DEBUG_REPORT_INTERVAL):
+            report()
+
+    threading.Thread(target=loop, daemon=True).start()
+    return stop
+
 
 # Opción 1: Usando RPi.GPIO (versión robusta)
 def rain_gauge_rpi_gpio():
@@ -55,16 +71,19 @@ def rain_gauge_rpi_gpio():
         print("\nMidiendo lluvia... (Ctrl+C para salir)")
         print("Toca el sensor para probar")
 
+        # Mostrar estado del pin cada 10 segundos para debug
+        stop_debug = start_debug_reporter(
+            lambda: print(
+                f"[DEBUG] Pin state: {GPIO.input(RAIN_PIN)}, Rain count: {rain_count}"
+            )
+        )
         try:
-            while True:
-                time.sleep(1)
-                # Mostrar estado del pin cada 10 segundos para debug
-                if int(time.time()) % 10 == 0:
-                    state = GPIO.input(RAIN_PIN)
-                    print(f"[DEBUG] Pin state: {state}, Rain count: {rain_count}")
+            signal.pause()  # Los pulsos llegan por el callback de add_event_detect
 
         except KeyboardInterrupt:
             print(f"\nTotal lluvia acumulada: {rain_count * MM_PER_TICK:.3f} mm")
+        finally:
+            stop_debug.set()
 
     except Exception as e:
         print(f"Error general: {e}")
@@ -88,6 +107,7 @@ def rain_gauge_gpiozero():
 
     RAIN_PIN = 6  # Pin BCM donde está el reed switch
     MM_PER_TICK = 0.2794  # mm de lluvia por pulso
+    GLITCH_FILTER_US = 5_000  # Filtro de glitches de pigpiod (5 ms)
     rain_count = 0
 
     def rain_pulse():
@@ -100,16 +120,36 @@ def rain_gauge_gpiozero():
     print("=== MEDIDOR DE LLUVIA (GPIOZERO) ===")
 
     try:
-        # Usar pigpio factory para mayor robustez
-        Device.pin_factory = PiGPIOFactory()
-        print("✓ PiGPIO factory configurado")
+        # Solo fábricas con eventos en C: el NativePin por defecto hace polling en un
+        # hilo Python y consume mucha CPU por pin
+        try:
+            factory = PiGPIOFactory()
+            print("✓ PiGPIO factory configurado")
+        except Exception as e:
+            print(f"⚠ pigpiod no disponible ({e}), probando lgpio...")
+            try:
+                from gpiozero.pins.lgpio import LGPIOFactory
+
+                factory = LGPIOFactory()
+                print("✓ LGPIO factory configurado")
+            except Exception as e:
+                print(f"✗ ERROR: No hay pin factory pigpio ni lgpio disponible: {e}")
+                print("  Iniciar pigpiod con: sudo pigpiod")
+                print("  O instalar lgpio con: pip install lgpio")
+                return False
+        Device.pin_factory = factory
+        uses_pigpio = isinstance(factory, PiGPIOFactory)
 
         # Configurar sensor como button
         rain_sensor = Button(
             RAIN_PIN,
             pull_up=True,  # Reed switch conectado a masa
-            bounce_time=0.01,  # 300ms debounce
+            # Con pigpio el debounce lo hace el filtro de glitches del daemon
+            bounce_time=None if uses_pigpio else 0.01,
         )
+        if uses_pigpio:
+            factory.connection.set_glitch_filter(RAIN_PIN, GLITCH_FILTER_US)
+            print(f"✓ Filtro de glitches pigpiod: {GLITCH_FILTER_US} µs")
         print(f"✓ Sensor en pin {RAIN_PIN} configurado")
 
         # Configurar callback para flanco descendente
@@ -122,17 +162,20 @@ def rain_gauge_gpiozero():
         print("\nMidiendo lluvia... (Ctrl+C para salir)")
         print("Toca el sensor para probar")
 
+        # Debug cada 10 segundos
+        stop_debug = start_debug_reporter(
+            lambda: print(
+                f"[DEBUG] Sensor: {'PRESSED' if rain_sensor.is_pressed else 'RELEASED'}, "
+                f"Rain count: {rain_count}"
+            )
+        )
         try:
-            start_time = time.time()
-            while True:
-                time.sleep(1)
-                # Debug cada 10 segundos
-                if int(time.time() - start_time) % 10 == 0:
-                    state = "PRESSED" if rain_sensor.is_pressed else "RELEASED"
-                    print(f"[DEBUG] Sensor: {state}, Rain count: {rain_count}")
+            signal.pause()  # gpiozero entrega los pulsos por when_pressed
 
         except KeyboardInterrupt:
             print(f"\nTotal lluvia acumulada: {rain_count * MM_PER_TICK:.3f} mm")
+        finally:
+            stop_debug.set()
 
     except Exception as e:
         print(f"Error: {e}")
@@ -147,40 +190,122 @@ def rain_gauge_gpiozero():
     return True
 
 
-# Opción 3: Polling manual (siempre funciona)
-def rain_gauge_polling():
-    import RPi.GPIO as GPIO
+# Opción 3: Eventos de flanco por el chardev gpiochip (libgpiod v2) con debounce en
+# el kernel; si gpiod no está disponible se usa sysfs + epoll
+def rain_gauge_events():
+    try:
+        import gpiod
+        from gpiod.line import Bias, Edge
+    except ImportError:
+        print("⚠ gpiod (libgpiod v2) no disponible, usando sysfs/epoll")
+        print("  Instalar con: pip install gpiod")
+        return rain_gauge_polling()
+
+    from datetime import timedelta
 
     RAIN_PIN = 6  # Pin BCM donde está el reed switch
     MM_PER_TICK = 0.2794  # mm de lluvia por pulso
+    GPIO_CHIP = "/dev/gpiochip0"  # Pi 5 con kernel antiguo: /dev/gpiochip4
+    DEBOUNCE = timedelta(milliseconds=5)  # Filtrado por el kernel (GPIO_V2)
     rain_count = 0
-    last_state = 1  # Estado anterior del pin
 
-    print("=== MEDIDOR DE LLUVIA (POLLING) ===")
+    print("=== MEDIDOR DE LLUVIA (GPIOD / GPIOCHIP) ===")
 
     try:
-        GPIO.cleanup()
-        GPIO.setmode(GPIO.BCM)
-        GPIO.setup(RAIN_PIN, GPIO.IN, pull_up_down=GPIO.PUD_UP)
-        print(f"✓ Pin {RAIN_PIN} configurado para polling")
+        settings = gpiod.LineSettings(
+            edge_detection=Edge.FALLING,
+            bias=Bias.PULL_UP,  # Reed switch conectado a masa
+            debounce_period=DEBOUNCE,
+        )
+        with gpiod.request_lines(
+            GPIO_CHIP, consumer="rain_gauge", config={RAIN_PIN: settings}
+        ) as request:
+            print(
+                f"✓ Pin {RAIN_PIN} en {GPIO_CHIP}: flanco descendente, pull-up, "
+                f"debounce {DEBOUNCE.total_seconds() * 1000:.0f} ms"
+            )
+            print("\nMidiendo lluvia por eventos... (Ctrl+C para salir)")
+            print("El kernel notifica cada flanco; sin consumo de CPU entre pulsos")
+
+            try:
+                while True:
+                    request.wait_edge_events()  # Bloquea hasta el próximo flanco
+                    for _event in request.read_edge_events():
+                        rain_count += 1
+                        print(
+                            f"Pulso detectado! Total: {rain_count} -> {rain_count * MM_PER_TICK:.3f} mm"
+                        )
 
-        print("\nMidiendo lluvia por polling... (Ctrl+C para salir)")
-        print("Método más lento pero 100% confiable")
+            except KeyboardInterrupt:
+                print(f"\nTotal lluvia acumulada: {rain_count * MM_PER_TICK:.3f} mm")
+
+    except Exception as e:
+        print(f"Error: {e}")
+        return False
+
+    print("GPIO liberado")
+    return True
+
+
+# Alternativa sin gpiod: eventos de flanco por sysfs + epoll (sin polling)
+def rain_gauge_polling():
+    import os
+    import select
+
+    RAIN_PIN = 6  # Pin BCM donde está el reed switch
+    MM_PER_TICK = 0.2794  # mm de lluvia por pulso
+    # Rebotes descartados por diferencia de tiempo, sin bloquear. Para debounce largo
+    # (> 50 ms) conviene el debounce_period_us de gpio-cdev v2, que filtra en el kernel
+    DEBOUNCE_S = 0.005
+    gpio_dir = f"/sys/class/gpio/gpio{RAIN_PIN}"
+    rain_count = 0
+    last_pulse = 0.0
+    value_fd = None
+    epoll = None
+    exported = False
+
+    def sysfs_write(path, value):
+        with open(path, "w") as f:
+            f.write(value)
+
+    print("=== MEDIDOR DE LLUVIA (EVENTOS SYSFS/EPOLL) ===")
+
+    try:
+        # sysfs no configura pull-up: GPIO6 ya tiene pull-up por defecto al arrancar
+        if not os.path.exists(gpio_dir):
+            sysfs_write("/sys/class/gpio/export", str(RAIN_PIN))
+            exported = True
+            time.sleep(0.1)  # Esperar a que udev ajuste permisos del pin
+        sysfs_write(f"{gpio_dir}/direction", "in")
+
+        # Reiniciar el flanco: algunos kernels no entregan eventos sin este paso
+        sysfs_write(f"{gpio_dir}/edge", "none")
+        sysfs_write(f"{gpio_dir}/edge", "falling")
+        print(f"✓ Pin {RAIN_PIN} configurado con detección de flanco descendente")
+
+        value_fd = os.open(f"{gpio_dir}/value", os.O_RDONLY | os.O_NONBLOCK)
+        os.read(value_fd, 8)  # Lectura inicial descarta el evento pendiente
+        epoll = select.epoll()
+        epoll.register(value_fd, select.EPOLLPRI | select.EPOLLET)
+
+        print("\nMidiendo lluvia por eventos... (Ctrl+C para salir)")
+        print("El kernel notifica cada flanco; sin consumo de CPU entre pulsos")
 
         try:
             while True:
-                current_state = GPIO.input(RAIN_PIN)
+                for _fd, _event in epoll.poll():
+                    os.lseek(value_fd, 0, os.SEEK_SET)
+                    os.read(value_fd, 8)
+
+                    now = time.monotonic()
+                    if now - last_pulse < DEBOUNCE_S:
+                        continue
+                    last_pulse = now
 
-                # Detectar flanco descendente (1 → 0)
-                if last_state == 1 and current_state == 0:
                     rain_count += 1
                     print(
                         f"Pulso detectado! Total: {rain_count} -> {rain_count * MM_PER_TICK:.3f} mm"
                     )
-                    time.sleep(0.3)  # Debounce manual
-
-                last_state = current_state
-                time.sleep(0.01)  # Polling cada 10ms
 
         except KeyboardInterrupt:
             print(f"\nTotal lluvia acumulada: {rain_count * MM_PER_TICK:.3f} mm")
@@ -189,8 +314,16 @@ def rain_gauge_polling():
         print(f"Error: {e}")
         return False
     finally:
-        GPIO.cleanup()
-        print("GPIO limpiado")
+        if epoll is not None:
+            epoll.close()
+        if value_fd is not None:
+            os.close(value_fd)
+        if exported:
+            try:
+                sysfs_write("/sys/class/gpio/unexport", str(RAIN_PIN))
+            except OSError:
+                pass
+        print("GPIO liberado")
 
     return True
 
@@ -251,7 +384,7 @@ def main():
         print("\nSelecciona una opción:")
         print("1. RPi.GPIO (método original corregido)")
         print("2. gpiozero (más robusto)")
-        print("3. Polling manual (100% confiable)")
+        print("3. Eventos gpiod/gpiochip (debounce en kernel)")
         print("4. Diagnóstico GPIO")
         print("5. Salir")
 
@@ -269,7 +402,8 @@ def main():
 
         elif choice == "3":
             print("\n" + "=" * 30)
-            rain_gauge_polling()
+            if not rain_gauge_events():
+                print("\nPrueba otra opción si falló")
 
         elif choice == "4":
             check_gpio_usage()
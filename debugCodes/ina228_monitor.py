@@ -4,8 +4,8 @@
 import os
 import signal
 import sys
+import threading
 import time
-from datetime import datetime
 
 import adafruit_ina228
 import board
@@ -20,10 +20,37 @@ ADDRESSES = [0x40, 0x41]
 AVG_TARGET = 1024  # muestras para promediado
 CT_TARGET_US = 1052  # microsegundos para conversión
 ADC_RANGE = 1  # 0 = ±163.84mV, 1 = ±40.96mV
+UPDATE_INTERVAL = 1.0  # Segundos entre refrescos de pantalla
+
+# Registros INA228 (datasheet TI) leídos directamente, sin pasar por las propiedades
+_REG_VBUS = bytes([0x05])  # 24 bits, valor en bits 23:4
+_REG_DIETEMP = bytes([0x06])  # 16 bits con signo
+_REG_CURRENT = bytes([0x07])  # 24 bits, valor con signo en bits 23:4
+_REG_POWER = bytes([0x08])  # 24 bits
+_REG_ENERGY = bytes([0x09])  # 40 bits
+VBUS_LSB = 195.3125e-6  # V por LSB
+DIETEMP_LSB = 7.8125e-3  # °C por LSB
+_READ_BUF = bytearray(5)
+
+# Línea de estado del monitor (bytes, formateada con %)
+STATUS_FMT = "Medición #%05d - %s - Errores: %d".encode()
+STATUS_WIDTH = 50  # bytes reservados para la línea de estado en el frame
+
+# Campos por sensor en el panel: (fila relativa, columna, ancho, formato, clave)
+DISPLAY_FIELDS = (
+    (1, 13, 7, b"%7.4f", "voltage"),
+    (1, 35, 8, b"%+8.4f", "current"),
+    (1, 53, 6, b"%6.1f", "temperature"),
+    (2, 13, 7, b"%7.4f", "power"),
+    (2, 34, 9, b"%9.4f", "energy"),
+)
 
 # Variables globales
 sensors = []
 running = True
+stop_event = threading.Event()
+measurement_count = 0
+error_count = 0
 
 
 # ======================== CÓDIGOS ANSI PARA TERMINAL ESTÁTICO ========================
@@ -43,6 +70,19 @@ class TerminalControl:
 
 
 # ======================== FUNCIONES AUXILIARES ========================
+# Hora HH:MM:SS en caché: solo se reformatea cuando cambia el segundo
+_ts_cache = [-1, b""]
+
+
+def _timestamp():
+    """Devuelve la hora actual HH:MM:SS como bytes, cacheada por segundo"""
+    now = int(time.time())
+    if now != _ts_cache[0]:
+        _ts_cache[0] = now
+        _ts_cache[1] = time.strftime("%H:%M:%S", time.localtime(now)).encode()
+    return _ts_cache[1]
+
+
 def signal_handler(sig, frame):
     """Maneja la señal Ctrl+C para terminar limpiamente"""
     global running
@@ -51,11 +91,26 @@ def signal_handler(sig, frame):
     print(TerminalControl.HOME_CURSOR, end="")
     print("\nDeteniendo monitor de INA228...")
     running = False
+    stop_event.set()
+
+
+# Atributos de la clase INA228 resueltos una vez: evita hasattr/excepciones por sensor
+_INA228_ATTRS = frozenset(dir(adafruit_ina228.INA228))
+
+
+def _first_supported(*names):
+    """Devuelve el primer nombre de propiedad que soporta la versión instalada"""
+    return next((name for name in names if name in _INA228_ATTRS), None)
+
+
+_BUS_CT_PROP = _first_supported("bus_voltage_conv_time", "conversion_time_bus")
+_SHUNT_CT_PROP = _first_supported("shunt_voltage_conv_time", "conversion_time_shunt")
+_TEMP_CT_PROP = _first_supported("temp_conv_time", "conversion_time_temperature")
 
 
 def _try_set(prop_name, sensor, preferred, fallback=None):
     """Intenta asignar 'preferred'. Si falla y hay 'fallback', intenta fallback."""
-    if not hasattr(sensor, prop_name):
+    if prop_name not in _INA228_ATTRS:
         return False
     try:
         setattr(sensor, prop_name, preferred)
@@ -83,34 +138,24 @@ def setup_ina(i2c, address):
         s.set_calibration(shunt_res=RSHUNT_OHMS, max_current=IMAX_AMPS)
         print(f"  ✓ Calibración: {RSHUNT_OHMS}Ω, {IMAX_AMPS}A")
 
-        # Promediado y tiempos (nuevas versiones aceptan enteros "humanos")
-        success_avg = _try_set(
-            "averaging_count", s, AVG_TARGET, fallback=7
-        )  # 7 suele ser 1024
-        success_bus = _try_set(
-            "bus_voltage_conv_time", s, CT_TARGET_US, fallback=5
-        )  # 5 suele ser ~1052us
-        success_shunt = _try_set("shunt_voltage_conv_time", s, CT_TARGET_US, fallback=5)
-        success_temp = _try_set("temp_conv_time", s, CT_TARGET_US, fallback=5)
-
-        # También intentar con nombres alternativos por compatibilidad
-        if not success_bus:
-            _try_set("conversion_time_bus", s, CT_TARGET_US, fallback=5)
-        if not success_shunt:
-            _try_set("conversion_time_shunt", s, CT_TARGET_US, fallback=5)
-        if not success_temp:
-            _try_set("conversion_time_temperature", s, CT_TARGET_US, fallback=5)
+        # Promediado y tiempos (nuevas versiones aceptan enteros "humanos");
+        # los nombres de propiedad según versión ya están resueltos en _*_CT_PROP
+        _try_set("averaging_count", s, AVG_TARGET, fallback=7)  # 7 suele ser 1024
+        _try_set(_BUS_CT_PROP, s, CT_TARGET_US, fallback=5)  # 5 suele ser ~1052us
+        _try_set(_SHUNT_CT_PROP, s, CT_TARGET_US, fallback=5)
+        _try_set(_TEMP_CT_PROP, s, CT_TARGET_US, fallback=5)
 
         # Limpia acumuladores de energía/carga
-        if hasattr(s, "reset_accumulators"):
+        if "reset_accumulators" in _INA228_ATTRS:
             s.reset_accumulators()
             print("  ✓ Acumuladores reseteados")
 
+        # Lectura rápida por sensor, ligada tras la calibración (LSB ya definido)
+        s._read_all = _make_fast_reader(s)
+
         # Verificar configuración actual
         actual_avg = getattr(s, "averaging_count", "N/A")
-        actual_ct = getattr(
-            s, "bus_voltage_conv_time", getattr(s, "conversion_time_bus", "N/A")
-        )
+        actual_ct = getattr(s, _BUS_CT_PROP) if _BUS_CT_PROP else "N/A"
         print(f"  ✓ Configuración final: AVG={actual_avg}, CT={actual_ct}us")
 
         return s
@@ -155,124 +200,184 @@ def initialize_hardware():
     return True
 
 
+def _read_register(device, register, nbytes):
+    """Lee un registro INA228 de nbytes (big-endian) como entero sin signo"""
+    device.write_then_readinto(register, _READ_BUF, in_end=nbytes)
+    return int.from_bytes(_READ_BUF[:nbytes], "big")
+
+
+def _make_fast_reader(sensor):
+    """Crea la función de lectura del sensor con dispositivo y escalas ya resueltos.
+
+    Retorna una función sin argumentos que devuelve (V, A, W, J, °C).
+    """
+    device = getattr(sensor, "i2c_device", None)
+
+    if device is None:
+        # Versión de la librería sin i2c_device expuesto: usar propiedades. Si la
+        # clase no tiene energía/temperatura se decide aquí, no en cada lectura
+        has_energy = "energy" in _INA228_ATTRS
+        has_temp = "die_temperature" in _INA228_ATTRS
+        nan = float("nan")
+
+        def read_all():
+            return (
+                sensor.bus_voltage,
+                sensor.current,
+                sensor.power,
+                sensor.energy if has_energy else 0.0,  # J (si está disponible)
+                sensor.die_temperature if has_temp else nan,
+            )
+
+        return read_all
+
+    # LSB de corriente (Imax / 2^19) y escalas derivadas calculadas una sola vez
+    current_lsb = getattr(sensor, "_current_lsb", IMAX_AMPS / 524288)
+    power_lsb = 3.2 * current_lsb
+    energy_lsb = 16 * power_lsb
+    read_register = _read_register
+
+    def read_all():
+        # Todas las lecturas bajo un solo bloqueo del bus, sin propiedades intermedias
+        with device as d:
+            vbus = read_register(d, _REG_VBUS, 3) >> 4
+            current = read_register(d, _REG_CURRENT, 3) >> 4
+            power = read_register(d, _REG_POWER, 3)
+            energy = read_register(d, _REG_ENERGY, 5)
+            dietemp = read_register(d, _REG_DIETEMP, 2)
+
+        if current & 0x80000:
+            current -= 0x100000
+        if dietemp & 0x8000:
+            dietemp -= 0x10000
+
+        return (
+            vbus * VBUS_LSB,
+            current * current_lsb,
+            power * power_lsb,
+            energy * energy_lsb,
+            dietemp * DIETEMP_LSB,
+        )
+
+    return read_all
+
+
 def read_sensor_data(sensor):
     """Lee datos de un sensor INA228 específico"""
     if sensor is None:
         return None
 
     try:
+        voltage, current, power, energy, temperature = sensor._read_all()
         data = {
-            "voltage": sensor.bus_voltage,  # V
-            "current": sensor.current,  # A
-            "power": sensor.power,  # W
-            "energy": getattr(sensor, "energy", 0.0),  # J (si está disponible)
-            "temperature": getattr(sensor, "die_temperature", float("nan")),  # °C
+            "voltage": voltage,  # V
+            "current": current,  # A
+            "power": power,  # W
+            "energy": energy,  # J
+            "temperature": temperature,  # °C
         }
         return data
     except Exception as e:
         return None
 
 
-def setup_display():
-    """Configura la pantalla inicial estática"""
-    print(TerminalControl.CLEAR_SCREEN, end="")
-    print(TerminalControl.HOME_CURSOR, end="")
-    print(TerminalControl.HIDE_CURSOR, end="")
-
-    # Título
-    print(TerminalControl.goto(1, 1), end="")
-    print("╔═══════════════════════════════════════════════════════════════╗")
-    print(TerminalControl.goto(2, 1), end="")
-    print("║              MONITOR INA228 - ALTA PRECISIÓN                 ║")
-    print(TerminalControl.goto(3, 1), end="")
-    print(
-        f"║          Rshunt: {RSHUNT_OHMS}Ω - Imax: {IMAX_AMPS}A - AVG: {AVG_TARGET}                   ║"
-    )
-    print(TerminalControl.goto(4, 1), end="")
-    print("╚═══════════════════════════════════════════════════════════════╝")
+def _fit(text, width):
+    """Ajusta bytes a un ancho fijo (relleno o recorte) para escribir en el frame"""
+    return text.ljust(width)[:width]
+
 
-    # Encabezados para cada sensor
-    row = 6
+def setup_display():
+    """Configura la pantalla estática y devuelve la función que la refresca.
+
+    El frame completo (marcos, encabezados y campos) se arma una sola vez según
+    los sensores detectados; cada refresco solo sobrescribe los valores en
+    posiciones de bytes fijas y reenvía el frame entero desde el inicio.
+    """
+    lines = [
+        "╔═══════════════════════════════════════════════════════════════╗",
+        "║              MONITOR INA228 - ALTA PRECISIÓN                 ║",
+        f"║          Rshunt: {RSHUNT_OHMS}Ω - Imax: {IMAX_AMPS}A - AVG: {AVG_TARGET}                   ║",
+        "╚═══════════════════════════════════════════════════════════════╝",
+        "",
+    ]
+
+    # Bloque de 5 filas por sensor; se guarda el índice de su primera línea
+    blocks = []
     for addr, sensor in sensors:
-        print(TerminalControl.goto(row, 1), end="")
+        blocks.append(len(lines))
         status = "ACTIVO" if sensor is not None else "ERROR"
-        print(f"╔══ INA228 @ 0x{addr:02X} - {status} {'═' * 39}")
-
-        print(TerminalControl.goto(row + 1, 1), end="")
-        print("║  Voltaje:         V │ Corriente:         A │ Temp:       °C ║")
-        print(TerminalControl.goto(row + 2, 1), end="")
-        print("║  Potencia:        W │ Energía:           J │               ║")
-        print(TerminalControl.goto(row + 3, 1), end="")
-        print("╚═══════════════════════════════════════════════════════════════╝")
-
-        row += 5
+        lines += [
+            f"╔══ INA228 @ 0x{addr:02X} - {status} {'═' * 39}",
+            "║  Voltaje:         V │ Corriente:         A │ Temp:       °C ║",
+            "║  Potencia:        W │ Energía:           J │               ║",
+            "╚═══════════════════════════════════════════════════════════════╝",
+            "",
+        ]
 
     # Línea de estado
-    status_row = row + 1
-    print(TerminalControl.goto(status_row, 1), end="")
-    print("─────────────────────────────────────────────────────────────")
-    print(TerminalControl.goto(status_row + 1, 1), end="")
-    print("  Estado:")
-    print(TerminalControl.goto(status_row + 2, 1), end="")
-    print("  Presiona Ctrl+C para detener")
-
-
-def update_display(measurement_count, error_count):
-    """Actualiza los valores en la pantalla estática"""
-    timestamp = datetime.now().strftime("%H:%M:%S")
-
-    # Calcular posición de estado
-    status_row = 6 + len(sensors) * 5 + 1 + 1
-
-    # Actualizar timestamp y contador
-    print(TerminalControl.goto(status_row + 1, 11), end="")
-    print(
-        f"Medición #{measurement_count:05d} - {timestamp} - Errores: {error_count}     "
+    lines.append("")
+    lines.append("─────────────────────────────────────────────────────────────")
+    status_line = len(lines)
+    lines.append("  Estado: ")
+    lines.append("  Presiona Ctrl+C para detener")
+
+    # Offsets en bytes de cada línea dentro del frame (los marcos son UTF-8 multibyte)
+    home = TerminalControl.HOME_CURSOR.encode()
+    encoded = [line.encode() for line in lines]
+    starts = []
+    pos = len(home)
+    for data in encoded:
+        starts.append(pos)
+        pos += len(data) + 1
+
+    def offset(line, col):
+        return starts[line] + len(lines[line][: col - 1].encode())
+
+    # Reservar espacio para la línea de estado al final de su línea
+    encoded[status_line] = encoded[status_line].ljust(
+        len(encoded[status_line]) + STATUS_WIDTH
     )
+    status_off = starts[status_line] + len(lines[status_line].encode())
+
+    frame = bytearray(home + b"\n".join(encoded) + b"\n")
+    view = memoryview(frame)
+    field_offsets = [
+        [(offset(start + r, c), w, fmt, key) for r, c, w, fmt, key in DISPLAY_FIELDS]
+        for start in blocks
+    ]
+    errors = [b"ERROR".rjust(w) for _r, _c, w, _f, _k in DISPLAY_FIELDS]
+
+    def render(measurement_count, error_count, readings):
+        """Escribe las lecturas en el frame y lo envía con una sola escritura"""
+        view[status_off : status_off + STATUS_WIDTH] = _fit(
+            STATUS_FMT % (measurement_count, _timestamp(), error_count), STATUS_WIDTH
+        )
 
-    # Actualizar datos de cada sensor
-    row = 6
-    for i, (addr, sensor) in enumerate(sensors):
-        data = read_sensor_data(sensor)
-
-        if data is not None:
-            # Voltaje y Corriente (fila 1)
-            print(TerminalControl.goto(row + 1, 13), end="")
-            print(f"{data['voltage']:7.4f}", end="")
-
-            print(TerminalControl.goto(row + 1, 34), end="")
-            print(f"{data['current']:+8.4f}", end="")
-
-            # Temperatura
-            print(TerminalControl.goto(row + 1, 55), end="")
-            if not (data["temperature"] != data["temperature"]):  # Check for NaN
-                print(f"{data['temperature']:6.1f}", end="")
-            else:
-                print("  N/A ", end="")
-
-            # Potencia y Energía (fila 2)
-            print(TerminalControl.goto(row + 2, 13), end="")
-            print(f"{data['power']:7.4f}", end="")
-
-            print(TerminalControl.goto(row + 2, 34), end="")
-            print(f"{data['energy']:9.4f}", end="")
-        else:
-            # Mostrar ERROR en caso de falla de lectura
-            print(TerminalControl.goto(row + 1, 13), end="")
-            print("  ERROR ", end="")
-            print(TerminalControl.goto(row + 1, 34), end="")
-            print("   ERROR  ", end="")
-            print(TerminalControl.goto(row + 1, 55), end="")
-            print(" ERROR", end="")
-            print(TerminalControl.goto(row + 2, 13), end="")
-            print("  ERROR ", end="")
-            print(TerminalControl.goto(row + 2, 34), end="")
-            print("    ERROR   ", end="")
-
-        row += 5
-
-    # Forzar actualización del terminal
+        for fields, (addr, data) in zip(field_offsets, readings):
+            if data is None:
+                # Mostrar ERROR en caso de falla de lectura
+                for (off, w, _fmt, _key), text in zip(fields, errors):
+                    view[off : off + w] = text
+                continue
+
+            for off, w, fmt, key in fields:
+                value = data[key]
+                if value == value:
+                    view[off : off + w] = _fit(fmt % value, w)
+                else:  # NaN
+                    view[off : off + w] = b"N/A".rjust(w)
+
+        # Vaciar texto pendiente de print() y enviar el frame completo de una vez
+        sys.stdout.flush()
+        sys.stdout.buffer.write(frame)
+        sys.stdout.buffer.flush()
+
+    sys.stdout.write(TerminalControl.CLEAR_SCREEN + TerminalControl.HIDE_CURSOR)
     sys.stdout.flush()
+    sys.stdout.buffer.write(frame)
+    sys.stdout.buffer.flush()
+
+    return render
 
 
 def print_calibration_info():
@@ -296,6 +401,41 @@ def print_calibration_info():
     print("=" * 65)
 
 
+def measurement_loop(render):
+    """Lee y refresca la pantalla cada UPDATE_INTERVAL segundos con plazos fijos"""
+    global measurement_count, error_count
+
+    next_time = time.monotonic() + UPDATE_INTERVAL
+    try:
+        # El hilo duerme hasta el siguiente plazo o hasta que se pida detener
+        while not stop_event.wait(max(0.0, next_time - time.monotonic())):
+            measurement_count += 1
+
+            # Una sola lectura por sensor, usada para errores y para la pantalla
+            readings = [(addr, read_sensor_data(sensor)) for addr, sensor in sensors]
+
+            # Contar errores (sensores activos que no responden)
+            current_errors = sum(
+                1
+                for (addr, sensor), (_, data) in zip(sensors, readings)
+                if sensor is not None and data is None
+            )
+
+            if current_errors > 0:
+                error_count += 1
+
+            # Actualizar pantalla
+            render(measurement_count, error_count, readings)
+
+            next_time += UPDATE_INTERVAL
+    except Exception as e:
+        print(TerminalControl.SHOW_CURSOR, end="")
+        print(TerminalControl.CLEAR_SCREEN, end="")
+        print(TerminalControl.HOME_CURSOR, end="")
+        print(f"Error crítico: {e}")
+        stop_event.set()
+
+
 # ======================== FUNCIÓN PRINCIPAL ========================
 def main():
     global running
@@ -315,46 +455,20 @@ def main():
     input()
 
     # Configurar pantalla estática
-    setup_display()
+    render = setup_display()
 
-    measurement_count = 0
-    error_count = 0
-    last_measurement_time = time.time()
+    # El refresco corre en un hilo temporizado; el hilo principal queda dormido
+    # en join() (interrumpible por Ctrl+C) en lugar de despertar cada 50 ms
+    worker = threading.Thread(target=measurement_loop, args=(render,), daemon=True)
+    worker.start()
 
     try:
-        while running:
-            current_time = time.time()
-
-            # Actualizar cada segundo
-            if current_time - last_measurement_time >= 1.0:
-                measurement_count += 1
-
-                # Contar errores (sensores que no responden)
-                current_errors = 0
-                for addr, sensor in sensors:
-                    if sensor is not None:
-                        data = read_sensor_data(sensor)
-                        if data is None:
-                            current_errors += 1
-
-                if current_errors > 0:
-                    error_count += 1
-
-                # Actualizar pantalla
-                update_display(measurement_count, error_count)
-
-                last_measurement_time = current_time
-
-            # Pequeña pausa para no saturar el CPU
-            time.sleep(0.05)
-
-    except Exception as e:
-        print(TerminalControl.SHOW_CURSOR, end="")
-        print(TerminalControl.CLEAR_SCREEN, end="")
-        print(TerminalControl.HOME_CURSOR, end="")
-        print(f"Error crítico: {e}")
+        worker.join()
 
     finally:
+        stop_event.set()
+        worker.join()
+
         # Restaurar terminal
         print(TerminalControl.SHOW_CURSOR, end="")
         print(TerminalControl.CLEAR_SCREEN, end="")
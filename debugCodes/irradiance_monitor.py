@@ -3,57 +3,82 @@
 
 import signal
 import sys
+import threading
 import time
-from datetime import datetime
 
 import adafruit_ads1x15.ads1115 as ADS
 import board
 import busio
-import RPi.GPIO as GPIO
+import pigpio
+from adafruit_ads1x15.ads1x15 import Mode
 from adafruit_ads1x15.analog_in import AnalogIn
 
 # ======================== CONFIGURACIÓN GPIO ========================
-# Limpiar GPIO antes de configurar
-try:
-    GPIO.cleanup()
-except:
-    pass
-
-GPIO.setmode(GPIO.BCM)
-GPIO.setwarnings(False)
-
 # MUX Control Pins para el sensor de irradiancia
 MUX_S0 = 17  # LSB
 MUX_S1 = 27
 MUX_S2 = 22  # MSB
 
+# Los tres pines del MUX se escriben juntos en el banco 0-31 (cambio atómico)
+MUX_MASK = (1 << MUX_S0) | (1 << MUX_S1) | (1 << MUX_S2)
+MUX_SETTLE_S = 0.001  # Conmutación del 74HC4051 es < 1 µs; 1 ms de margen
+
 # ======================== CONFIGURACIÓN SENSORES ========================
 # Factor de calibración del sensor de irradiancia
 IRRADIANCE_CALIBRATION_FACTOR = 1000.0 / 75.0
 
+# ADS1115 en modo continuo: tras cambiar el MUX basta esperar dos conversiones
+# completas (la que estaba en curso y una nueva) más margen para el RC de entrada
+ADS_DATA_RATE = 860  # muestras por segundo
+ADS_SETTLE_S = 2.0 / ADS_DATA_RATE + 0.005
+
+MEASUREMENT_INTERVAL = 2.0  # Segundos entre mediciones
+
 # Variables globales
+pi = None
 ads = None
 adc_channels = []
 running = True
+stop_event = threading.Event()
+measurement_count = 0
 
 
 # ======================== FUNCIONES AUXILIARES ========================
+# Hora HH:MM:SS en caché: solo se reformatea cuando cambia el segundo
+_ts_cache = [-1, ""]
+
+
+def _timestamp():
+    """Devuelve la hora actual HH:MM:SS como texto, cacheada por segundo"""
+    now = int(time.time())
+    if now != _ts_cache[0]:
+        _ts_cache[0] = now
+        _ts_cache[1] = time.strftime("%H:%M:%S", time.localtime(now))
+    return _ts_cache[1]
+
+
 def signal_handler(sig, frame):
     """Maneja la señal Ctrl+C para terminar limpiamente"""
     global running
     print("\n\nDeteniendo monitor de irradiancia...")
     running = False
+    stop_event.set()
 
 
 def initialize_hardware():
     """Inicializa el hardware necesario para medir irradiancia"""
-    global ads, adc_channels
+    global pi, ads, adc_channels
 
     print("Inicializando hardware para medición de irradiancia...")
 
-    # GPIO Setup para MUX
+    # GPIO Setup para MUX (pigpiod)
     try:
-        GPIO.setup([MUX_S0, MUX_S1, MUX_S2], GPIO.OUT)
+        pi = pigpio.pi()
+        if not pi.connected:
+            print("Error: pigpiod no está corriendo (iniciar con: sudo pigpiod)")
+            return False
+        for pin in (MUX_S0, MUX_S1, MUX_S2):
+            pi.set_mode(pin, pigpio.OUTPUT)
         print("✓ GPIO para MUX configurado")
     except Exception as e:
         print(f"Error configurando GPIO para MUX: {e}")
@@ -73,6 +98,8 @@ def initialize_hardware():
         try:
             ads = ADS.ADS1115(i2c, address=0x48)
             ads.gain = 1
+            ads.data_rate = ADS_DATA_RATE
+            ads.mode = Mode.CONTINUOUS
             adc_channels = [AnalogIn(ads, ADS.P1)]  # A1 -> Z3 (MUX3) para irradiancia
             print("✓ ADS1115 inicializado correctamente")
             return True
@@ -91,10 +118,14 @@ def initialize_hardware():
 def set_mux_channel(channel):
     """Configura el canal del multiplexor (0-7)"""
     try:
-        GPIO.output(MUX_S0, channel & 0x01)
-        GPIO.output(MUX_S1, (channel >> 1) & 0x01)
-        GPIO.output(MUX_S2, (channel >> 2) & 0x01)
-        time.sleep(0.1)  # Tiempo de estabilización del MUX (0.1s para irradiancia)
+        bits = (
+            ((channel & 0x01) << MUX_S0)
+            | (((channel >> 1) & 0x01) << MUX_S1)
+            | (((channel >> 2) & 0x01) << MUX_S2)
+        )
+        pi.clear_bank_1(MUX_MASK & ~bits)
+        pi.set_bank_1(bits)
+        time.sleep(MUX_SETTLE_S)  # Tiempo de estabilización del MUX
         return True
     except Exception as e:
         print(f"Error configurando canal MUX {channel}: {e}")
@@ -110,16 +141,17 @@ def read_irradiance():
         # IRR- (Y4 - canal 4 del MUX)
         if not set_mux_channel(4):
             return None, None
-        time.sleep(0.1)  # Tiempo de estabilización del ADS después del cambio de canal
+        time.sleep(ADS_SETTLE_S)  # Esperar conversión posterior al cambio de canal
         voltage_minus = adc_channels[0].voltage
 
         # IRR+ (Y5 - canal 5 del MUX)
         if not set_mux_channel(5):
             return None, None
-        time.sleep(0.1)  # Tiempo de estabilización del ADS después del cambio de canal
+        time.sleep(ADS_SETTLE_S)  # Esperar conversión posterior al cambio de canal
         voltage_plus = adc_channels[0].voltage
 
-        # Calcular diferencial
+        # Calcular diferencial (IRR+ e IRR- comparten la salida Z3 del MUX hacia A1,
+        # por eso no se puede usar el modo diferencial por hardware del ADS1115)
         irradiance_voltage = abs(voltage_plus - voltage_minus)
         irradiance_voltage_mV = irradiance_voltage * 1000.0
         irradiance_wm2 = irradiance_voltage_mV * IRRADIANCE_CALIBRATION_FACTOR
@@ -133,7 +165,7 @@ def read_irradiance():
 
 def print_measurement(voltage, irradiance, measurement_count):
     """Imprime la medición en pantalla"""
-    timestamp = datetime.now().strftime("%H:%M:%S")
+    timestamp = _timestamp()
     if voltage is not None and irradiance is not None:
         print(
             f"[{timestamp}] Medición #{measurement_count:04d} - "
@@ -143,12 +175,32 @@ def print_measurement(voltage, irradiance, measurement_count):
         print(f"[{timestamp}] Medición #{measurement_count:04d} - ERROR en lectura")
 
 
+def measurement_loop():
+    """Mide cada MEASUREMENT_INTERVAL segundos con plazos fijos (sin deriva)"""
+    global measurement_count
+
+    next_time = time.monotonic() + MEASUREMENT_INTERVAL
+    try:
+        # El hilo duerme hasta el siguiente plazo o hasta que se pida detener
+        while not stop_event.wait(max(0.0, next_time - time.monotonic())):
+            measurement_count += 1
+
+            # Leer irradiancia
+            voltage, irradiance = read_irradiance()
+
+            # Mostrar en pantalla
+            print_measurement(voltage, irradiance, measurement_count)
+
+            next_time += MEASUREMENT_INTERVAL
+    except Exception as e:
+        print(f"\nError crítico: {e}")
+        stop_event.set()
+
+
 # ======================== FUNCIÓN PRINCIPAL ========================
 def main():
-    global running
-
     print("=== MONITOR DE IRRADIANCIA SOLAR ===")
-    print("Mediciones cada 2 segundos")
+    print(f"Mediciones cada {MEASUREMENT_INTERVAL:.0f} segundos")
     print("Presiona Ctrl+C para detener\n")
 
     # Configurar manejo de señales
@@ -164,41 +216,28 @@ def main():
         "Formato: [Hora] Medición #XXXX - Voltaje: XXX.XXXmV, Irradiancia: XXX.XX W/m²\n"
     )
 
-    measurement_count = 0
-    last_measurement_time = time.time()
+    # Las mediciones corren en un hilo temporizado; el hilo principal queda dormido
+    # en join() (interrumpible por Ctrl+C) en lugar de despertar cada 100 ms
+    worker = threading.Thread(target=measurement_loop, daemon=True)
+    worker.start()
 
     try:
-        while running:
-            current_time = time.time()
-
-            # Medir cada 2 segundos
-            if current_time - last_measurement_time >= 2.0:
-                measurement_count += 1
-
-                # Leer irradiancia
-                voltage, irradiance = read_irradiance()
-
-                # Mostrar en pantalla
-                print_measurement(voltage, irradiance, measurement_count)
-
-                last_measurement_time = current_time
-
-            # Pequeña pausa para no saturar el CPU
-            time.sleep(0.1)
-
-    except Exception as e:
-        print(f"\nError crítico: {e}")
+        worker.join()
 
     finally:
+        stop_event.set()
+        worker.join()
+
         print(f"\n=== FINALIZANDO ===")
         print(f"Total de mediciones realizadas: {measurement_count}")
 
-        # Limpiar GPIO
+        # Liberar conexión con pigpiod
         try:
-            GPIO.cleanup()
-            print("✓ GPIO limpiado")
+            if pi is not None:
+                pi.stop()
+            print("✓ GPIO liberado")
         except Exception as e:
-            print(f"Error limpiando GPIO: {e}")
+            print(f"Error liberando GPIO: {e}")
 
         print("Monitor terminado correctamente")
 
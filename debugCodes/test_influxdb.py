@@ -8,17 +8,20 @@ Uso: python test_influxdb.py
 
 import os
 import sys
-import time
 from datetime import datetime
 
-# Agregar path del directorio actual para importar influxdb_sender
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+# Importar el único influxdb_sender del sistema (source/), no una copia local
+sys.path.insert(
+    0,
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "source"),
+)
 
 try:
     from influxdb_sender import (
         close_influxdb,
-        init_influxdb,
-        send_measurement_to_influx,
+        flush_influx,
+        get_client,
+        queue_measurement,
         test_influx_connection,
     )
 
@@ -52,7 +55,7 @@ def validate_environment():
 
 
 def test_complete_measurement():
-    """Envía datos simulados completos del sistema"""
+    """Encola datos simulados completos del sistema"""
     print("\n=== TEST DATOS COMPLETOS ===")
 
     # Datos simulados realistas del sistema solar
@@ -100,18 +103,18 @@ def test_complete_measurement():
         "dht_humidity": 68.5,  # Humedad relativa %
     }
 
-    success = send_measurement_to_influx(measurement_data)
+    success = queue_measurement(measurement_data)
 
     if success:
-        print("✓ Datos completos enviados exitosamente")
+        print("✓ Datos completos encolados")
         return True
     else:
-        print("✗ Error enviando datos completos")
+        print("✗ Error creando punto con datos completos")
         return False
 
 
 def test_partial_measurement():
-    """Envía datos parciales simulando sensores con fallas"""
+    """Encola datos parciales simulando sensores con fallas"""
     print("\n=== TEST DATOS PARCIALES ===")
 
     # Simular algunos sensores con falla (valores None o ausentes)
@@ -133,13 +136,13 @@ def test_partial_measurement():
         "dht_humidity": 72.1,
     }
 
-    success = send_measurement_to_influx(partial_data)
+    success = queue_measurement(partial_data)
 
     if success:
-        print("✓ Datos parciales enviados exitosamente")
+        print("✓ Datos parciales encolados")
         return True
     else:
-        print("✗ Error enviando datos parciales")
+        print("✗ Error creando punto con datos parciales")
         return False
 
 
@@ -155,7 +158,7 @@ def main():
 
     # Paso 1: Inicializar conexión
     print("1. Inicializando conexión InfluxDB...")
-    if not init_influxdb():
+    if get_client() is None:
         print("✗ No se pudo conectar a InfluxDB")
         print("   Verifica las credenciales y la conectividad de red")
         return False
@@ -168,17 +171,22 @@ def main():
         return False
 
     # Paso 3: Test datos completos
-    time.sleep(2)  # Esperar entre envíos
     if not test_complete_measurement():
         close_influxdb()
         return False
 
     # Paso 4: Test datos parciales
-    time.sleep(2)
     if not test_partial_measurement():
         close_influxdb()
         return False
 
+    # Ambos puntos se envían juntos en una sola petición
+    print("\nEnviando lote de datos completos + parciales...")
+    if not flush_influx():
+        print("✗ Error enviando el lote a InfluxDB")
+        close_influxdb()
+        return False
+
     # Paso 5: Cerrar conexión
     print("\n5. Cerrando conexión...")
     close_influxdb()
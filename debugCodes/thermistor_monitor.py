@@ -3,18 +3,36 @@
 
 import math
 import os
+import queue
 import signal
+import statistics
 import sys
+import threading
 import time
-from datetime import datetime
+import warnings
 
 import adafruit_ads1x15.ads1115 as ADS
 import adafruit_dht
 import board
 import busio
 import RPi.GPIO as GPIO
+from adafruit_ads1x15.ads1x15 import Mode
 from adafruit_ads1x15.analog_in import AnalogIn
 
+try:
+    import numpy as np
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+try:
+    from numba import njit
+
+    NUMBA_AVAILABLE = NUMPY_AVAILABLE
+except ImportError:
+    NUMBA_AVAILABLE = False
+
 # ======================== CONFIGURACIÓN GPIO ========================
 # Limpiar GPIO antes de configurar
 try:
@@ -29,10 +47,16 @@ GPIO.setwarnings(False)
 MUX_S0 = 17  # LSB
 MUX_S1 = 27
 MUX_S2 = 22  # MSB
+MUX_PINS = [MUX_S0, MUX_S1, MUX_S2]
+MUX_SETTLE_S = 0.001  # Conmutación del 74HC4051 es < 1 µs; 1 ms cubre el RC del divisor
 
 # DHT22 Pin
 DHT22_PIN = 5
 
+# Períodos de lectura (segundos)
+MEASUREMENT_INTERVAL = 1.0
+DHT_INTERVAL = 3.0  # El DHT22 no admite lecturas más seguidas que ~2 s
+
 # ======================== CONFIGURACIÓN SENSORES MEJORADA ========================
 # VCC del divisor de voltaje medido con precisión
 VCC = 3.294  # Voltaje real del sistema
@@ -61,15 +85,49 @@ THERMISTOR_REF_RESISTANCES = {
     "T19": 10000,  # 10.00kΩ
 }
 
+# ADS1115 en modo continuo: tras cambiar el MUX basta esperar dos conversiones
+# completas (la que estaba en curso y una nueva) más margen para el RC de entrada.
+# La última conversión completa empieza >= MUX_SETTLE_S después del cambio, por lo
+# que esta espera ya incluye la estabilización del MUX
+ADS_DATA_RATE = 860  # muestras por segundo
+ADS_SETTLE_S = 2.0 / ADS_DATA_RATE + MUX_SETTLE_S
+
+# Lectura directa del registro de conversión (sin pasar por AnalogIn.voltage)
+_REG_CONVERSION = bytes([0x00])
+ADS_VOLTS_PER_LSB = 4.096 / 32767  # gain = 1 (±4.096 V), misma escala que AnalogIn
+_ADC_BUF = bytearray(2)
+
 # Constantes para ecuación Beta
 B = 3435.0
 T0 = 298.15
+INV_T0 = 1.0 / T0
+INV_B = 1.0 / B
+
+NUM_THERMISTORS = 20
+SENSOR_NAMES = tuple(f"T{i}" for i in range(NUM_THERMISTORS))  # Claves "T0".."T19"
+MEDIAN_WINDOW = (
+    3  # Lecturas por canal combinadas con mediana (descarta fallos aislados)
+)
+
+# Barrido de los MUX: (índice en adc_channels, canales usados, primer termistor)
+MUX_SWEEP = (
+    (0, 8, 0),  # MUX1: T0-T7 (Z1 -> A3)
+    (1, 8, 8),  # MUX2: T8-T15 (Z2 -> A2)
+    (2, 4, 16),  # MUX3: T16-T19 (Z3 -> A1)
+)
+
+# Resistencias de referencia y su log(R0) indexadas por canal (0-19), sin armar ni
+# hashear claves "Tn" en los cálculos; el dict queda para mostrar la calibración
+THERMISTOR_REF = tuple(THERMISTOR_REF_RESISTANCES[name] for name in SENSOR_NAMES)
+THERMISTOR_LOG_REF = tuple(math.log(r_ref) for r_ref in THERMISTOR_REF)
 
 # Variables globales
 ads = None
 adc_channels = []
 dhtDevice = None
-running = True
+# Última foto de datos para el hilo de pantalla (un solo lugar: gana la más nueva)
+latest_snapshot = queue.Queue(maxsize=1)
+STOP = threading.Event()  # Se activa con Ctrl+C; despierta la espera del lazo
 
 
 # ======================== CÓDIGOS ANSI PARA TERMINAL ESTÁTICO ========================
@@ -88,15 +146,35 @@ class TerminalControl:
         return "\033[K"
 
 
+# Secuencias goto precalculadas para los campos que update_display refresca
+ROW_PREFIX_L = tuple(TerminalControl.goto(8 + i, 10) for i in range(10))
+ROW_PREFIX_R = tuple(TerminalControl.goto(8 + i, 45) for i in range(10))
+GOTO_STATUS = TerminalControl.goto(22, 11)
+GOTO_DHT_TEMP = TerminalControl.goto(20, 24)
+GOTO_DHT_HUMIDITY = TerminalControl.goto(20, 47)
+
+
 # ======================== FUNCIONES AUXILIARES ========================
+# Hora HH:MM:SS en caché: solo se reformatea cuando cambia el segundo
+_ts_cache = [-1, ""]
+
+
+def _timestamp():
+    """Devuelve la hora actual HH:MM:SS como texto, cacheada por segundo"""
+    now = int(time.time())
+    if now != _ts_cache[0]:
+        _ts_cache[0] = now
+        _ts_cache[1] = time.strftime("%H:%M:%S", time.localtime(now))
+    return _ts_cache[1]
+
+
 def signal_handler(sig, frame):
     """Maneja la señal Ctrl+C para terminar limpiamente"""
-    global running
     print(TerminalControl.SHOW_CURSOR, end="")
     print(TerminalControl.CLEAR_SCREEN, end="")
     print(TerminalControl.HOME_CURSOR, end="")
     print("\nDeteniendo monitor de termistores...")
-    running = False
+    STOP.set()
 
 
 def initialize_hardware():
@@ -107,7 +185,7 @@ def initialize_hardware():
 
     # GPIO Setup para MUX
     try:
-        GPIO.setup([MUX_S0, MUX_S1, MUX_S2], GPIO.OUT)
+        GPIO.setup(MUX_PINS, GPIO.OUT)
         print("✓ GPIO para MUX configurado")
     except Exception as e:
         print(f"Error configurando GPIO para MUX: {e}")
@@ -135,6 +213,8 @@ def initialize_hardware():
         try:
             ads = ADS.ADS1115(i2c, address=0x48)
             ads.gain = 1
+            ads.data_rate = ADS_DATA_RATE
+            ads.mode = Mode.CONTINUOUS
             adc_channels = [
                 AnalogIn(ads, ADS.P3),  # A3 -> Z1 (MUX1) -> T0-T7
                 AnalogIn(ads, ADS.P2),  # A2 -> Z2 (MUX2) -> T8-T15
@@ -154,107 +234,164 @@ def initialize_hardware():
     return False
 
 
-def set_mux_channel(channel):
-    """Configura el canal del multiplexor (0-7)"""
+def set_mux_channel(channel, settle=True):
+    """Configura el canal del multiplexor (0-7); settle=False deja la espera al llamador"""
     try:
-        GPIO.output(MUX_S0, channel & 0x01)
-        GPIO.output(MUX_S1, (channel >> 1) & 0x01)
-        GPIO.output(MUX_S2, (channel >> 2) & 0x01)
-        time.sleep(0.01)  # Tiempo de estabilización
+        # Los tres pines en una sola llamada a la librería C
+        GPIO.output(
+            MUX_PINS, (channel & 0x01, (channel >> 1) & 0x01, (channel >> 2) & 0x01)
+        )
+        if settle:
+            time.sleep(MUX_SETTLE_S)  # Tiempo de estabilización
         return True
     except Exception as e:
         return False
 
 
-def calculate_resistance(voltage, thermistor_id, vcc=VCC):
-    """Calcula resistencia del termistor usando resistencia de referencia específica"""
+def calculate_resistance(voltage, channel, vcc=VCC):
+    """Calcula resistencia del termistor (canal 0-19) con su resistencia de referencia"""
     if voltage <= 0 or voltage >= vcc:
         return float("inf")
 
-    # Obtener resistencia de referencia específica para este termistor
-    r_ref = THERMISTOR_REF_RESISTANCES.get(thermistor_id, 10000)  # fallback a 10kΩ
-
-    return r_ref * voltage / (vcc - voltage)
+    return THERMISTOR_REF[channel] * voltage / (vcc - voltage)
 
 
-def calculate_temperature(resistance, thermistor_id):
+def calculate_temperature(resistance, channel):
     """Calcula temperatura usando Steinhart-Hart Simplificado"""
     if resistance <= 0 or math.isinf(resistance):
         return float("nan")
 
-    try:
-        # Usar la resistencia de referencia específica de cada termistor como R0
-        R0 = THERMISTOR_REF_RESISTANCES.get(thermistor_id, 10000.0)  # fallback a 10kΩ
-
-        T_kelvin = 1 / ((1 / T0) + (1 / B) * math.log(resistance / R0))
-        return T_kelvin - 273.15
-    except:
-        return float("nan")
+    # R0 de cada termistor es su resistencia de referencia; log(R0) ya está en tabla
+    log_ref = THERMISTOR_LOG_REF[channel]
+    T_kelvin = 1.0 / (INV_T0 + INV_B * (math.log(resistance) - log_ref))
+    return T_kelvin - 273.15
+
+
+if NUMBA_AVAILABLE:
+    # Sin fastmath: los NaN de lecturas fallidas deben seguir comparándose bien
+    @njit(cache=True)
+    def thermistor_compute(voltages, out, inv_t0, inv_b, vcc):
+        """Kernel compilado: voltajes -> temperaturas en el arreglo 'out'"""
+        for i in range(voltages.shape[0]):
+            v = voltages[i]
+            if v > 0.0 and v < vcc:
+                out[i] = 1.0 / (inv_t0 + inv_b * np.log(v / (vcc - v))) - 273.15
+            else:
+                out[i] = np.nan
+
+    # Buffers reutilizados en cada ciclo y compilación al arrancar, no en la 1ª medición
+    _voltages = np.full(NUM_THERMISTORS, np.nan)
+    _temps = np.empty(NUM_THERMISTORS)
+    thermistor_compute(_voltages, _temps, INV_T0, INV_B, VCC)
+else:
+    _voltages = [float("nan")] * NUM_THERMISTORS
+
+
+def compute_temperatures(voltages):
+    """Convierte los 20 voltajes del barrido en temperaturas (NaN si inválido).
+
+    Como R0 de cada termistor es su propia resistencia de referencia, en
+    log(R / R0) = log(r_ref * V / (VCC - V) / r_ref) la referencia se cancela y
+    queda un único log(V / (VCC - V)) por canal.
+    """
+    if NUMBA_AVAILABLE:
+        v = np.asarray(voltages, dtype=np.float64)
+        thermistor_compute(v, _temps, INV_T0, INV_B, VCC)
+        return _temps.tolist()
+
+    if NUMPY_AVAILABLE:
+        v = np.asarray(voltages, dtype=np.float64)
+        valid = (v > 0) & (v < VCC)  # NaN de lecturas fallidas queda como inválido
+        with np.errstate(divide="ignore", invalid="ignore"):
+            temps = 1.0 / (INV_T0 + INV_B * np.log(v / (VCC - v))) - 273.15
+        return np.where(valid, temps, np.nan).tolist()
+
+    nan = float("nan")
+    log = math.log
+    return [
+        1.0 / (INV_T0 + INV_B * log(v / (VCC - v))) - 273.15 if 0 < v < VCC else nan
+        for v in voltages
+    ]
+
+
+def read_conversion(device):
+    """Lee en voltios el último resultado del ADS1115 con una sola transacción I2C"""
+    with device as d:
+        d.write_then_readinto(_REG_CONVERSION, _ADC_BUF)
+    return int.from_bytes(_ADC_BUF, "big", signed=True) * ADS_VOLTS_PER_LSB
+
+
+def hw_sample(voltages_out):
+    """Barre los MUX y guarda el voltaje de cada termistor (NaN si falla).
+
+    El rango de cada voltaje se valida después, en compute_temperatures; aquí solo
+    se atrapan fallas reales del bus, una vez por grupo de MUX y no por canal.
+    """
+    for i in range(NUM_THERMISTORS):
+        voltages_out[i] = float("nan")
+
+    device = getattr(ads, "i2c_device", None)
+
+    for adc_index, channels, first in MUX_SWEEP:
+        adc = adc_channels[adc_index]
+        try:
+            if device is not None:
+                # Una lectura por la librería selecciona la entrada del ADS (escribe
+                # el registro de config); el resto del grupo lee la conversión directo
+                adc.value
+            for ch in range(channels):
+                # La estabilización del MUX transcurre durante las conversiones
+                # que de todos modos se esperan: una sola espera, no dos seguidas
+                if not set_mux_channel(ch, settle=False):
+                    continue
+                time.sleep(ADS_SETTLE_S)
+                if device is not None:
+                    voltages_out[first + ch] = read_conversion(device)
+                else:
+                    voltages_out[first + ch] = adc.voltage
+        except (OSError, RuntimeError, ValueError):
+            # Falla del bus I2C: los canales restantes del grupo quedan en NaN
+            continue
+
+
+# Anillo con las últimas MEDIAN_WINDOW temperaturas por canal para el filtro de mediana
+if NUMPY_AVAILABLE:
+    _temp_ring = np.full((NUM_THERMISTORS, MEDIAN_WINDOW), np.nan)
+else:
+    _temp_ring = [[float("nan")] * MEDIAN_WINDOW for _ in range(NUM_THERMISTORS)]
+_ring_pos = 0
+
+
+def median_filter(temps):
+    """Guarda las temperaturas en el anillo y devuelve la mediana por canal sin NaN"""
+    global _ring_pos
+    pos = _ring_pos
+    _ring_pos = (pos + 1) % MEDIAN_WINDOW
+
+    if NUMPY_AVAILABLE:
+        _temp_ring[:, pos] = temps
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)  # Canal sin datos válidos
+            return np.nanmedian(_temp_ring, axis=1).tolist()
+
+    filtered = []
+    for ring, temp in zip(_temp_ring, temps):
+        ring[pos] = temp
+        valid = [t for t in ring if t == t]
+        filtered.append(statistics.median(valid) if valid else float("nan"))
+    return filtered
 
 
 def read_all_thermistors():
     """Lee todos los termistores T0-T19"""
-    temperatures = {}
-
     if ads is None or len(adc_channels) < 3:
-        return temperatures
-
-    try:
-        # MUX1: T0-T7 (Z1 -> A3)
-        for ch in range(8):
-            thermistor_id = f"T{ch}"
-            if set_mux_channel(ch):
-                try:
-                    voltage = adc_channels[0].voltage
-                    if voltage is not None:
-                        resistance = calculate_resistance(voltage, thermistor_id)
-                        temp = calculate_temperature(resistance, thermistor_id)
-                        temperatures[thermistor_id] = temp
-                    else:
-                        temperatures[thermistor_id] = float("nan")
-                except:
-                    temperatures[thermistor_id] = float("nan")
-            else:
-                temperatures[thermistor_id] = float("nan")
-
-        # MUX2: T8-T15 (Z2 -> A2)
-        for ch in range(8):
-            thermistor_id = f"T{ch+8}"
-            if set_mux_channel(ch):
-                try:
-                    voltage = adc_channels[1].voltage
-                    if voltage is not None:
-                        resistance = calculate_resistance(voltage, thermistor_id)
-                        temp = calculate_temperature(resistance, thermistor_id)
-                        temperatures[thermistor_id] = temp
-                    else:
-                        temperatures[thermistor_id] = float("nan")
-                except:
-                    temperatures[thermistor_id] = float("nan")
-            else:
-                temperatures[thermistor_id] = float("nan")
-
-        # MUX3: T16-T19 (Z3 -> A1)
-        for ch in range(4):
-            thermistor_id = f"T{ch+16}"
-            if set_mux_channel(ch):
-                try:
-                    voltage = adc_channels[2].voltage
-                    if voltage is not None:
-                        resistance = calculate_resistance(voltage, thermistor_id)
-                        temp = calculate_temperature(resistance, thermistor_id)
-                        temperatures[thermistor_id] = temp
-                    else:
-                        temperatures[thermistor_id] = float("nan")
-                except:
-                    temperatures[thermistor_id] = float("nan")
-            else:
-                temperatures[thermistor_id] = float("nan")
-
-    except Exception as e:
-        pass
+        return {}
 
-    return temperatures
+    # Primero se barren los MUX guardando voltajes; la conversión es un solo paso
+    hw_sample(_voltages)
+    # Una lectura fallida aislada no deja el canal en ERROR: mediana de las últimas 3
+    temps = median_filter(compute_temperatures(_voltages))
+    return dict(zip(SENSOR_NAMES, temps))
 
 
 def read_dht22():
@@ -298,8 +435,6 @@ def setup_display():
     for i in range(10):  # 10 filas para 20 sensores
         row = 8 + i
         print(TerminalControl.goto(row, 1), end="")
-        r_ref_left = THERMISTOR_REF_RESISTANCES[f"T{i}"]
-        r_ref_right = THERMISTOR_REF_RESISTANCES[f"T{i+10}"]
         print(f"    T{i:02d}                         T{i+10:02d}                ")
 
     # Sección DHT22
@@ -320,56 +455,65 @@ def setup_display():
 
 
 def update_display(temperatures, measurement_count, errors, dht_temp, dht_humidity):
-    """Actualiza los valores en la pantalla estática"""
-    timestamp = datetime.now().strftime("%H:%M:%S")
+    """Actualiza los valores en la pantalla estática con una sola escritura"""
+    timestamp = _timestamp()
+    nan = float("nan")
 
     # Actualizar timestamp y contador
-    print(TerminalControl.goto(22, 11), end="")
-    print(f"Medición #{measurement_count:05d} - {timestamp} - Errores: {errors}     ")
+    parts = [
+        GOTO_STATUS,
+        f"Medición #{measurement_count:05d} - {timestamp} - Errores: {errors}     \n",
+    ]
 
-    # Actualizar temperaturas (T0-T19 en dos columnas)
+    # Actualizar temperaturas (T0-T19 en dos columnas, 3 decimales de precisión)
     for i in range(10):
-        row = 8 + i
-
         # Columna izquierda (T0-T9)
-        sensor_left = f"T{i}"
-        temp_left = temperatures.get(sensor_left, float("nan"))
-        if math.isnan(temp_left):
-            temp_str_left = "  ERROR  "
-        else:
-            temp_str_left = f"{temp_left:7.3f}°C"  # 3 decimales para mostrar precisión
-
-        print(TerminalControl.goto(row, 10), end="")
-        print(temp_str_left, end="")
+        temp_left = temperatures.get(SENSOR_NAMES[i], nan)
+        parts.append(ROW_PREFIX_L[i])
+        parts.append("  ERROR  " if math.isnan(temp_left) else f"{temp_left:7.3f}°C")
 
         # Columna derecha (T10-T19)
-        sensor_right = f"T{i+10}"
-        temp_right = temperatures.get(sensor_right, float("nan"))
-        if math.isnan(temp_right):
-            temp_str_right = "  ERROR  "
-        else:
-            temp_str_right = (
-                f"{temp_right:7.3f}°C"  # 3 decimales para mostrar precisión
-            )
-
-        print(TerminalControl.goto(row, 45), end="")
-        print(temp_str_right, end="")
+        temp_right = temperatures.get(SENSOR_NAMES[i + 10], nan)
+        parts.append(ROW_PREFIX_R[i])
+        parts.append("  ERROR  " if math.isnan(temp_right) else f"{temp_right:7.3f}°C")
 
     # Actualizar datos DHT22
-    print(TerminalControl.goto(20, 24), end="")
     if dht_temp is not None and dht_humidity is not None:
-        print(f"{dht_temp:6.2f}°C", end="")
-        print(TerminalControl.goto(20, 47), end="")
-        print(f"{dht_humidity:6.1f}%", end="")
+        parts += [
+            GOTO_DHT_TEMP,
+            f"{dht_temp:6.2f}°C",
+            GOTO_DHT_HUMIDITY,
+            f"{dht_humidity:6.1f}%",
+        ]
     else:
-        print("  ERROR ", end="")
-        print(TerminalControl.goto(20, 47), end="")
-        print("  ERROR", end="")
+        parts += [GOTO_DHT_TEMP, "  ERROR ", GOTO_DHT_HUMIDITY, "  ERROR"]
 
-    # Forzar actualización del terminal
+    # Un solo write y un solo flush por frame
+    sys.stdout.write("".join(parts))
     sys.stdout.flush()
 
 
+def publish_snapshot(snapshot):
+    """Entrega la última lectura al hilo de pantalla, reemplazando la no mostrada"""
+    try:
+        latest_snapshot.put_nowait(snapshot)
+    except queue.Full:
+        try:
+            latest_snapshot.get_nowait()
+        except queue.Empty:
+            pass
+        latest_snapshot.put_nowait(snapshot)  # Único productor: ya hay lugar
+
+
+def render_loop():
+    """Hilo de pantalla: dibuja cada foto publicada; None indica terminar"""
+    while True:
+        snapshot = latest_snapshot.get()
+        if snapshot is None:
+            return
+        update_display(*snapshot)
+
+
 def print_calibration_info():
     """Muestra información de calibración antes de iniciar"""
     print("\n" + "=" * 65)
@@ -381,8 +525,8 @@ def print_calibration_info():
 
     # Mostrar en dos columnas
     for i in range(10):
-        left_id = f"T{i}"
-        right_id = f"T{i+10}"
+        left_id = SENSOR_NAMES[i]
+        right_id = SENSOR_NAMES[i + 10]
         left_res = THERMISTOR_REF_RESISTANCES[left_id]
         right_res = THERMISTOR_REF_RESISTANCES[right_id]
 
@@ -407,8 +551,6 @@ def print_calibration_info():
 
 # ======================== FUNCIÓN PRINCIPAL ========================
 def main():
-    global running
-
     # Configurar manejo de señales
     signal.signal(signal.SIGINT, signal_handler)
 
@@ -423,32 +565,43 @@ def main():
     print("\nPresiona Enter para iniciar el monitor estático...")
     input()
 
-    # Configurar pantalla estática
+    # Configurar pantalla estática; una terminal lenta (SSH) ya no frena el muestreo
     setup_display()
+    render_thread = threading.Thread(target=render_loop, daemon=True)
+    render_thread.start()
 
     measurement_count = 0
     error_count = 0
     dht_error_count = 0
-    last_measurement_time = time.time()
-    last_dht_time = time.time()
+
+    # Plazos absolutos en reloj monotónico: se avanzan sumando el período, sin deriva
+    start = time.monotonic()
+    next_measurement = start + MEASUREMENT_INTERVAL
+    next_dht = start + DHT_INTERVAL
 
     # Variables para mantener últimos valores válidos del DHT22
     last_valid_dht_temp = None
     last_valid_dht_humidity = None
 
     try:
-        while running:
-            current_time = time.time()
+        while not STOP.is_set():
+            # Dormir exactamente hasta el siguiente plazo (el DHT22 va con la medición);
+            # Ctrl+C despierta la espera de inmediato
+            delay = next_measurement - time.monotonic()
+            if delay > 0 and STOP.wait(delay):
+                break
+
+            current_time = time.monotonic()
 
             # Leer sensores cada segundo
-            if current_time - last_measurement_time >= 1.0:
+            if current_time >= next_measurement:
                 measurement_count += 1
 
                 # Leer todos los termistores
                 temperatures = read_all_thermistors()
 
                 # Leer DHT22 cada 3 segundos
-                if current_time - last_dht_time >= 3.0:
+                if current_time >= next_dht:
                     new_dht_temp, new_dht_humidity = read_dht22()
                     if new_dht_temp is not None and new_dht_humidity is not None:
                         # Actualizar últimos valores válidos
@@ -457,7 +610,7 @@ def main():
                     else:
                         dht_error_count += 1
 
-                    last_dht_time = current_time
+                    next_dht += DHT_INTERVAL
 
                 # Contar errores de termistores
                 current_errors = sum(
@@ -467,18 +620,24 @@ def main():
                     error_count += 1
 
                 # Actualizar pantalla con últimos valores válidos del DHT22
-                update_display(
-                    temperatures,
-                    measurement_count,
-                    error_count,
-                    last_valid_dht_temp,
-                    last_valid_dht_humidity,
+                publish_snapshot(
+                    (
+                        temperatures,
+                        measurement_count,
+                        error_count,
+                        last_valid_dht_temp,
+                        last_valid_dht_humidity,
+                    )
                 )
 
-                last_measurement_time = current_time
+                next_measurement += MEASUREMENT_INTERVAL
 
-            # Pequeña pausa para no saturar el CPU
-            time.sleep(0.05)
+            # Si un ciclo se atrasó más de un período, no encadenar ciclos de recuperación
+            now = time.monotonic()
+            if next_measurement < now:
+                next_measurement = now + MEASUREMENT_INTERVAL
+            if next_dht < now:
+                next_dht = now + DHT_INTERVAL
 
     except Exception as e:
         print(TerminalControl.SHOW_CURSOR, end="")
@@ -487,6 +646,10 @@ def main():
         print(f"Error crítico: {e}")
 
     finally:
+        # Detener el hilo de pantalla antes de restaurar la terminal
+        publish_snapshot(None)
+        render_thread.join(timeout=2.0)
+
         # Restaurar terminal
         print(TerminalControl.SHOW_CURSOR, end="")
         print(TerminalControl.CLEAR_SCREEN, end="")
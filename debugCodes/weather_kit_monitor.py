@@ -1,23 +1,30 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import math
+import bisect
 import os
+import select
 import signal
 import sys
 import threading
 import time
-from datetime import datetime
 
 import adafruit_ads1x15.ads1115 as ADS
 import adafruit_dht
 import board
 import busio
+import pigpio
 import RPi.GPIO as GPIO
-from adafruit_ads1x15.analog_in import AnalogIn
 from gpiozero import Button, Device
 from gpiozero.pins.pigpio import PiGPIOFactory
 
+try:
+    import numpy as np
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
 # Configurar gpiozero para usar pigpio
 Device.pin_factory = PiGPIOFactory()
 
@@ -35,6 +42,17 @@ GPIO.setwarnings(False)
 MUX_S0 = 17  # LSB
 MUX_S1 = 27
 MUX_S2 = 22  # MSB
+MUX_SETTLE_S = 0.001  # Conmutación del 74HC4051 es < 1 µs; 1 ms de margen
+
+# Los tres pines del MUX se escriben juntos en el banco 0-31 por pigpiod:
+# bits a poner en alto para cada canal 0-7, calculados una sola vez
+MUX_MASK = (1 << MUX_S0) | (1 << MUX_S1) | (1 << MUX_S2)
+MUX_BANK_BITS = tuple(
+    ((channel & 0x01) << MUX_S0)
+    | (((channel >> 1) & 0x01) << MUX_S1)
+    | (((channel >> 2) & 0x01) << MUX_S2)
+    for channel in range(8)
+)
 
 # Sensores digitales
 DHT22_PIN = 5
@@ -45,19 +63,43 @@ RAIN_SENSOR_PIN = 6
 # VCC del divisor de voltaje
 VCC = 3.294  # Voltaje preciso del sistema
 
+# ADS1115 por registros: cada lectura escribe una palabra de configuración en
+# disparo único (OS=1, AINx vs GND, PGA ±4.096 V = gain 1, 860 SPS, comparador
+# apagado) y lee el registro de conversión, sin objetos AnalogIn por canal
+_REG_CONFIG = 0x01
+_REG_CONVERSION = bytes([0x00])
+_ADS_CONFIG_WORDS = tuple(
+    bytes([_REG_CONFIG, 0xC3 | (ain << 4), 0xE3]) for ain in range(4)
+)
+ADS_DATA_RATE = 860  # muestras por segundo
+ADS_CONVERSION_S = 1.2 / ADS_DATA_RATE  # Una conversión más margen de arranque
+ADS_VOLTS_PER_LSB = 4.096 / 32767  # gain = 1 (±4.096 V), misma escala que AnalogIn
+_ADC_BUF = bytearray(2)
+
+# Sensor de irradiancia: W/m² por mV del diferencial, y por cuenta del ADS1115
+IRRADIANCE_CALIBRATION_FACTOR = 1000.0 / 75.0
+IRRADIANCE_WM2_PER_COUNT = ADS_VOLTS_PER_LSB * 1000.0 * IRRADIANCE_CALIBRATION_FACTOR
+
+# Entradas del ADS1115 (A3 -> Z1 y A2 -> Z2 no se usan en este monitor)
+IRRADIANCE_AIN = 1  # A1 -> Z3 (MUX3)
+WIND_VANE_AIN = 0  # A0 -> Dirección del viento
+
 # DHT22
 dhtDevice = adafruit_dht.DHT22(board.D5, use_pulseio=False)
+DHT_INTERVAL = 3.0  # Segundos entre lecturas (el DHT22 admite una cada 2 s)
+DHT_STALE_S = 10.0  # Sin lectura válida en este lapso cuenta como error
 
 # Anemómetro
 KPH_PER_COUNT_PER_SEC = 2.4
+WIND_MS_PER_COUNT_PER_SEC = KPH_PER_COUNT_PER_SEC / 3.6  # km/h -> m/s
 MEASUREMENT_PERIOD = 1.0
-wind_count = 0
-last_wind_measurement = time.time()
+MEASUREMENT_INTERVAL = 1.0  # Segundos entre actualizaciones de pantalla
+last_wind_measurement = time.monotonic()
 
 # Sensor de lluvia
 MM_PER_TICK = 0.2794
-rain_count = 0
-rain_count_total = 0  # Acumulador total
+# Debounce por hardware/agua: 300 ms evita rebotes del balancín (por marca de tiempo)
+RAIN_DEBOUNCE_S = 0.3
 
 # Direcciones del viento (datasheet)
 DIRECTION_TABLE = {
@@ -98,14 +140,32 @@ COMPASS = {
     337.5: "NNW",
 }
 
+# Resistencias ordenadas para buscar el vecino más cercano con bisect (sin NumPy)
+_SORTED_RES = sorted(DIRECTION_TABLE.values())
+_RES_TO_ANGLE = {res: angle for angle, res in DIRECTION_TABLE.items()}
+
+# Tabla de la veleta como dos arreglos enteros contiguos (ángulo en décimas de
+# grado y resistencia en ohms) para buscar el más cercano con un solo argmin
+if NUMPY_AVAILABLE:
+    _DIR_ANGLES_X10 = np.array(
+        [round(a * 10) for a in sorted(DIRECTION_TABLE)], dtype=np.int16
+    )
+    _DIR_RES = np.array(
+        [DIRECTION_TABLE[a] for a in sorted(DIRECTION_TABLE)], dtype=np.int32
+    )
+
 # Variables globales
+pi = None
 rain_last_state = 1
 rain_poll_thread = None
 ads = None
-adc_channels = []
 anemometer = None
 rain_sensor = None
 running = True
+# Última lectura válida del DHT22 (temperatura, humedad, instante monotónico); el
+# hilo del DHT reemplaza la tupla completa y el lazo principal solo la lee
+dht_latest = (None, None, 0.0)
+stop_event = threading.Event()  # Se activa con Ctrl+C; despierta la espera del lazo
 system_start_time = None
 
 
@@ -125,7 +185,101 @@ class TerminalControl:
         return "\033[K"
 
 
+# Secuencias goto precalculadas para los campos que update_display refresca
+GOTO_STATUS = TerminalControl.goto(24, 11)
+GOTO_DHT_TEMP = TerminalControl.goto(7, 17)
+GOTO_DHT_HUMIDITY = TerminalControl.goto(7, 38)
+GOTO_WIND_SPEED = TerminalControl.goto(11, 17)
+GOTO_WIND_KPH = TerminalControl.goto(12, 5)
+GOTO_WIND_DIRECTION = TerminalControl.goto(11, 37)
+GOTO_WIND_ANGLE = TerminalControl.goto(12, 29)
+GOTO_RAIN_TOTAL = TerminalControl.goto(16, 17)
+GOTO_ELAPSED_HOURS = TerminalControl.goto(16, 37)
+GOTO_IRRADIANCE = TerminalControl.goto(20, 17)
+GOTO_IRRADIANCE_MV = TerminalControl.goto(20, 40)
+
+# Último texto dibujado en cada campo (por su goto): solo se reescribe si cambia
+_last_rendered = {}
+
+# Marco estático de la pantalla (fila, texto), ensamblado y codificado una sola vez
+_FRAME_LINES = (
+    # Título
+    (1, "╔═══════════════════════════════════════════════════════════════╗"),
+    (2, "║                  ESTACIÓN METEOROLÓGICA                      ║"),
+    (3, "║              Monitoreo en Tiempo Real - VCC: 3.294V          ║"),
+    (4, "╚═══════════════════════════════════════════════════════════════╝"),
+    # Sección Temperatura y Humedad
+    (6, "╔══ TEMPERATURA Y HUMEDAD AMBIENTE (DHT22) ════════════════════╗"),
+    (7, "║  Temperatura:         °C │ Humedad:            %           ║"),
+    (8, "╚═══════════════════════════════════════════════════════════════╝"),
+    # Sección Viento
+    (10, "╔══ VIENTO ═════════════════════════════════════════════════════╗"),
+    (11, "║  Velocidad:       m/s │ Dirección:                         ║"),
+    (12, "║  (         km/h)      │ Ángulo:           °                ║"),
+    (13, "╚═══════════════════════════════════════════════════════════════╝"),
+    # Sección Precipitación
+    (15, "╔══ PRECIPITACIÓN ══════════════════════════════════════════════╗"),
+    (16, "║  Acumulado:        mm │ Tiempo:         h                  ║"),
+    (17, "╚═══════════════════════════════════════════════════════════════╝"),
+    # Sección Irradiancia
+    (19, "╔══ IRRADIANCIA SOLAR ══════════════════════════════════════════╗"),
+    (20, "║  Irradiancia:       W/m² │ Voltaje:         mV              ║"),
+    (21, "╚═══════════════════════════════════════════════════════════════╝"),
+    # Línea de estado
+    (23, "─────────────────────────────────────────────────────────────"),
+    (24, "  Estado:"),
+    (25, "  Presiona Ctrl+C para detener"),
+)
+STATIC_FRAME = (
+    TerminalControl.CLEAR_SCREEN
+    + TerminalControl.HOME_CURSOR
+    + TerminalControl.HIDE_CURSOR
+    + "".join(TerminalControl.goto(row, 1) + text + "\n" for row, text in _FRAME_LINES)
+).encode()
+
+
+# ======================== CONTADORES DE PULSOS ========================
+class AtomicCounter:
+    """Contador protegido por lock: los callbacks suman desde otro hilo"""
+
+    def __init__(self):
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self):
+        with self._lock:
+            self._value += 1
+
+    @property
+    def value(self):
+        return self._value
+
+    def get_and_reset(self):
+        """Devuelve la cuenta y la pone en cero en un solo paso"""
+        with self._lock:
+            value = self._value
+            self._value = 0
+        return value
+
+
+wind_counter = AtomicCounter()  # Pulsos del anemómetro desde la última lectura
+rain_counter = AtomicCounter()  # Pulsos acumulados del pluviómetro
+
+
 # ======================== FUNCIONES AUXILIARES ========================
+# Hora HH:MM:SS en caché: solo se reformatea cuando cambia el segundo
+_ts_cache = [-1, ""]
+
+
+def _timestamp():
+    """Devuelve la hora actual HH:MM:SS como texto, cacheada por segundo"""
+    now = int(time.time())
+    if now != _ts_cache[0]:
+        _ts_cache[0] = now
+        _ts_cache[1] = time.strftime("%H:%M:%S", time.localtime(now))
+    return _ts_cache[1]
+
+
 def signal_handler(sig, frame):
     """Maneja la señal Ctrl+C para terminar limpiamente"""
     global running
@@ -134,23 +288,33 @@ def signal_handler(sig, frame):
     print(TerminalControl.HOME_CURSOR, end="")
     print("\nDeteniendo monitor meteorológico...")
     running = False
+    stop_event.set()
 
 
-def wind_pulse():
-    """Callback para pulsos del anemómetro"""
-    global wind_count
-    wind_count += 1
+def _open_rain_edge_fd():
+    """Configura flanco descendente por sysfs y abre el archivo value del pin"""
+    gpio_dir = f"/sys/class/gpio/gpio{RAIN_SENSOR_PIN}"
 
+    def sysfs_write(path, value):
+        with open(path, "w") as f:
+            f.write(value)
 
-def rain_pulse():
-    """Callback para pulsos del pluviómetro"""
-    global rain_count, rain_count_total
-    rain_count += 1
-    rain_count_total += 1
+    if not os.path.exists(gpio_dir):
+        sysfs_write("/sys/class/gpio/export", str(RAIN_SENSOR_PIN))
+        time.sleep(0.1)  # Esperar a que udev ajuste permisos del pin
+    sysfs_write(f"{gpio_dir}/direction", "in")
+
+    # Reiniciar el flanco: algunos kernels no entregan eventos sin este paso
+    sysfs_write(f"{gpio_dir}/edge", "none")
+    sysfs_write(f"{gpio_dir}/edge", "falling")
+
+    value_fd = os.open(f"{gpio_dir}/value", os.O_RDONLY | os.O_NONBLOCK)
+    os.read(value_fd, 8)  # Lectura inicial descarta el evento pendiente
+    return value_fd
 
 
 def start_rain_polling():
-    """Inicia un hilo de polling manual para el pluviómetro (1→0 = pulso)."""
+    """Inicia el hilo del pluviómetro: eventos de flanco (1→0 = pulso) vía epoll."""
     global rain_last_state, rain_poll_thread, running
 
     # Configurar pin con pull-up
@@ -170,16 +334,50 @@ def start_rain_polling():
         print(f"Error leyendo estado inicial del pin de lluvia: {e}")
         return False
 
+    # El kernel notifica cada flanco: el hilo queda bloqueado en epoll entre pulsos
+    try:
+        value_fd = _open_rain_edge_fd()
+        epoll = select.epoll()
+        epoll.register(value_fd, select.EPOLLPRI | select.EPOLLERR)
+    except OSError as e:
+        print(f"⚠ Flancos por sysfs no disponibles ({e}), usando polling cada 10 ms")
+        value_fd = None
+
+    def _edge_loop():
+        last_pulse_ts = 0.0
+        try:
+            while running:
+                try:
+                    # Timeout de 1 s solo para revisar 'running' al detener
+                    if not epoll.poll(timeout=1.0):
+                        continue
+                    os.lseek(value_fd, 0, os.SEEK_SET)
+                    os.read(value_fd, 8)
+                    # Los rebotes se descartan por tiempo, sin bloquear el hilo
+                    now = time.monotonic()
+                    if now - last_pulse_ts >= RAIN_DEBOUNCE_S:
+                        rain_counter.inc()
+                        last_pulse_ts = now
+                except Exception as e:
+                    # Evitar que el hilo muera silenciosamente
+                    print(f"[RAIN-POLL] Error: {e}")
+                    time.sleep(0.5)
+        finally:
+            epoll.close()
+            os.close(value_fd)
+
     def _loop():
         global rain_last_state
+        last_pulse_ts = 0.0
         while running:
             try:
                 current_state = GPIO.input(RAIN_SENSOR_PIN)
                 # Detecta flanco descendente (1 → 0)
                 if rain_last_state == 1 and current_state == 0:
-                    rain_pulse()
-                    # Debounce por hardware/agua: 300 ms evita rebotes del balancín
-                    time.sleep(0.3)
+                    now = time.monotonic()
+                    if now - last_pulse_ts >= RAIN_DEBOUNCE_S:
+                        rain_counter.inc()
+                        last_pulse_ts = now
                 rain_last_state = current_state
                 time.sleep(0.01)  # 10 ms
             except Exception as e:
@@ -187,7 +385,8 @@ def start_rain_polling():
                 print(f"[RAIN-POLL] Error: {e}")
                 time.sleep(0.5)
 
-    rain_poll_thread = threading.Thread(target=_loop, name="RainPolling", daemon=True)
+    target = _edge_loop if value_fd is not None else _loop
+    rain_poll_thread = threading.Thread(target=target, name="RainPolling", daemon=True)
     rain_poll_thread.start()
     print("✓ Hilo de polling de lluvia iniciado")
     return True
@@ -195,14 +394,19 @@ def start_rain_polling():
 
 def initialize_hardware():
     """Inicializa el hardware meteorológico"""
-    global ads, adc_channels, anemometer, rain_sensor, system_start_time
+    global pi, ads, anemometer, rain_sensor, system_start_time
 
     print("Inicializando hardware meteorológico...")
-    system_start_time = time.time()
+    system_start_time = time.monotonic()
 
-    # GPIO Setup para MUX
+    # GPIO Setup para MUX (pigpiod, el mismo daemon que usa gpiozero)
     try:
-        GPIO.setup([MUX_S0, MUX_S1, MUX_S2], GPIO.OUT)
+        pi = pigpio.pi()
+        if not pi.connected:
+            print("Error: pigpiod no está corriendo (iniciar con: sudo pigpiod)")
+            return False
+        for pin in (MUX_S0, MUX_S1, MUX_S2):
+            pi.set_mode(pin, pigpio.OUTPUT)
         print("✓ GPIO para MUX configurado")
     except Exception as e:
         print(f"Error configurando GPIO para MUX: {e}")
@@ -222,12 +426,7 @@ def initialize_hardware():
         try:
             ads = ADS.ADS1115(i2c, address=0x48)
             ads.gain = 1
-            adc_channels = [
-                AnalogIn(ads, ADS.P3),  # A3 -> Z1 (MUX1)
-                AnalogIn(ads, ADS.P2),  # A2 -> Z2 (MUX2)
-                AnalogIn(ads, ADS.P1),  # A1 -> Z3 (MUX3)
-                AnalogIn(ads, ADS.P0),  # A0 -> Dirección del viento
-            ]
+            ads.data_rate = ADS_DATA_RATE
             print("✓ ADS1115 inicializado correctamente")
             break
         except Exception as e:
@@ -248,8 +447,9 @@ def initialize_hardware():
     # Anemómetro Setup
     try:
         anemometer = Button(ANEMOMETER_PIN, pull_up=True, bounce_time=0.01)
-        anemometer.when_pressed = wind_pulse
-        anemometer.when_released = wind_pulse
+        # El datasheet define 2.4 km/h como un cierre del contacto por segundo:
+        # se cuenta solo el flanco de cierre, no también la apertura
+        anemometer.when_pressed = wind_counter.inc
         print("✓ Anemómetro configurado correctamente")
     except Exception as e:
         print(f"Error configurando anemómetro: {e}")
@@ -268,27 +468,44 @@ def initialize_hardware():
 def set_mux_channel(channel):
     """Configura el canal del multiplexor (0-7)"""
     try:
-        GPIO.output(MUX_S0, channel & 0x01)
-        GPIO.output(MUX_S1, (channel >> 1) & 0x01)
-        GPIO.output(MUX_S2, (channel >> 2) & 0x01)
-        time.sleep(0.01)
+        bits = MUX_BANK_BITS[channel]
+        pi.clear_bank_1(MUX_MASK & ~bits)
+        pi.set_bank_1(bits)
+        time.sleep(MUX_SETTLE_S)  # Tiempo de estabilización del MUX
         return True
     except Exception as e:
         return False
 
 
+def read_ads_raw(ain):
+    """Dispara una conversión única en la entrada AINx y devuelve las cuentas"""
+    with ads.i2c_device as d:
+        d.write(_ADS_CONFIG_WORDS[ain])
+    time.sleep(ADS_CONVERSION_S)
+    with ads.i2c_device as d:
+        d.write_then_readinto(_REG_CONVERSION, _ADC_BUF)
+    return int.from_bytes(_ADC_BUF, "big", signed=True)
+
+
+def read_ads(ain):
+    """Dispara una conversión única en la entrada AINx y devuelve el voltaje"""
+    return read_ads_raw(ain) * ADS_VOLTS_PER_LSB
+
+
 def get_wind_speed():
     """Obtiene velocidad del viento en m/s"""
-    global wind_count, last_wind_measurement
+    global last_wind_measurement
 
-    current_time = time.time()
+    current_time = time.monotonic()
     time_elapsed = current_time - last_wind_measurement
 
-    if time_elapsed >= MEASUREMENT_PERIOD:
-        cps = wind_count / time_elapsed
-        wind_ms = cps * (KPH_PER_COUNT_PER_SEC / 3.6)  # Convertir km/h a m/s
+    # El lazo principal llama cada MEASUREMENT_INTERVAL exacto: un margen del 5%
+    # evita descartar lecturas por unos ms de variación del planificador
+    if time_elapsed >= MEASUREMENT_PERIOD * 0.95:
+        wind_ms = (
+            wind_counter.get_and_reset() * WIND_MS_PER_COUNT_PER_SEC / time_elapsed
+        )
 
-        wind_count = 0
         last_wind_measurement = current_time
 
         return wind_ms
@@ -298,30 +515,34 @@ def get_wind_speed():
 
 def get_wind_direction():
     """Obtiene dirección del viento"""
-    if ads is None or len(adc_channels) < 4:
+    if ads is None:
         return None, None
 
     try:
-        voltage = adc_channels[3].voltage  # A0
+        voltage = read_ads(WIND_VANE_AIN)
 
         if voltage is None or voltage <= 0:
             return None, None
 
         resistance = 10000 * voltage / (VCC - voltage)
 
-        closest_angle = None
-        smallest_error = math.inf
-        for angle, res_nom in DIRECTION_TABLE.items():
-            error = abs(res_nom - resistance)
-            if error < smallest_error:
-                smallest_error = error
-                closest_angle = angle
-
         tolerance = 0.15
-        if (
-            closest_angle is not None
-            and smallest_error <= DIRECTION_TABLE[closest_angle] * tolerance
-        ):
+        if NUMPY_AVAILABLE:
+            diffs = np.abs(_DIR_RES - resistance)
+            idx = int(diffs.argmin())
+            if diffs[idx] <= _DIR_RES[idx] * tolerance:
+                closest_angle = int(_DIR_ANGLES_X10[idx]) / 10.0
+                return closest_angle, COMPASS.get(closest_angle, "")
+            return None, None
+
+        # Solo los dos vecinos del punto de inserción pueden ser el más cercano
+        i = bisect.bisect_left(_SORTED_RES, resistance)
+        best_res = _SORTED_RES[i] if i < len(_SORTED_RES) else _SORTED_RES[-1]
+        if i > 0 and resistance - _SORTED_RES[i - 1] <= abs(best_res - resistance):
+            best_res = _SORTED_RES[i - 1]
+
+        if abs(best_res - resistance) <= best_res * tolerance:
+            closest_angle = _RES_TO_ANGLE[best_res]
             return closest_angle, COMPASS.get(closest_angle, "")
         return None, None
 
@@ -331,26 +552,24 @@ def get_wind_direction():
 
 def read_irradiance():
     """Lee sensor de irradiancia"""
-    if ads is None or len(adc_channels) < 3:
+    if ads is None:
         return 0.0, 0.0
 
     try:
-        IRRADIANCE_CALIBRATION_FACTOR = 1000.0 / 75.0
-
         # IRR- (Y4)
         if not set_mux_channel(4):
             return 0.0, 0.0
-        voltage_minus = adc_channels[2].voltage
+        raw_minus = read_ads_raw(IRRADIANCE_AIN)
 
         # IRR+ (Y5)
         if not set_mux_channel(5):
             return 0.0, 0.0
-        voltage_plus = adc_channels[2].voltage
+        raw_plus = read_ads_raw(IRRADIANCE_AIN)
 
-        # Diferencial
-        irradiance_voltage = abs(voltage_plus - voltage_minus)
-        irradiance_voltage_mV = abs(irradiance_voltage * 1000.0)
-        irradiance_wm2 = irradiance_voltage_mV * IRRADIANCE_CALIBRATION_FACTOR
+        # Diferencial: se resta en cuentas enteras y cada salida se escala una vez
+        counts = abs(raw_plus - raw_minus)
+        irradiance_voltage = counts * ADS_VOLTS_PER_LSB
+        irradiance_wm2 = counts * IRRADIANCE_WM2_PER_COUNT
 
         return irradiance_voltage, irradiance_wm2
 
@@ -370,14 +589,24 @@ def read_dht22():
         return None, None
 
 
+def dht_loop():
+    """Lee el DHT22 cada DHT_INTERVAL en su propio hilo (su protocolo bloquea)"""
+    global dht_latest
+    while not stop_event.is_set():
+        temp, humidity = read_dht22()
+        if temp is not None and humidity is not None:
+            dht_latest = (temp, humidity, time.monotonic())
+        stop_event.wait(DHT_INTERVAL)
+
+
 def read_all_weather_data():
     """Lee todos los datos meteorológicos"""
     data = {}
 
-    # DHT22
-    temp_dht, hum_dht = read_dht22()
-    data["dht_temperature"] = temp_dht
-    data["dht_humidity"] = hum_dht
+    # DHT22: lo lee dht_loop() en segundo plano; main() completa estos campos con
+    # la última lectura válida
+    data["dht_temperature"] = None
+    data["dht_humidity"] = None
 
     # Viento - mantener última velocidad válida
     wind_speed = get_wind_speed()
@@ -389,10 +618,10 @@ def read_all_weather_data():
 
     # Lluvia
     if system_start_time:
-        elapsed_hours = (time.time() - system_start_time) / 3600
+        elapsed_hours = (time.monotonic() - system_start_time) / 3600
     else:
         elapsed_hours = 0
-    rain_mm_total = rain_count_total * MM_PER_TICK
+    rain_mm_total = rain_counter.value * MM_PER_TICK
     data["rain_total"] = rain_mm_total
     data["elapsed_hours"] = elapsed_hours
 
@@ -405,129 +634,77 @@ def read_all_weather_data():
 
 
 def setup_display():
-    """Configura la pantalla inicial estática"""
-    print(TerminalControl.CLEAR_SCREEN, end="")
-    print(TerminalControl.HOME_CURSOR, end="")
-    print(TerminalControl.HIDE_CURSOR, end="")
-
-    # Título
-    print(TerminalControl.goto(1, 1), end="")
-    print("╔═══════════════════════════════════════════════════════════════╗")
-    print(TerminalControl.goto(2, 1), end="")
-    print("║                  ESTACIÓN METEOROLÓGICA                      ║")
-    print(TerminalControl.goto(3, 1), end="")
-    print("║              Monitoreo en Tiempo Real - VCC: 3.294V          ║")
-    print(TerminalControl.goto(4, 1), end="")
-    print("╚═══════════════════════════════════════════════════════════════╝")
-
-    # Sección Temperatura y Humedad
-    print(TerminalControl.goto(6, 1), end="")
-    print("╔══ TEMPERATURA Y HUMEDAD AMBIENTE (DHT22) ════════════════════╗")
-    print(TerminalControl.goto(7, 1), end="")
-    print("║  Temperatura:         °C │ Humedad:            %           ║")
-    print(TerminalControl.goto(8, 1), end="")
-    print("╚═══════════════════════════════════════════════════════════════╝")
-
-    # Sección Viento
-    print(TerminalControl.goto(10, 1), end="")
-    print("╔══ VIENTO ═════════════════════════════════════════════════════╗")
-    print(TerminalControl.goto(11, 1), end="")
-    print("║  Velocidad:       m/s │ Dirección:                         ║")
-    print(TerminalControl.goto(12, 1), end="")
-    print("║  (         km/h)      │ Ángulo:           °                ║")
-    print(TerminalControl.goto(13, 1), end="")
-    print("╚═══════════════════════════════════════════════════════════════╝")
-
-    # Sección Precipitación
-    print(TerminalControl.goto(15, 1), end="")
-    print("╔══ PRECIPITACIÓN ══════════════════════════════════════════════╗")
-    print(TerminalControl.goto(16, 1), end="")
-    print("║  Acumulado:        mm │ Tiempo:         h                  ║")
-    print(TerminalControl.goto(17, 1), end="")
-    print("╚═══════════════════════════════════════════════════════════════╝")
-
-    # Sección Irradiancia
-    print(TerminalControl.goto(19, 1), end="")
-    print("╔══ IRRADIANCIA SOLAR ══════════════════════════════════════════╗")
-    print(TerminalControl.goto(20, 1), end="")
-    print("║  Irradiancia:       W/m² │ Voltaje:         mV              ║")
-    print(TerminalControl.goto(21, 1), end="")
-    print("╚═══════════════════════════════════════════════════════════════╝")
-
-    # Línea de estado
-    print(TerminalControl.goto(23, 1), end="")
-    print("─────────────────────────────────────────────────────────────")
-    print(TerminalControl.goto(24, 1), end="")
-    print("  Estado:")
-    print(TerminalControl.goto(25, 1), end="")
-    print("  Presiona Ctrl+C para detener")
+    """Configura la pantalla inicial estática con una sola escritura"""
+    _last_rendered.clear()  # Pantalla borrada: todos los campos se redibujan
+    # Vaciar texto pendiente de print() y enviar el marco ya codificado
+    sys.stdout.flush()
+    sys.stdout.buffer.write(STATIC_FRAME)
+    sys.stdout.buffer.flush()
 
 
 def update_display(weather_data, measurement_count, error_count):
-    """Actualiza los valores en la pantalla estática"""
-    timestamp = datetime.now().strftime("%H:%M:%S")
+    """Actualiza los valores en la pantalla estática con una sola escritura"""
+    timestamp = _timestamp()
 
     # Actualizar timestamp y contador
-    print(TerminalControl.goto(24, 11), end="")
-    print(
-        f"Medición #{measurement_count:05d} - {timestamp} - Errores: {error_count}     "
-    )
+    parts = [
+        GOTO_STATUS,
+        f"Medición #{measurement_count:05d} - {timestamp} - Errores: {error_count}     \n",
+    ]
 
     # DHT22 - Temperatura y Humedad
-    print(TerminalControl.goto(7, 17), end="")
-    if weather_data["dht_temperature"] is not None:
-        print(f"{weather_data['dht_temperature']:6.2f}", end="")
-    else:
-        print(" ERROR", end="")
-
-    print(TerminalControl.goto(7, 38), end="")
-    if weather_data["dht_humidity"] is not None:
-        print(f"{weather_data['dht_humidity']:6.1f}", end="")
-    else:
-        print(" ERROR", end="")
+    temp = weather_data["dht_temperature"]
+    humidity = weather_data["dht_humidity"]
+    fields = [
+        (GOTO_DHT_TEMP, f"{temp:6.2f}" if temp is not None else " ERROR"),
+        (GOTO_DHT_HUMIDITY, f"{humidity:6.1f}" if humidity is not None else " ERROR"),
+    ]
 
     # Viento - Velocidad y Dirección
-    print(TerminalControl.goto(11, 17), end="")
-    if weather_data["wind_speed"] is not None:
-        wind_kph = weather_data["wind_speed"] * 3.6
-        print(f"{weather_data['wind_speed']:6.2f}", end="")
-        print(TerminalControl.goto(12, 5), end="")
-        print(f"{wind_kph:6.1f}", end="")
-    else:
-        # Mantener valores anteriores si no hay nueva lectura
-        print("      ", end="")  # No cambiar el display
-        print(TerminalControl.goto(12, 5), end="")
-        print("      ", end="")  # No cambiar el display
-
-    print(TerminalControl.goto(11, 37), end="")
-    if weather_data["wind_direction"] is not None:
-        print(f"{weather_data['wind_direction']:>6}", end="")
-    else:
-        print(" ERROR", end="")
-
-    print(TerminalControl.goto(12, 29), end="")
-    if weather_data["wind_angle"] is not None:
-        print(f"{weather_data['wind_angle']:6.1f}", end="")
+    wind_speed = weather_data["wind_speed"]
+    if wind_speed is not None:
+        wind_kph = wind_speed * 3.6
+        fields += [
+            (GOTO_WIND_SPEED, f"{wind_speed:6.2f}"),
+            (GOTO_WIND_KPH, f"{wind_kph:6.1f}"),
+        ]
     else:
-        print(" ERROR", end="")
+        # Sin lectura de velocidad: dejar los campos en blanco
+        fields += [(GOTO_WIND_SPEED, "      "), (GOTO_WIND_KPH, "      ")]
+
+    wind_direction = weather_data["wind_direction"]
+    wind_angle = weather_data["wind_angle"]
+    fields += [
+        (
+            GOTO_WIND_DIRECTION,
+            f"{wind_direction:>6}" if wind_direction is not None else " ERROR",
+        ),
+        (GOTO_WIND_ANGLE, f"{wind_angle:6.1f}" if wind_angle is not None else " ERROR"),
+    ]
 
     # Precipitación
-    print(TerminalControl.goto(16, 17), end="")
-    print(f"{weather_data['rain_total']:6.2f}", end="")
-
-    print(TerminalControl.goto(16, 37), end="")
-    print(f"{weather_data['elapsed_hours']:6.1f}", end="")
+    fields += [
+        (GOTO_RAIN_TOTAL, f"{weather_data['rain_total']:6.2f}"),
+        (GOTO_ELAPSED_HOURS, f"{weather_data['elapsed_hours']:6.1f}"),
+    ]
 
     # Irradiancia
-    print(TerminalControl.goto(20, 17), end="")
-    print(f"{weather_data['irradiance']:7.1f}", end="")
-
-    print(TerminalControl.goto(20, 40), end="")
-    voltage_mv = weather_data["irradiance_voltage"] * 1000
-    print(f"{voltage_mv:6.2f}", end="")
-
-    # Forzar actualización del terminal
+    fields += [
+        (GOTO_IRRADIANCE, f"{weather_data['irradiance']:7.1f}"),
+        (GOTO_IRRADIANCE_MV, f"{weather_data['irradiance_voltage'] * 1000:6.2f}"),
+    ]
+
+    # El estado cambia cada segundo; los demás campos solo si su texto cambió
+    for goto, text in fields:
+        if _last_rendered.get(goto) != text:
+            _last_rendered[goto] = text
+            parts += (goto, text)
+
+    # Un solo write y un solo flush por frame, directo al buffer binario (sin la
+    # capa de texto de print); print() solo se usa fuera del lazo
     sys.stdout.flush()
+    sys.stdout.buffer.write("".join(parts).encode())
+    sys.stdout.buffer.flush()
 
 
 def print_station_info():
@@ -542,7 +719,9 @@ def print_station_info():
     )
     print(f"Pluviómetro (GPIO {RAIN_SENSOR_PIN}):       {MM_PER_TICK:.4f} mm por pulso")
     print(f"Veleta (ADS1115 A0):      16 direcciones cardinales")
-    print(f"Irradiancia (MUX Y4-Y5):  Factor de calibración: {1000.0/75.0:.2f}")
+    print(
+        f"Irradiancia (MUX Y4-Y5):  Factor de calibración: {IRRADIANCE_CALIBRATION_FACTOR:.2f}"
+    )
 
     print(f"\nEspecificaciones:")
     print(f"  Precisión viento:       ±0.1 m/s")
@@ -574,85 +753,83 @@ def main():
     # Configurar pantalla estática
     setup_display()
 
+    # El DHT22 se lee en su propio hilo: sus reintentos no frenan el lazo de 1 s
+    dht_thread = threading.Thread(target=dht_loop, name="DHT22", daemon=True)
+    dht_thread.start()
+
     measurement_count = 0
     error_count = 0
-    last_measurement_time = time.time()
-    last_dht_time = time.time()
+    # Plazo absoluto en reloj monotónico: se avanza sumando el período, sin deriva
+    start_time = time.monotonic()
+    next_measurement = start_time + MEASUREMENT_INTERVAL
 
     # Variables para mantener últimos valores válidos
-    last_valid_dht_temp = None
-    last_valid_dht_humidity = None
     last_valid_wind_speed = None
     last_valid_wind_angle = None
     last_valid_wind_direction = None
-    last_wind_update = time.time()
+    last_wind_update = time.monotonic()
 
     try:
         while running:
-            current_time = time.time()
-
-            # Actualizar cada segundo
-            if current_time - last_measurement_time >= 1.0:
-                measurement_count += 1
-
-                # Leer datos meteorológicos
-                weather_data = read_all_weather_data()
-
-                # DHT22 cada 3 segundos
-                if current_time - last_dht_time >= 3.0:
-                    new_dht_temp, new_dht_humidity = read_dht22()
-                    if new_dht_temp is not None and new_dht_humidity is not None:
-                        last_valid_dht_temp = new_dht_temp
-                        last_valid_dht_humidity = new_dht_humidity
-                    last_dht_time = current_time
-
-                # Manejar datos de viento (mantener últimos valores válidos)
-                if weather_data["wind_speed"] is not None:
-                    last_valid_wind_speed = weather_data["wind_speed"]
-                    last_wind_update = current_time
-
-                if (
-                    weather_data["wind_angle"] is not None
-                    and weather_data["wind_direction"] is not None
-                ):
-                    last_valid_wind_angle = weather_data["wind_angle"]
-                    last_valid_wind_direction = weather_data["wind_direction"]
-
-                # Usar últimos valores válidos para display
-                weather_data["dht_temperature"] = last_valid_dht_temp
-                weather_data["dht_humidity"] = last_valid_dht_humidity
-                weather_data["wind_speed"] = last_valid_wind_speed
-                weather_data["wind_angle"] = last_valid_wind_angle
-                weather_data["wind_direction"] = last_valid_wind_direction
-
-                # Contar errores SOLO cuando hay problemas reales
-                current_errors = 0
-
-                # DHT22: error si no hemos tenido lecturas válidas en 10 segundos
-                if last_valid_dht_temp is None and current_time - last_dht_time > 10:
-                    current_errors += 1
-
-                # Viento: error si no hemos tenido lecturas de velocidad en 5 segundos
-                if (
-                    last_valid_wind_speed is None
-                    and current_time - last_wind_update > 5
-                ):
-                    current_errors += 1
-
-                # Dirección del viento: error si nunca hemos tenido lectura válida
-                if last_valid_wind_direction is None and measurement_count > 10:
-                    current_errors += 1
-
-                if current_errors > 0:
-                    error_count += 1
-
-                # Actualizar pantalla
-                update_display(weather_data, measurement_count, error_count)
-
-                last_measurement_time = current_time
-
-            # Pequeña pausa para no saturar el CPU
-            time.sleep(0.05)
+            # Dormir exactamente hasta el siguiente plazo en vez de despertar cada
+            # 50 ms; Ctrl+C despierta la espera de inmediato
+            delay = next_measurement - time.monotonic()
+            if delay > 0 and stop_event.wait(delay):
+                break
+
+            current_time = time.monotonic()
+            measurement_count += 1
+
+            # Leer datos meteorológicos
+            weather_data = read_all_weather_data()
+
+            # DHT22: última lectura válida publicada por su hilo (sin bloquear)
+            dht_temp, dht_humidity, dht_time = dht_latest
+
+            # Manejar datos de viento (mantener últimos valores válidos)
+            if weather_data["wind_speed"] is not None:
+                last_valid_wind_speed = weather_data["wind_speed"]
+                last_wind_update = current_time
+
+            if (
+                weather_data["wind_angle"] is not None
+                and weather_data["wind_direction"] is not None
+            ):
+                last_valid_wind_angle = weather_data["wind_angle"]
+                last_valid_wind_direction = weather_data["wind_direction"]
+
+            # Usar últimos valores válidos para display
+            weather_data["dht_temperature"] = dht_temp
+            weather_data["dht_humidity"] = dht_humidity
+            weather_data["wind_speed"] = last_valid_wind_speed
+            weather_data["wind_angle"] = last_valid_wind_angle
+            weather_data["wind_direction"] = last_valid_wind_direction
+
+            # Contar errores SOLO cuando hay problemas reales
+            current_errors = 0
+
+            # DHT22: error si no hemos tenido lecturas válidas en 10 segundos
+            if current_time - max(dht_time, start_time) > DHT_STALE_S:
+                current_errors += 1
+
+            # Viento: error si no hemos tenido lecturas de velocidad en 5 segundos
+            if last_valid_wind_speed is None and current_time - last_wind_update > 5:
+                current_errors += 1
+
+            # Dirección del viento: error si nunca hemos tenido lectura válida
+            if last_valid_wind_direction is None and measurement_count > 10:
+                current_errors += 1
+
+            if current_errors > 0:
+                error_count += 1
+
+            # Actualizar pantalla
+            update_display(weather_data, measurement_count, error_count)
+
+            # Si una lectura se atrasó más de un período, no recuperar en ráfaga
+            next_measurement += MEASUREMENT_INTERVAL
+            if next_measurement < current_time:
+                next_measurement = current_time + MEASUREMENT_INTERVAL
 
     except Exception as e:
         print(TerminalControl.SHOW_CURSOR, end="")
@@ -677,9 +854,9 @@ def main():
             print(f"Tasa de éxito: {success_rate:.1f}%")
 
         # Mostrar estadísticas finales
-        final_rain = rain_count_total * MM_PER_TICK
+        final_rain = rain_counter.value * MM_PER_TICK
         if system_start_time:
-            elapsed_time = (time.time() - system_start_time) / 3600
+            elapsed_time = (time.monotonic() - system_start_time) / 3600
             print(f"Tiempo de monitoreo: {elapsed_time:.2f} horas")
             print(f"Precipitación total: {final_rain:.2f} mm")
 
@@ -718,6 +895,20 @@ def main():
             except Exception as e:
                 print(f"Error en GPIO.cleanup(): {e}")
 
+            # Liberar conexión con pigpiod
+            try:
+                if pi is not None:
+                    pi.stop()
+            except Exception as e:
+                print(f"Error liberando pigpiod: {e}")
+
+            # Detener el hilo del DHT22 antes de liberar el sensor
+            try:
+                stop_event.set()
+                dht_thread.join(timeout=1.0)
+            except Exception as e:
+                print(f"Error esperando hilo del DHT22: {e}")
+
             try:
                 dhtDevice.exit()
             except Exception as e:
@@ -1,38 +1,65 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import csv
-import glob
 import json
 import math
 import os
-import signal
 import sys
 import threading
 import time
 from collections import deque
-from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from datetime import datetime
+from functools import lru_cache
 
 import adafruit_ads1x15.ads1115 as ADS
 import adafruit_dht
 import board
 import busio
+import pigpio
 import RPi.GPIO as GPIO
+from adafruit_ads1x15.ads1x15 import Mode
 from adafruit_ads1x15.analog_in import AnalogIn
 from adafruit_ina228 import INA228
 from gpiozero import Button, Device
 from gpiozero.pins.pigpio import PiGPIOFactory
 
+try:
+    import numpy as np
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# orjson (opcional): serializa directo a bytes, más rápido que json
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Numba (opcional, requiere NumPy): compila los núcleos numéricos a código máquina
+try:
+    from numba import njit
+
+    NUMBA_AVAILABLE = NUMPY_AVAILABLE
+except ImportError:
+    NUMBA_AVAILABLE = False
+
 hardware_lock = threading.Lock()
 
 # InfluxDB integration
 try:
     from influxdb_sender import (
         close_influxdb,
+        flush_influx,
         init_influxdb,
         periodic_health_check,
-        send_measurement_to_influx,
+        queue_measurement,
+        start_influx_flusher,
+        stop_influx_flusher,
     )
 
     INFLUX_AVAILABLE = True
@@ -48,6 +75,17 @@ Device.pin_factory = PiGPIOFactory()
 # Estado y configuración
 STATE_FILE = "/home/pi/Desktop/sensor_system_state.json"
 BACKUP_STATE_FILE = "/home/pi/Desktop/sensor_system_state_backup.json"
+MEDICIONES_DIR = "/home/pi/Desktop/Mediciones"
+_MEDICIONES_DIR_B = os.fsencode(MEDICIONES_DIR)
+STATE_SAVE_INTERVAL = 60  # Segundos: como máximo un guardado de estado por ventana
+
+# CSV diario abierto todo el día con buffer grande; se vacía al SO cada
+# CSV_FLUSH_ROWS filas y se sincroniza a la SD (fsync) solo al cerrar el día
+CSV_BUFFER_SIZE = 128 * 1024
+CSV_FLUSH_ROWS = 5
+# Las filas se escriben ya unidas (ningún valor lleva comas ni comillas); mismo fin de
+# línea que usaba csv.writer para no mezclar formatos al continuar un archivo
+CSV_LINE_END = "\r\n"
 
 # Energy offset tracking (para recuperación después de reinicios)
 energy_offset = {0x40: 0.0, 0x41: 0.0}
@@ -56,6 +94,21 @@ energy_offset = {0x40: 0.0, 0x41: 0.0}
 RSHUNT_OHMS = 0.002
 IMAX_AMPS = 1.5
 INA228_ADDRESSES = [0x40, 0x41]
+# Nombres por dirección, formateados una sola vez: (addr, nombre en terminal)
+# y (addr, nombre corto de la medición principal)
+INA228_NAMES = tuple((addr, f"INA0x{addr:02X}") for addr in INA228_ADDRESSES)
+INA228_SHORT_NAMES = tuple((addr, f"INA{addr - 0x3F}") for addr in INA228_ADDRESSES)
+
+# Registros INA228 (datasheet TI) leídos directamente, sin pasar por las propiedades.
+# El puntero de registro no se autoincrementa: una transacción por registro
+_INA_REG_VBUS = bytes([0x05])  # 24 bits, valor en bits 23:4
+_INA_REG_DIETEMP = bytes([0x06])  # 16 bits con signo
+_INA_REG_CURRENT = bytes([0x07])  # 24 bits, valor con signo en bits 23:4
+_INA_REG_POWER = bytes([0x08])  # 24 bits
+_INA_REG_ENERGY = bytes([0x09])  # 40 bits
+INA_VBUS_LSB = 195.3125e-6  # V por LSB
+INA_DIETEMP_LSB = 7.8125e-3  # °C por LSB
+_INA_READ_BUF = bytearray(5)  # Solo lo usa el hilo de _ina_executor
 AVG_TARGET = 1024
 CT_TARGET_US = 1052
 ADC_RANGE = 1
@@ -63,9 +116,20 @@ ADC_RANGE = 1
 # Constantes del sistema
 OPERATING_START_TIME = "05:00"  # Formato 24h "HH:MM"
 OPERATING_END_TIME = "18:00"  # Formato 24h "HH:MM" (soporta cruce de medianoche)
+# Horario ya convertido a enteros (no cambia en tiempo de ejecución)
+_START_HOUR, _START_MIN = map(int, OPERATING_START_TIME.split(":"))
+_END_HOUR, _END_MIN = map(int, OPERATING_END_TIME.split(":"))
+_START_MINUTES = _START_HOUR * 60 + _START_MIN
+_END_MINUTES = _END_HOUR * 60 + _END_MIN
+_CROSSES_MIDNIGHT = _END_MINUTES <= _START_MINUTES
 MAX_RETRY_ATTEMPTS = 3
 SENSOR_READ_TIMEOUT = 1
-GPIO_SETUP_DELAY = 0.1  # Tiempo de estabilización del MUX (0.1s para irradiancia)
+# Reloj del bus I2C: ADS1115 e INA228 admiten fast-mode (400 kHz). En Raspberry Pi el
+# kernel fija la velocidad real con dtparam=i2c_arm_baudrate en /boot/config.txt
+I2C_FREQUENCY = 400_000
+
+# Conmutación del CD74HC4051 es < 1 µs; 1 ms cubre el RC del divisor de entrada
+MUX_SETTLE_S = 0.001
 HARDWARE_RETRY_DELAY = 2
 MAX_CONSECUTIVE_ERRORS = 10
 
@@ -82,6 +146,30 @@ MUX_S0 = 17
 MUX_S1 = 27
 MUX_S2 = 22
 
+# Los tres pines del MUX se escriben juntos en el banco 0-31 por pigpiod (el mismo
+# daemon que usa gpiozero): bits de cada canal precalculados
+MUX_MASK = (1 << MUX_S0) | (1 << MUX_S1) | (1 << MUX_S2)
+MUX_BANK_BITS = tuple(
+    ((channel & 0x01) << MUX_S0)
+    | (((channel >> 1) & 0x01) << MUX_S1)
+    | (((channel >> 2) & 0x01) << MUX_S2)
+    for channel in range(8)
+)
+# Transiciones precalculadas (bits a limpiar, bits a poner) desde el canal actual;
+# la fila MUX_UNKNOWN (estado desconocido) escribe los tres pines
+MUX_UNKNOWN = 8
+_MUX_TRANSITIONS = tuple(
+    tuple(
+        (
+            (MUX_MASK if prev == MUX_UNKNOWN else MUX_BANK_BITS[prev]) & ~new_bits,
+            new_bits if prev == MUX_UNKNOWN else new_bits & ~MUX_BANK_BITS[prev],
+        )
+        for new_bits in MUX_BANK_BITS
+    )
+    for prev in range(MUX_UNKNOWN + 1)
+)
+_mux_channel = MUX_UNKNOWN
+
 DHT22_PIN = 5
 ANEMOMETER_PIN = 23
 RAIN_SENSOR_PIN = 6
@@ -92,13 +180,41 @@ dhtDevice = adafruit_dht.DHT22(board.D5, use_pulseio=False)
 # Wind and rain
 KPH_PER_COUNT_PER_SEC = 2.4
 MEASUREMENT_PERIOD = 1.0
-wind_count = 0
+SLOW_SENSOR_PERIOD = 5.0  # Segundos entre lecturas de DHT22 y termistores
 last_wind_measurement = time.time()
 
 MM_PER_TICK = 0.2794
-rain_count = 0
 rain_count_total = 0
-terminal_rain_count = 0
+
+
+###################################
+# PulseCounter
+# Argumentos: Ninguno
+# Return: PulseCounter - Contador con pulse() para el callback y take(head)
+# Descripcion: Contador de pulsos sin lock para los callbacks de GPIO. Solo el
+#              callback escribe `tail` (productor único: el hilo de callbacks de
+#              pigpio); cada consumidor guarda su propio `head` y toma la diferencia,
+#              así un reset nunca pisa un pulso que llega al mismo tiempo
+###################################
+class PulseCounter:
+    def __init__(self):
+        self.tail = 0
+
+    def pulse(self):
+        self.tail += 1
+
+    def take(self, head):
+        """Devuelve (pulsos desde head, nuevo head)"""
+        tail = self.tail
+        return tail - head, tail
+
+
+wind_pulses = PulseCounter()
+rain_pulses = PulseCounter()
+_wind_head = 0  # Consumidor: get_wind_speed
+_rain_record_head = 0  # Consumidor: fila por minuto de record_measurement
+_rain_terminal_head = 0  # Consumidor: lluvia por minuto de print_detailed_measurement
+_rain_log_head = 0  # Consumidor: avisos de lluvia del hilo de medición
 
 # Termistores
 A = 1.12924e-3
@@ -129,6 +245,55 @@ THERMISTOR_REF_RESISTANCES = {
     "T19": 10000,
 }
 
+# Parámetros beta de los termistores (10k NTC, B = 3435)
+NUM_THERMISTORS = 20
+THERMISTOR_KEYS = tuple(f"T{i}" for i in range(NUM_THERMISTORS))
+THERMISTOR_HEADERS = tuple(f"{key}[°C]" for key in THERMISTOR_KEYS)
+# Pares de columnas de la terminal: T0-T9 a la izquierda, T10-T19 a la derecha
+THERMISTOR_PRINT_PAIRS = tuple(zip(THERMISTOR_KEYS[:10], THERMISTOR_KEYS[10:]))
+# Resistencias de referencia indexadas por número de termistor (sin hash de strings)
+R_REF_TUPLE = tuple(THERMISTOR_REF_RESISTANCES[key] for key in THERMISTOR_KEYS)
+THERMISTOR_B = 3435.0
+THERMISTOR_T0 = 298.15
+
+# Encabezado del CSV diario, armado una sola vez
+CSV_HEADER = (
+    ("V0[V]", "V1[V]", "I0[A]", "I1[A]", "P0[W]", "P1[W]", "E0[Wh]", "E1[Wh]")
+    + ("Irr[W/m2]",)
+    + THERMISTOR_HEADERS
+    + ("Rain[mm]", "Wind_Speed[m/s]", "Wind_Direction", "DHT_HUM[%]", "DHT_TEMP[°C]")
+    + ("DateTime",)
+)
+CSV_HEADER_LINE = ",".join(CSV_HEADER) + CSV_LINE_END
+# Formato de las primeras 9 columnas (V, I, P, E de ambos INA228 e irradiancia)
+CSV_POWER_FMT = ",".join(["%.4f"] * 8 + ["%.2f"])
+
+# Grupos de termistores: (entrada AINx del ADS, primer termistor, canales usados)
+MUX_GROUPS = (
+    (3, 0, 8),  # MUX1: T0-T7 (Z1 -> A3)
+    (2, 8, 8),  # MUX2: T8-T15 (Z2 -> A2)
+    (1, 16, 4),  # MUX3: T16-T19 (Z3 -> A1)
+)
+IRRADIANCE_AIN = 1  # IRR+/IRR- por MUX3 (Z3 -> A1), canales 5 y 4
+WIND_VANE_AIN = 0  # Veleta directa en A0
+# Los tres MUX comparten S0-S2: cada canal se selecciona una sola vez y se leen los
+# termistores de todos los grupos conectados en ese canal (8 cambios en vez de 20)
+THERMISTOR_SWEEP = tuple(
+    (ch, tuple((ain, first + ch) for ain, first, count in MUX_GROUPS if ch < count))
+    for ch in range(8)
+)
+
+# ADS1115 en modo continuo a 860 SPS: al cambiar de entrada se descarta la conversión
+# en curso (iniciada con la entrada anterior) esperando dos conversiones completas;
+# el margen cubre la tolerancia del oscilador interno (±10 %)
+ADS_DATA_RATE = 860  # muestras por segundo
+ADS_SETTLE_S = 2.0 / ADS_DATA_RATE + 0.0005
+_REG_CONVERSION = bytes([0x00])
+# AINx vs GND, PGA ±4.096 V (gain=1), modo continuo, 860 SPS, comparador apagado
+_ADS_CONFIG_WORDS = tuple(bytes([0x01, 0xC2 | (ain << 4), 0xE3]) for ain in range(4))
+ADS_VOLTS_PER_LSB = 4.096 / 32767  # gain = 1, misma escala que AnalogIn
+_ADC_BUF = bytearray(2)
+
 DIRECTION_TABLE = {
     0.0: 33_000,
     22.5: 6_570,
@@ -167,12 +332,102 @@ COMPASS = {
     337.5: "NNW",
 }
 
+# Tabla de la veleta como dos arreglos paralelos (en orden de ángulo) para buscar
+# la resistencia más cercana con un solo argmin
+if NUMPY_AVAILABLE:
+    _DIR_ANGLE_ARR = np.array(sorted(DIRECTION_TABLE), dtype=np.float64)
+    _DIR_RES_ARR = np.array(
+        [DIRECTION_TABLE[a] for a in sorted(DIRECTION_TABLE)], dtype=np.float64
+    )
+
+# Núcleos compilados con Numba. Sin fastmath: las lecturas fallidas llegan como NaN
+# y fastmath asume que no existen, lo que rompería la validación
+if NUMBA_AVAILABLE:
+
+    @njit(cache=True)
+    def _temperatures_kernel(voltages, vcc, t0, b):
+        temps = np.empty(voltages.shape[0])
+        for i in range(voltages.shape[0]):
+            v = voltages[i]
+            if v > 0.0 and v < vcc:
+                temps[i] = 1.0 / (1.0 / t0 + math.log(v / (vcc - v)) / b) - 273.15
+            else:
+                temps[i] = np.nan
+        return temps
+
+    @njit(cache=True)
+    def _nearest_kernel(values, target):
+        best = 0
+        best_error = abs(values[0] - target)
+        for i in range(1, values.shape[0]):
+            error = abs(values[i] - target)
+            if error < best_error:
+                best = i
+                best_error = error
+        return best, best_error
+
+    # Primera llamada al importar: compila (o carga de la caché) antes de medir
+    _temperatures_kernel(np.zeros(NUM_THERMISTORS), 3.3, THERMISTOR_T0, THERMISTOR_B)
+    _nearest_kernel(_DIR_RES_ARR, 0.0)
+
+
+###################################
+# RingBuffer
+# Argumentos: size (int) - Cantidad de muestras que se conservan
+# Return: RingBuffer - Ventana con append(value), snapshot() y average(snapshot)
+# Descripcion: Últimas `size` muestras de una serie. Con NumPy vive en un arreglo
+#              preasignado y se promedia con una sola llamada; sin NumPy es un deque
+###################################
+class RingBuffer:
+    def __init__(self, size):
+        self.size = size
+        self.head = 0
+        self.count = 0
+        if NUMPY_AVAILABLE:
+            self.data = np.zeros(size, dtype=np.float64)
+        else:
+            self.data = deque(maxlen=size)
+
+    def append(self, value):
+        if NUMPY_AVAILABLE:
+            self.data[self.head] = value
+            self.head = (self.head + 1) % self.size
+            if self.count < self.size:
+                self.count += 1
+        else:
+            self.data.append(value)
+
+    def snapshot(self):
+        """Copia de las muestras actuales (lo único que hace falta bajo data_lock)"""
+        if NUMPY_AVAILABLE:
+            return self.data[: self.count].copy()
+        return list(self.data)
+
+    @staticmethod
+    def average(values):
+        """Promedio de un snapshot excluyendo NaN, o None si no hay datos"""
+        if NUMPY_AVAILABLE:
+            values = values[~np.isnan(values)]
+            return float(values.mean()) if values.size else None
+        return calculate_average(values)
+
+
 # Data storage
-dht_temps = deque(maxlen=12)
-dht_hums = deque(maxlen=12)
+dht_temps = RingBuffer(12)
+dht_hums = RingBuffer(12)
 VCC = 3.294
-wind_speeds_second = deque(maxlen=60)
-thermistor_readings = {f"T{i}": deque(maxlen=12) for i in range(20)}
+wind_speeds_second = RingBuffer(60)
+
+# Últimos barridos de termistores (cada 5 s → 1 minuto). Con NumPy es un buffer
+# circular (termistor x barrido) en float32 con NaN para lecturas inválidas
+THERMISTOR_WINDOW = 12
+if NUMPY_AVAILABLE:
+    _therm_buf = np.full((NUM_THERMISTORS, THERMISTOR_WINDOW), np.nan, np.float32)
+    _therm_head = 0
+else:
+    thermistor_readings = {
+        key: deque(maxlen=THERMISTOR_WINDOW) for key in THERMISTOR_KEYS
+    }
 
 # Control variables
 data_lock = threading.Lock()
@@ -180,7 +435,13 @@ running = False
 measuring_active = True
 file_recording_active = False
 current_csv_file = None
+_csv_fp = None
+_csv_path = None
+_csv_pending_rows = 0
+_last_state_save_slot = -1
+_last_state_hash = None
 ads = None
+pi = None
 adc_channels = []
 ina_sensors = {}
 anemometer = None
@@ -211,18 +472,23 @@ def is_within_operating_hours(now=None):
     if now is None:
         now = datetime.now()
 
-    start_hour, start_min = map(int, OPERATING_START_TIME.split(":"))
-    end_hour, end_min = map(int, OPERATING_END_TIME.split(":"))
+    return _within_operating_minute(now.hour, now.minute)
 
-    current_minutes = now.hour * 60 + now.minute
-    start_minutes = start_hour * 60 + start_min
-    end_minutes = end_hour * 60 + end_min
 
-    # Si el rango cruza medianoche
-    if end_minutes <= start_minutes:
-        return current_minutes >= start_minutes or current_minutes < end_minutes
-    else:
-        return start_minutes <= current_minutes < end_minutes
+###################################
+# _within_operating_minute
+# Argumentos: hour (int), minute (int) - Hora y minuto a verificar
+# Return: bool - True si el minuto cae dentro del horario de operación
+# Descripcion: Memoizada por (hora, minuto): el horario no cambia en ejecución, así
+#              que 1440 entradas cubren el día y nunca hace falta invalidarlas
+###################################
+@lru_cache(maxsize=1440)
+def _within_operating_minute(hour, minute):
+    current_minutes = hour * 60 + minute
+
+    if _CROSSES_MIDNIGHT:
+        return current_minutes >= _START_MINUTES or current_minutes < _END_MINUTES
+    return _START_MINUTES <= current_minutes < _END_MINUTES
 
 
 ###################################
@@ -233,7 +499,7 @@ def is_within_operating_hours(now=None):
 ###################################
 def get_operating_start_hour():
     """Retorna la hora de inicio de operación (0-23)"""
-    return int(OPERATING_START_TIME.split(":")[0])
+    return _START_HOUR
 
 
 ###################################
@@ -244,7 +510,7 @@ def get_operating_start_hour():
 ###################################
 def get_operating_end_hour():
     """Retorna la hora de fin de operación (0-23)"""
-    return int(OPERATING_END_TIME.split(":")[0])
+    return _END_HOUR
 
 
 ###################################
@@ -258,8 +524,7 @@ def is_time_to_create_daily_file(now=None):
     if now is None:
         now = datetime.now()
 
-    start_hour, start_min = map(int, OPERATING_START_TIME.split(":"))
-    return now.hour == start_hour and now.minute == start_min
+    return now.hour == _START_HOUR and now.minute == _START_MIN
 
 
 ###################################
@@ -273,38 +538,44 @@ def is_end_of_day(now=None):
     if now is None:
         now = datetime.now()
 
-    end_hour, end_min = map(int, OPERATING_END_TIME.split(":"))
-    return now.hour == end_hour and now.minute == end_min
+    return now.hour == _END_HOUR and now.minute == _END_MIN
 
 
 ###################################
-# TimeoutException
+# seconds_until_next_minute
 # Argumentos: Ninguno
-# Return: Exception class
-# Descripcion: Excepción personalizada para manejo de timeouts
+# Return: float - Segundos hasta el próximo cambio de minuto (con un pequeño margen)
+# Descripcion: Todos los eventos del bucle principal caen en límites de minuto
 ###################################
-class TimeoutException(Exception):
-    pass
+def seconds_until_next_minute():
+    return 60.0 - (time.time() % 60.0) + 0.05
 
 
 ###################################
-# timeout
-# Argumentos: duration (int) - Duración del timeout en segundos
-# Return: Context manager
-# Descripcion: Context manager para implementar timeout en operaciones I2C
+# seconds_until_operating_start
+# Argumentos: now (datetime, opcional) - Momento de referencia
+# Return: float - Segundos que faltan para el inicio del horario de operación
+# Descripcion: Calcula la espera hasta OPERATING_START_TIME (hoy o mañana)
 ###################################
-@contextmanager
-def timeout(duration):
-    def timeout_handler(signum, frame):
-        raise TimeoutException(f"Timeout después de {duration} segundos")
+def seconds_until_operating_start(now=None):
+    if now is None:
+        now = datetime.now()
+
+    current_seconds = (
+        now.hour * 3600 + now.minute * 60 + now.second + now.microsecond / 1e6
+    )
+    return (_START_MINUTES * 60 - current_seconds) % 86400
 
-    signal.signal(signal.SIGALRM, timeout_handler)
-    signal.alarm(duration)
 
-    try:
-        yield
-    finally:
-        signal.alarm(0)
+# Las lecturas de INA228 corren en un hilo aparte y se esperan con timeout: funciona
+# desde cualquier hilo (SIGALRM solo sirve en el principal) y no cuesta syscalls de
+# señales por lectura. Un solo worker: si el bus se cuelga, no se apilan más hilos
+_ina_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ina228")
+
+# Pool de adquisición: solapa las esperas del DHT22 (GPIO) con el barrido de MUX y
+# ADS1115, y las lecturas INA228 con las pausas de asentamiento del ADS. En el bus I2C
+# compartido cada transacción toma el bloqueo del bus, así que nunca se mezclan
+_acq_pool = ThreadPoolExecutor(max_workers=3, thread_name_prefix="acq")
 
 
 ###################################
@@ -348,6 +619,9 @@ def setup_ina228(i2c, address):
         if hasattr(s, "reset_accumulators"):
             s.reset_accumulators()
 
+        # Lectura por registros, ligada tras la calibración (LSB ya definido)
+        s._read_all = _make_ina228_reader(s)
+
         return s
 
     except Exception:
@@ -363,13 +637,14 @@ def setup_ina228(i2c, address):
 ###################################
 def initialize_hardware():
     """Inicializa todo el hardware con validación mejorada"""
-    global ads, adc_channels, ina_sensors, anemometer, rain_sensor, system_start_time
-    global rain_count, rain_count_total, wind_count  # ASEGURAR INICIALIZACIÓN
+    global ads, adc_channels, ina_sensors, anemometer, rain_sensor, system_start_time, pi
+    global rain_count_total, _wind_head, _rain_record_head, _rain_terminal_head
+    global _rain_log_head, _mux_channel
 
-    # VALIDACIÓN CRÍTICA: Inicializar contadores explícitamente
-    rain_count = 0
+    # Los consumidores arrancan desde la cuenta actual de pulsos
     rain_count_total = 0
-    wind_count = 0
+    _wind_head = wind_pulses.tail
+    _rain_record_head = _rain_terminal_head = _rain_log_head = rain_pulses.tail
 
     # Cleanup previo
     try:
@@ -389,15 +664,24 @@ def initialize_hardware():
     if INFLUX_AVAILABLE:
         influx_initialized = init_influxdb()
         if influx_initialized:
+            # Las mediciones se encolan y un hilo las envía por lotes
+            start_influx_flusher()
             print("✓ InfluxDB inicializado")
         else:
             print("⚠ InfluxDB no pudo inicializarse - solo CSV")
     else:
         influx_initialized = False
 
-    # GPIO Setup para MUX
+    # GPIO Setup para MUX (pigpiod)
     try:
-        GPIO.setup([MUX_S0, MUX_S1, MUX_S2], GPIO.OUT)
+        if pi is None or not pi.connected:
+            pi = pigpio.pi()
+        if not pi.connected:
+            print("Error: pigpiod no está corriendo (iniciar con: sudo pigpiod)")
+            return False
+        for pin in (MUX_S0, MUX_S1, MUX_S2):
+            pi.set_mode(pin, pigpio.OUTPUT)
+        _mux_channel = MUX_UNKNOWN
         print("GPIO para MUX configurado correctamente")
     except Exception as e:
         print(f"Error configurando GPIO para MUX: {e}")
@@ -405,7 +689,7 @@ def initialize_hardware():
 
     # I2C Setup
     try:
-        i2c = busio.I2C(board.SCL, board.SDA)
+        i2c = busio.I2C(board.SCL, board.SDA, frequency=I2C_FREQUENCY)
         print("Bus I2C inicializado")
     except Exception as e:
         print(f"Error inicializando I2C: {e}")
@@ -416,6 +700,8 @@ def initialize_hardware():
         try:
             ads = ADS.ADS1115(i2c, address=0x48)
             ads.gain = 1
+            ads.data_rate = ADS_DATA_RATE
+            ads.mode = Mode.CONTINUOUS
             adc_channels = [
                 AnalogIn(ads, ADS.P3),  # A3 -> Z1 (MUX1)
                 AnalogIn(ads, ADS.P2),  # A2 -> Z2 (MUX2)
@@ -477,7 +763,8 @@ def initialize_hardware():
 
     # VALIDACIÓN FINAL: Verificar que los contadores siguen siendo números
     print(
-        f"[INIT] Contadores inicializados: rain_count={rain_count}, wind_count={wind_count}"
+        f"[INIT] Contadores inicializados: lluvia={rain_pulses.tail}, "
+        f"viento={wind_pulses.tail}"
     )
 
     return True
@@ -490,81 +777,159 @@ def initialize_hardware():
 # Descripcion: Callback para interrupciones del anemómetro, incrementa contador de pulsos de viento
 ###################################
 def wind_pulse():
-    global wind_count
-    wind_count += 1
+    wind_pulses.pulse()
 
 
 ###################################
 # rain_pulse
 # Argumentos: Ninguno
 # Return: None
-# Descripcion: Callback para pulsos del pluviómetro, actualiza contadores de lluvia y muestra información
+# Descripcion: Callback para pulsos del pluviómetro. Solo cuenta el pulso: el aviso en
+#              terminal lo imprime log_rain_pulses desde el hilo de medición
 ###################################
 def rain_pulse():
     """Callback para pulsos del pluviómetro"""
-    global rain_count, rain_count_total, terminal_rain_count
-    rain_count += 1
-    rain_count_total += 1
-    terminal_rain_count += 1
+    rain_pulses.pulse()
+
+
+###################################
+# log_rain_pulses
+# Argumentos: Ninguno
+# Return: None
+# Descripcion: Imprime los avisos de lluvia de los pulsos llegados desde la última
+#              llamada (fuera del callback, una vez por segundo como máximo)
+###################################
+def log_rain_pulses():
+    global _rain_log_head
+
+    new_ticks, _rain_log_head = rain_pulses.take(_rain_log_head)
+    if not new_ticks:
+        return
 
+    # Solo lectura de las posiciones de los demás consumidores
+    tail = _rain_log_head
+    total_ticks = rain_count_total + tail - _rain_record_head
+    terminal_ticks = tail - _rain_terminal_head
     timestamp = datetime.now().strftime("%H:%M:%S")
-    total_mm = rain_count_total * MM_PER_TICK
-    min_rain = rain_count * MM_PER_TICK
-    print(f"[{timestamp}] ⚡ LLUVIA #{rain_count_total} -> {total_mm:.3f}mm total")
-    print(
-        f"[{timestamp}] ⚡ LLUVIA #{terminal_rain_count} -> {min_rain:.3f}mm en un minuto"
-    )
+    total_mm = total_ticks * MM_PER_TICK
+    min_rain = (tail - _rain_record_head) * MM_PER_TICK
+    print(f"[{timestamp}] ⚡ LLUVIA #{total_ticks} -> {total_mm:.3f}mm total")
+    print(f"[{timestamp}] ⚡ LLUVIA #{terminal_ticks} -> {min_rain:.3f}mm en un minuto")
 
 
 ###################################
 # set_mux_channel
-# Argumentos: channel (int) - Canal del multiplexor (0-7)
+# Argumentos: channel (int) - Canal del multiplexor (0-7), settle (float) - Espera en s
 # Return: bool - True si configuración exitosa, False si falla
-# Descripcion: Configura el canal activo de los multiplexores CD74HC4051 mediante GPIO
+# Descripcion: Configura el canal activo de los multiplexores CD74HC4051 con
+#              escrituras de banco en pigpiod; solo envía los bits que cambian y no
+#              hace nada si el canal ya está seleccionado
 ###################################
-def set_mux_channel(channel):
+def set_mux_channel(channel, settle=MUX_SETTLE_S):
+    global _mux_channel
+
+    if channel == _mux_channel:
+        return True
+
     try:
-        GPIO.output(MUX_S0, channel & 0x01)
-        GPIO.output(MUX_S1, (channel >> 1) & 0x01)
-        GPIO.output(MUX_S2, (channel >> 2) & 0x01)
-        time.sleep(GPIO_SETUP_DELAY)
+        clear_bits, set_bits = _MUX_TRANSITIONS[_mux_channel][channel]
+        if clear_bits:
+            pi.clear_bank_1(clear_bits)
+        if set_bits:
+            pi.set_bank_1(set_bits)
+        _mux_channel = channel
+        time.sleep(settle)
         return True
     except Exception:
+        _mux_channel = MUX_UNKNOWN
         return False
 
 
+###################################
+# read_ads
+# Argumentos: ain (int) - Entrada AIN0-3 del ADS1115
+# Return: float - Voltaje leído
+# Descripcion: Selecciona la entrada (el ADS sigue en modo continuo), espera dos
+#              conversiones para descartar la muestra previa al cambio de entrada o de
+#              canal del MUX y lee el registro de conversión directo
+###################################
+def read_ads(ain):
+    device = getattr(ads, "i2c_device", None)
+    if device is None:
+        # Valor crudo escalado con la constante, sin la tabla de ganancias de AnalogIn
+        return adc_channels[3 - ain].value * ADS_VOLTS_PER_LSB
+
+    with device as d:
+        d.write(_ADS_CONFIG_WORDS[ain])
+    time.sleep(ADS_SETTLE_S)
+    with device as d:
+        d.write_then_readinto(_REG_CONVERSION, _ADC_BUF)
+    return int.from_bytes(_ADC_BUF, "big", signed=True) * ADS_VOLTS_PER_LSB
+
+
 ###################################
 # calculate_resistance
-# Argumentos: voltage (float), thermistor_id (str), vcc (float, opcional)
+# Argumentos: voltage (float), idx (int) - Número de termistor, vcc (float, opcional)
 # Return: float - Resistencia calculada en ohms
 # Descripcion: Calcula la resistencia de un termistor basado en el divisor de voltaje
 ###################################
-def calculate_resistance(voltage, thermistor_id, vcc=VCC):
+def calculate_resistance(voltage, idx, vcc=VCC):
     if voltage <= 0 or voltage >= vcc:
         return float("inf")
 
-    r_ref = THERMISTOR_REF_RESISTANCES.get(thermistor_id, 10000)
-    return r_ref * voltage / (vcc - voltage)
+    return R_REF_TUPLE[idx] * voltage / (vcc - voltage)
 
 
 ###################################
 # calculate_temperature
-# Argumentos: resistance (float), thermistor_id (str)
+# Argumentos: resistance (float), idx (int) - Número de termistor
 # Return: float - Temperatura en grados Celsius
 # Descripcion: Convierte resistencia de termistor a temperatura usando ecuación de Steinhart-Hart simplificada
 ###################################
-def calculate_temperature(resistance, thermistor_id):
+def calculate_temperature(resistance, idx):
     if resistance <= 0:
         return float("nan")
 
-    R0 = THERMISTOR_REF_RESISTANCES.get(thermistor_id, 10000.0)
-    B = 3435.0
-    T0 = 298.15
-
-    T_kelvin = 1 / ((1 / T0) + (1 / B) * math.log(resistance / R0))
+    T_kelvin = 1 / (
+        (1 / THERMISTOR_T0)
+        + (1 / THERMISTOR_B) * math.log(resistance / R_REF_TUPLE[idx])
+    )
     return T_kelvin - 273.15
 
 
+###################################
+# compute_temperatures
+# Argumentos: voltages (list) - Voltajes de T0-T19 (NaN si la lectura falló)
+# Return: list - Temperaturas en grados Celsius (NaN si el voltaje es inválido)
+# Descripcion: Convierte los 20 voltajes de una vez (núcleo Numba si está disponible).
+#              Con NumPy es una sola expresión vectorizada; como R0 de cada termistor es su resistencia de referencia,
+#              log(R / R0) se reduce a log(V / (VCC - V))
+###################################
+def compute_temperatures(voltages):
+    if NUMBA_AVAILABLE:
+        v = np.asarray(voltages, dtype=np.float64)
+        return _temperatures_kernel(v, VCC, THERMISTOR_T0, THERMISTOR_B).tolist()
+
+    if NUMPY_AVAILABLE:
+        v = np.asarray(voltages, dtype=np.float64)
+        valid = (v > 0) & (v < VCC)  # NaN de lecturas fallidas queda como inválido
+        with np.errstate(divide="ignore", invalid="ignore"):
+            temps = (
+                1.0 / (1.0 / THERMISTOR_T0 + np.log(v / (VCC - v)) / THERMISTOR_B)
+                - 273.15
+            )
+        return np.where(valid, temps, np.nan).tolist()
+
+    temps = []
+    for idx, voltage in enumerate(voltages):
+        if 0 < voltage < VCC:
+            resistance = calculate_resistance(voltage, idx)
+            temps.append(calculate_temperature(resistance, idx))
+        else:
+            temps.append(float("nan"))
+    return temps
+
+
 ###################################
 # get_wind_speed
 # Argumentos: Ninguno
@@ -572,15 +937,17 @@ def calculate_temperature(resistance, thermistor_id):
 # Descripcion: Calcula velocidad del viento basada en pulsos del anemómetro durante período de medición
 ###################################
 def get_wind_speed():
-    global wind_count, last_wind_measurement
+    global _wind_head, last_wind_measurement
 
     current_time = time.time()
     time_elapsed = current_time - last_wind_measurement
 
-    if time_elapsed >= MEASUREMENT_PERIOD:
+    # measurement_thread despierta con plazos fijos de 1 s; la tolerancia evita
+    # descartar una muestra por microsegundos de diferencia entre llamadas
+    if time_elapsed >= MEASUREMENT_PERIOD * 0.9:
+        wind_count, _wind_head = wind_pulses.take(_wind_head)
         cps = wind_count / time_elapsed
         wind_ms = cps * (KPH_PER_COUNT_PER_SEC / 3.6)
-        wind_count = 0
         last_wind_measurement = current_time
         return wind_ms
 
@@ -598,20 +965,29 @@ def get_wind_direction_internal():
         return None, None
 
     try:
-        voltage = adc_channels[3].voltage
+        voltage = read_ads(WIND_VANE_AIN)
 
         if voltage is None or voltage <= 0:
             return None, None
 
         resistance = R_REF * voltage / (3.3 - voltage)
 
-        closest_angle = None
-        smallest_error = math.inf
-        for angle, res_nom in DIRECTION_TABLE.items():
-            error = abs(res_nom - resistance)
-            if error < smallest_error:
-                smallest_error = error
-                closest_angle = angle
+        if NUMBA_AVAILABLE:
+            idx, smallest_error = _nearest_kernel(_DIR_RES_ARR, resistance)
+            closest_angle = float(_DIR_ANGLE_ARR[idx])
+        elif NUMPY_AVAILABLE:
+            diffs = np.abs(_DIR_RES_ARR - resistance)
+            idx = int(diffs.argmin())
+            closest_angle = float(_DIR_ANGLE_ARR[idx])
+            smallest_error = float(diffs[idx])
+        else:
+            closest_angle = None
+            smallest_error = math.inf
+            for angle, res_nom in DIRECTION_TABLE.items():
+                error = abs(res_nom - resistance)
+                if error < smallest_error:
+                    smallest_error = error
+                    closest_angle = angle
 
         tolerance = 0.15
         if (
@@ -646,52 +1022,24 @@ def get_wind_direction():
 # Descripcion: Lee todos los termistores (T0-T19) sin mutex interno, usa multiplexores
 ###################################
 def read_thermistors_internal():
-    temperatures = {}
-
     if ads is None or len(adc_channels) < 3:
-        return temperatures
+        return {}
 
+    # NaN para los canales que no se pudieron leer
+    voltages = [float("nan")] * NUM_THERMISTORS
     try:
-        # MUX1: T0-T7
-        for ch in range(8):
-            thermistor_id = f"T{ch}"
-            if set_mux_channel(ch):
-                try:
-                    voltage = adc_channels[0].voltage
-                    resistance = calculate_resistance(voltage, thermistor_id)
-                    temp = calculate_temperature(resistance, thermistor_id)
-                    temperatures[thermistor_id] = temp
-                except Exception:
-                    temperatures[thermistor_id] = float("nan")
-
-        # MUX2: T8-T15
-        for ch in range(8):
-            thermistor_id = f"T{ch+8}"
-            if set_mux_channel(ch):
-                try:
-                    voltage = adc_channels[1].voltage
-                    resistance = calculate_resistance(voltage, thermistor_id)
-                    temp = calculate_temperature(resistance, thermistor_id)
-                    temperatures[thermistor_id] = temp
-                except Exception:
-                    temperatures[thermistor_id] = float("nan")
-
-        # MUX3: T16-T19
-        for ch in range(4):
-            thermistor_id = f"T{ch+16}"
-            if set_mux_channel(ch):
+        for ch, targets in THERMISTOR_SWEEP:
+            if not set_mux_channel(ch):
+                continue
+            for ain, idx in targets:
                 try:
-                    voltage = adc_channels[2].voltage
-                    resistance = calculate_resistance(voltage, thermistor_id)
-                    temp = calculate_temperature(resistance, thermistor_id)
-                    temperatures[thermistor_id] = temp
+                    voltages[idx] = read_ads(ain)
                 except Exception:
-                    temperatures[thermistor_id] = float("nan")
-
+                    pass
     except Exception:
         pass
 
-    return temperatures
+    return dict(zip(THERMISTOR_KEYS, compute_temperatures(voltages)))
 
 
 ###################################
@@ -739,6 +1087,104 @@ def read_dht22():
         return None, None
 
 
+###################################
+# _read_ina228_values
+# Argumentos: sensor (INA228) - Sensor ya inicializado
+# Return: dict - Diccionario con voltage, current, power, energy, temperature
+# Descripcion: Lee las propiedades del INA228 (camino sin acceso a registros)
+###################################
+def _read_ina228_values(sensor):
+    values = {}
+
+    # VALIDACIÓN CRÍTICA: Asegurar que no hay None
+    try:
+        voltage_raw = sensor.bus_voltage
+        values["voltage"] = voltage_raw if voltage_raw is not None else 0.0
+    except Exception:
+        values["voltage"] = 0.0
+
+    try:
+        current_raw = sensor.current
+        values["current"] = current_raw if current_raw is not None else 0.0
+    except Exception:
+        values["current"] = 0.0
+
+    try:
+        power_raw = sensor.power
+        values["power"] = power_raw if power_raw is not None else 0.0
+    except Exception:
+        values["power"] = 0.0
+
+    try:
+        energy_raw = getattr(sensor, "energy", 0.0)
+        values["energy"] = energy_raw if energy_raw is not None else 0.0
+    except Exception:
+        values["energy"] = 0.0
+
+    try:
+        temp_raw = getattr(sensor, "die_temperature", float("nan"))
+        values["temperature"] = temp_raw if temp_raw is not None else float("nan")
+    except Exception:
+        values["temperature"] = float("nan")
+
+    return values
+
+
+###################################
+# _read_ina_register
+# Argumentos: device (I2CDevice), register (bytes), nbytes (int) - Tamaño del registro
+# Return: int - Valor sin signo del registro (big-endian)
+# Descripcion: Lee un registro del INA228 en el buffer preasignado
+###################################
+def _read_ina_register(device, register, nbytes):
+    device.write_then_readinto(register, _INA_READ_BUF, in_end=nbytes)
+    return int.from_bytes(_INA_READ_BUF[:nbytes], "big")
+
+
+###################################
+# _make_ina228_reader
+# Argumentos: sensor (INA228) - Sensor ya calibrado
+# Return: function - Función sin argumentos que devuelve el dict de lectura
+# Descripcion: Liga la lectura por registros con el dispositivo y las escalas (LSB)
+#              resueltos una sola vez; si la librería no expone i2c_device usa
+#              las propiedades
+###################################
+def _make_ina228_reader(sensor):
+    device = getattr(sensor, "i2c_device", None)
+    if device is None:
+        return lambda: _read_ina228_values(sensor)
+
+    # LSB de corriente (Imax / 2^19) y escalas derivadas calculadas una sola vez
+    current_lsb = getattr(sensor, "_current_lsb", IMAX_AMPS / 524288)
+    power_lsb = 3.2 * current_lsb
+    energy_lsb = 16 * power_lsb
+    read_register = _read_ina_register
+
+    def read_all():
+        # Todas las lecturas bajo un solo bloqueo del bus
+        with device as d:
+            vbus = read_register(d, _INA_REG_VBUS, 3) >> 4
+            current = read_register(d, _INA_REG_CURRENT, 3) >> 4
+            power = read_register(d, _INA_REG_POWER, 3)
+            energy = read_register(d, _INA_REG_ENERGY, 5)
+            dietemp = read_register(d, _INA_REG_DIETEMP, 2)
+
+        if current & 0x80000:
+            current -= 0x100000
+        if dietemp & 0x8000:
+            dietemp -= 0x10000
+
+        return {
+            "voltage": vbus * INA_VBUS_LSB,
+            "current": current * current_lsb,
+            "power": power * power_lsb,
+            "energy": energy * energy_lsb,  # J
+            "temperature": dietemp * INA_DIETEMP_LSB,
+        }
+
+    return read_all
+
+
 ###################################
 # read_ina228
 # Argumentos: address (int) - Dirección I2C, name (str) - Nombre del sensor
@@ -752,46 +1198,11 @@ def read_ina228(address, name):
         return None
 
     for attempt in range(MAX_RETRY_ATTEMPTS):
+        future = _ina_executor.submit(sensor._read_all)
         try:
-            with timeout(SENSOR_READ_TIMEOUT):
-                values = {}
-
-                # VALIDACIÓN CRÍTICA: Asegurar que no hay None
-                try:
-                    voltage_raw = sensor.bus_voltage
-                    values["voltage"] = voltage_raw if voltage_raw is not None else 0.0
-                except Exception:
-                    values["voltage"] = 0.0
-
-                try:
-                    current_raw = sensor.current
-                    values["current"] = current_raw if current_raw is not None else 0.0
-                except Exception:
-                    values["current"] = 0.0
-
-                try:
-                    power_raw = sensor.power
-                    values["power"] = power_raw if power_raw is not None else 0.0
-                except Exception:
-                    values["power"] = 0.0
-
-                try:
-                    energy_raw = getattr(sensor, "energy", 0.0)
-                    values["energy"] = energy_raw if energy_raw is not None else 0.0
-                except Exception:
-                    values["energy"] = 0.0
-
-                try:
-                    temp_raw = getattr(sensor, "die_temperature", float("nan"))
-                    values["temperature"] = (
-                        temp_raw if temp_raw is not None else float("nan")
-                    )
-                except Exception:
-                    values["temperature"] = float("nan")
-
-                return values
-
-        except (TimeoutException, Exception):
+            return future.result(timeout=SENSOR_READ_TIMEOUT)
+        except (FutureTimeoutError, Exception):
+            future.cancel()
             if attempt < 1:
                 time.sleep(1)
 
@@ -823,7 +1234,7 @@ def read_irradiance_internal():
         if not set_mux_channel(4):
             return 0.0, 0.0
         time.sleep(0.1)  # Tiempo de estabilización del ADS después del cambio de canal
-        voltage_minus = adc_channels[2].voltage
+        voltage_minus = read_ads(IRRADIANCE_AIN)
         # VALIDACIÓN: Asegurar que no es None
         if voltage_minus is None:
             voltage_minus = 0.0
@@ -832,7 +1243,7 @@ def read_irradiance_internal():
         if not set_mux_channel(5):
             return 0.0, 0.0
         time.sleep(0.1)  # Tiempo de estabilización del ADS después del cambio de canal
-        voltage_plus = adc_channels[2].voltage
+        voltage_plus = read_ads(IRRADIANCE_AIN)
         # VALIDACIÓN: Asegurar que no es None
         if voltage_plus is None:
             voltage_plus = 0.0
@@ -898,12 +1309,119 @@ def calculate_average(data_list):
 
 
 ###################################
-# save_system_state
+# push_thermistor_temps
+# Argumentos: temps (dict) - Temperaturas T0-T19 de un barrido
+# Return: None
+# Descripcion: Guarda un barrido en el historial; las temperaturas fuera de rango no
+#              se promedian. Llamar con data_lock tomado
+###################################
+def push_thermistor_temps(temps):
+    global _therm_head
+
+    if not temps:  # Barrido fallido: no ocupa lugar en el historial
+        return
+
+    if NUMPY_AVAILABLE:
+        _therm_buf[:, _therm_head] = [
+            temp if is_valid_temperature(temp) else np.nan
+            for temp in (temps.get(key) for key in THERMISTOR_KEYS)
+        ]
+        _therm_head = (_therm_head + 1) % THERMISTOR_WINDOW
+        return
+
+    for sensor, temp in temps.items():
+        if is_valid_temperature(temp):
+            thermistor_readings[sensor].append(temp)
+
+
+###################################
+# snapshot_thermistors
 # Argumentos: Ninguno
-# Return: bool - True si guardado exitoso, False si falla
-# Descripcion: Guarda estado actual del sistema en archivos JSON principal y backup
+# Return: ndarray o dict - Copia del historial de termistores
+# Descripcion: Copia el historial para promediarlo fuera del lock. Llamar con
+#              data_lock tomado
+###################################
+def snapshot_thermistors():
+    if NUMPY_AVAILABLE:
+        return _therm_buf.copy()
+    return {key: list(readings) for key, readings in thermistor_readings.items()}
+
+
+###################################
+# get_thermistor_averages
+# Argumentos: history - Copia obtenida con snapshot_thermistors()
+# Return: dict - Promedio por termistor (None si no hay lecturas válidas)
+# Descripcion: Promedia el historial de los 20 termistores de una vez (sin lock)
+###################################
+def get_thermistor_averages(history):
+    if NUMPY_AVAILABLE:
+        valid = ~np.isnan(history)
+        counts = valid.sum(axis=1)
+        sums = np.where(valid, history, 0.0).sum(axis=1, dtype=np.float64)
+        # Una división vectorizada y tolist(): sin indexar escalares de NumPy por
+        # sensor; las posiciones siguen el orden fijo de THERMISTOR_KEYS
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = (sums / counts).tolist()
+        return {
+            key: mean if count else None
+            for key, mean, count in zip(THERMISTOR_KEYS, means, counts.tolist())
+        }
+
+    return {key: calculate_average(values) for key, values in history.items()}
+
+
+###################################
+# format_thermistor_columns
+# Argumentos: avg_thermistors (dict) - Promedio por termistor (None o NaN si no hay)
+# Return: list - 20 columnas de texto ("%.2f" o "N/A")
+# Descripcion: Formatea los termistores en orden T0-T19; con NumPy en una sola
+#              llamada vectorizada sobre el arreglo de promedios
+###################################
+def format_thermistor_columns(avg_thermistors):
+    temps = [avg_thermistors.get(key) for key in THERMISTOR_KEYS]
+
+    if NUMPY_AVAILABLE:
+        values = np.array(
+            [np.nan if temp is None else temp for temp in temps], dtype=np.float64
+        )
+        columns = np.char.mod("%.2f", values).astype(object)
+        columns[np.isnan(values)] = "N/A"
+        return columns.tolist()
+
+    return [
+        "N/A" if temp is None or math.isnan(temp) else f"{temp:.2f}" for temp in temps
+    ]
+
+
+###################################
+# _write_file_atomic
+# Argumentos: path (str) - Archivo destino, data (bytes) - Contenido completo
+# Return: None
+# Descripcion: Escribe en un temporal, fsync y os.replace: el archivo nunca queda a medias
+###################################
+def _write_file_atomic(path, data):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+###################################
+# save_system_state
+# Argumentos: force (bool) - Guardar aunque ya se haya guardado en esta ventana
+# Return: bool - True si guardado exitoso (u omitido por intervalo), False si falla
+# Descripcion: Guarda estado actual del sistema en archivos JSON principal y backup,
+#              como máximo una vez cada STATE_SAVE_INTERVAL segundos
 ###################################
-def save_system_state():
+def save_system_state(force=False):
+    global _last_state_save_slot, _last_state_hash
+
+    slot = int(time.time() // STATE_SAVE_INTERVAL)
+    if not force and slot == _last_state_save_slot:
+        return True
+
     try:
         now = datetime.now()
 
@@ -926,7 +1444,6 @@ def save_system_state():
                     current_energy[f"0x{address:02X}"] = energy_offset.get(address, 0.0)
 
         state = {
-            "timestamp": now.strftime("%Y-%m-%d %H:%M:%S"),
             "current_csv_file": current_csv_file,
             "measuring_active": measuring_active,
             "file_recording_active": file_recording_active,
@@ -939,16 +1456,34 @@ def save_system_state():
             "energy_accumulated": current_energy,  # Guardar energía acumulada
         }
 
-        if current_csv_file and os.path.exists(current_csv_file):
-            state["file_creation_time"] = os.path.getctime(current_csv_file)
-            state["file_size"] = os.path.getsize(current_csv_file)
+        if current_csv_file:
+            try:
+                st = os.stat(current_csv_file)  # Un solo stat para fecha y tamaño
+                state["file_creation_time"] = st.st_ctime
+                state["file_size"] = st.st_size
+            except OSError:
+                pass
 
-        with open(STATE_FILE, "w", encoding="utf-8") as f:
-            json.dump(state, f, indent=2)
+        # Si nada cambió desde el último guardado (sin contar la hora) no se
+        # toca la SD
+        if ORJSON_AVAILABLE:
+            state_hash = hash(orjson.dumps(state, option=orjson.OPT_SORT_KEYS))
+        else:
+            state_hash = hash(json.dumps(state, sort_keys=True, separators=(",", ":")))
+        _last_state_save_slot = slot
+        if not force and state_hash == _last_state_hash:
+            return True
 
-        with open(BACKUP_STATE_FILE, "w", encoding="utf-8") as f:
-            json.dump(state, f, indent=2)
+        # Serializar una sola vez para ambos archivos
+        state = {"timestamp": now.strftime("%Y-%m-%d %H:%M:%S"), **state}
+        if ORJSON_AVAILABLE:
+            data = orjson.dumps(state, option=orjson.OPT_INDENT_2)
+        else:
+            data = json.dumps(state, indent=2).encode("utf-8")
+        _write_file_atomic(STATE_FILE, data)
+        _write_file_atomic(BACKUP_STATE_FILE, data)
 
+        _last_state_hash = state_hash
         return True
 
     except Exception:
@@ -966,11 +1501,10 @@ def load_system_state():
 
     for state_file in state_files:
         try:
-            if not os.path.exists(state_file):
-                continue
-
-            with open(state_file, "r", encoding="utf-8") as f:
-                state = json.load(f)
+            # Lectura completa de una vez y parseo en memoria
+            with open(state_file, "rb") as f:
+                data = f.read()
+            state = orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data)
 
             return state
 
@@ -1069,13 +1603,11 @@ def restore_system_state(state):
 # Descripcion: Elimina archivos de estado JSON al finalizar el sistema
 ###################################
 def cleanup_state_file():
-    try:
-        if os.path.exists(STATE_FILE):
-            os.remove(STATE_FILE)
-        if os.path.exists(BACKUP_STATE_FILE):
-            os.remove(BACKUP_STATE_FILE)
-    except Exception:
-        pass
+    for state_file in (STATE_FILE, BACKUP_STATE_FILE):
+        try:
+            os.remove(state_file)
+        except OSError:
+            pass
 
 
 ###################################
@@ -1086,20 +1618,22 @@ def cleanup_state_file():
 ###################################
 def find_current_day_file():
     try:
-        mediciones_dir = "/home/pi/Desktop/Mediciones"
-        if not os.path.exists(mediciones_dir):
-            return None
-
-        now = datetime.now()
-        current_date_str = now.strftime("%Y%m%d")
-        pattern = f"data_{current_date_str}_*.csv"
-        files = glob.glob(os.path.join(mediciones_dir, pattern))
-
-        if files:
-            latest_file = max(files, key=os.path.getmtime)
-            return latest_file
-
-        return None
+        prefix = f"data_{datetime.now():%Y%m%d}_".encode()
+        latest_file = None
+        latest_mtime = -1.0
+
+        # Un solo recorrido del directorio; stat solo para los archivos del día.
+        # Con la ruta en bytes los nombres llegan sin decodificar y se filtran
+        # comparando bytes; solo el archivo elegido se convierte a str
+        with os.scandir(_MEDICIONES_DIR_B) as entries:
+            for entry in entries:
+                name = entry.name
+                if name.startswith(prefix) and name.endswith(b".csv"):
+                    mtime = entry.stat().st_mtime
+                    if mtime > latest_mtime:
+                        latest_file, latest_mtime = entry.path, mtime
+
+        return os.fsdecode(latest_file) if latest_file is not None else None
 
     except Exception:
         return None
@@ -1127,7 +1661,7 @@ def check_and_create_missing_file():
         last_file_creation_day = current_day
         return True
 
-    if current_csv_file and os.path.exists(current_csv_file) and file_recording_active:
+    if current_csv_file and file_recording_active and csv_file_exists():
         return False
 
     if last_file_creation_day == current_day:
@@ -1182,22 +1716,22 @@ def initialize_system_with_enhanced_recovery():
 
 ###################################
 # enhanced_main_loop_check
-# Argumentos: Ninguno
+# Argumentos: now (datetime, opcional) - Momento de la iteración,
+#             within (bool, opcional) - Resultado ya calculado de is_within_operating_hours
 # Return: str - Estado del chequeo ("file_created" o "normal")
 # Descripcion: Verifica integridad del sistema y crea archivos faltantes durante bucle principal
 ###################################
-def enhanced_main_loop_check():
-    now = datetime.now()
+def enhanced_main_loop_check(now=None, within=None):
+    if now is None:
+        now = datetime.now()
+    if within is None:
+        within = is_within_operating_hours(now)
     current_minute = now.minute
 
     if (
         current_minute % 5 == 0
-        and is_within_operating_hours(now)
-        and (
-            not current_csv_file
-            or not os.path.exists(current_csv_file)
-            or not file_recording_active
-        )
+        and within
+        and (not current_csv_file or not file_recording_active or not csv_file_exists())
     ):
 
         if check_and_create_missing_file():
@@ -1207,112 +1741,226 @@ def enhanced_main_loop_check():
 
 
 ###################################
-# print_detailed_measurement
+# collect_detailed_values
 # Argumentos: Ninguno
+# Return: dict - Valores para print_detailed_measurement leídos en vivo
+# Descripcion: Lee INA228, irradiancia y veleta y promedia los datos del hilo de
+#              medición; solo se usa cuando no hay una medición principal reciente
+###################################
+def collect_detailed_values():
+    values = {"ina": {addr: read_ina228(addr, name) for addr, name in INA228_NAMES}}
+
+    try:
+        values["irradiance"] = read_irradiance()[1]
+    except Exception:
+        values["irradiance"] = None
+
+    values["wind_angle"], values["wind_dir"] = get_wind_direction()
+
+    with data_lock:
+        thermistor_history = snapshot_thermistors()
+        wind_values = wind_speeds_second.snapshot()
+        dht_temp_values = dht_temps.snapshot()
+        dht_hum_values = dht_hums.snapshot()
+
+    values["thermistors"] = get_thermistor_averages(thermistor_history)
+    values["wind_avg"] = RingBuffer.average(wind_values)
+    values["dht_temp"] = RingBuffer.average(dht_temp_values)
+    values["dht_hum"] = RingBuffer.average(dht_hum_values)
+    return values
+
+
+###################################
+# print_detailed_measurement
+# Argumentos: timestamp (str, opcional) - Hora "HH:MM:SS" ya formateada por el llamador,
+#             values (dict, opcional) - Valores ya medidos (ver collect_detailed_values)
 # Return: None
-# Descripcion: Imprime medición detallada y estructurada de todos los sensores en terminal
+# Descripcion: Imprime medición detallada y estructurada de todos los sensores en terminal.
+#              Sin values hace una lectura propia del hardware
 ###################################
-def print_detailed_measurement():
+def print_detailed_measurement(timestamp=None, values=None):
     """Imprime medición detallada en formato estructurado"""
-    timestamp = datetime.now().strftime("%H:%M:%S")
-    global terminal_rain_count
+    global _rain_terminal_head
 
-    print("=" * 120)
-    print(" " * 40 + "SISTEMA DE ADQUISICION DE DATOS SOLAR")
-    print("=" * 120)
-    print(f"[{timestamp}] === MEDICION PRINCIPAL ===")
-
-    # === SENSORES INA228 ===
-    print("\n--- SENSORES INA228 ---")
-    for addr in INA228_ADDRESSES:
-        name = f"INA0x{addr:02X}"
-        ina_data = read_ina228(addr, name)
-        if ina_data:
-            v = ina_data["voltage"]
-            i = ina_data["current"]
-            p = ina_data["power"]
-            e = ina_data["energy"] / 3600.0  # Convertir a Wh
-            print(f"{name} -> V={v:.2f} V | I={i:.2f} A | P={p:.2f} W | E={e:.2f} Wh")
-        else:
-            print(f"{name} -> ERROR EN LECTURA")
+    if timestamp is None:
+        timestamp = datetime.now().strftime("%H:%M:%S")
+    if values is None:
+        values = collect_detailed_values()
 
-    # === IRRADIANCIA ===
-    print("\n--- IRRADIANCIA ---")
-    # Lectura instantánea de irradiancia
+    # Todo el bloque se arma en memoria y sale con una sola escritura a stdout
+    out = []
     try:
-        irr_voltage, irr_wm2 = read_irradiance()
-        print(f"Irradiancia: {irr_wm2:.2f} W/m2")
-    except Exception as e:
-        print(f"Irradiancia: ERROR - {e}")
+        out.append("=" * 120)
+        out.append(" " * 40 + "SISTEMA DE ADQUISICION DE DATOS SOLAR")
+        out.append("=" * 120)
+        out.append(f"[{timestamp}] === MEDICION PRINCIPAL ===")
+
+        # === SENSORES INA228 ===
+        out.append("\n--- SENSORES INA228 ---")
+        for addr, name in INA228_NAMES:
+            ina_data = values["ina"].get(addr)
+            if ina_data:
+                v = ina_data["voltage"]
+                i = ina_data["current"]
+                p = ina_data["power"]
+                e = ina_data["energy"] / 3600.0  # Convertir a Wh
+                out.append(
+                    f"{name} -> V={v:.2f} V | I={i:.2f} A | P={p:.2f} W | E={e:.2f} Wh"
+                )
+            else:
+                out.append(f"{name} -> ERROR EN LECTURA")
+
+        # === IRRADIANCIA ===
+        out.append("\n--- IRRADIANCIA ---")
+        irr_wm2 = values["irradiance"]
+        if irr_wm2 is not None:
+            out.append(f"Irradiancia: {irr_wm2:.2f} W/m2")
+        else:
+            out.append("Irradiancia: ERROR EN LECTURA")
 
-    # === TERMISTORES (en dos columnas) ===
-    print("\n--- TERMISTORES ---")
-    with data_lock:
-        # Obtener promedios de termistores
+        # === TERMISTORES (en dos columnas) ===
+        out.append("\n--- TERMISTORES ---")
         avg_thermistors = {}
-        for sensor in thermistor_readings.keys():
-            avg_temp = calculate_average(list(thermistor_readings[sensor]))
+        for sensor, avg_temp in values["thermistors"].items():
             if avg_temp is not None and is_valid_temperature(avg_temp):
                 avg_thermistors[sensor] = avg_temp
 
-    # Imprimir en dos columnas (T0-T9 con T10-T19)
-    for i in range(10):
-        left_sensor = f"T{i}"
-        right_sensor = f"T{i+10}"
+        # Imprimir en dos columnas (T0-T9 con T10-T19)
+        for left_sensor, right_sensor in THERMISTOR_PRINT_PAIRS:
+            left_temp = avg_thermistors.get(left_sensor)
+            right_temp = avg_thermistors.get(right_sensor)
 
-        left_temp = avg_thermistors.get(left_sensor)
-        right_temp = avg_thermistors.get(right_sensor)
+            left_str = f"{left_temp:.1f}C" if left_temp is not None else "ERR"
+            right_str = f"{right_temp:.1f}C" if right_temp is not None else "ERR"
 
-        left_str = f"{left_temp:.1f}C" if left_temp is not None else "ERR"
-        right_str = f"{right_temp:.1f}C" if right_temp is not None else "ERR"
+            out.append(
+                f"{left_sensor} | {left_str:<6} || {right_sensor} | {right_str:<6}"
+            )
 
-        print(f"{left_sensor} | {left_str:<6} || {right_sensor} | {right_str:<6}")
+        # === CLIMA ===
+        out.append("\n--- CLIMA ---")
 
-    # === CLIMA ===
-    print("\n--- CLIMA ---")
+        # Dirección del viento
+        wind_angle = values["wind_angle"]
+        if wind_angle is not None:
+            out.append(f"Direccion viento: {wind_angle:.1f}° ({values['wind_dir']})")
+        else:
+            out.append("Direccion viento: SIN LECTURA")
 
-    # Dirección del viento
-    wind_angle, wind_dir = get_wind_direction()
-    if wind_angle is not None:
-        print(f"Direccion viento: {wind_angle:.1f}° ({wind_dir})")
-    else:
-        print("Direccion viento: SIN LECTURA")
+        # Velocidad del viento promedio
+        avg_wind = values["wind_avg"]
+        if avg_wind is not None:
+            out.append(f"Velocidad viento promedio: {avg_wind:.2f} m/s")
+        else:
+            out.append("Velocidad viento promedio: SIN DATOS")
+
+        # Lluvia
+        terminal_rain_count, _rain_terminal_head = rain_pulses.take(_rain_terminal_head)
+        rain_mm_minute = terminal_rain_count * MM_PER_TICK
+        rain_mm_total = rain_count_total * MM_PER_TICK
+        out.append(f"Lluvia acumulada (min): {rain_mm_minute:.2f} mm")
+        out.append(f"Lluvia total (dia): {rain_mm_total:.2f} mm")
+
+        # === DHT22 ===
+        out.append("\n--- DHT22 ---")
+        avg_temp_dht = values["dht_temp"]
+        avg_hum_dht = values["dht_hum"]
+        if avg_temp_dht is not None and avg_hum_dht is not None:
+            out.append(f"Temperatura DHT: {avg_temp_dht:.1f}C")
+            out.append(f"Humedad DHT: {avg_hum_dht:.1f}%")
+        else:
+            out.append("Temperatura DHT: SIN DATOS")
+            out.append("Humedad DHT: SIN DATOS")
 
-    # Velocidad del viento promedio
-    with data_lock:
-        avg_wind = calculate_average(list(wind_speeds_second))
+        # === ESTADO DEL SISTEMA ===
+        out.append("\n--- ESTADO DEL SISTEMA ---")
+        csv_status = "SI" if file_recording_active else "NO"
+        out.append(f"Grabando CSV: {csv_status}")
 
-    if avg_wind is not None:
-        print(f"Velocidad viento promedio: {avg_wind:.2f} m/s")
-    else:
-        print("Velocidad viento promedio: SIN DATOS")
+        out.append("=" * 120)
+    finally:
+        sys.stdout.write("\n".join(out) + "\n")
+        sys.stdout.flush()
 
-    # Lluvia
-    rain_mm_minute = terminal_rain_count * MM_PER_TICK
-    rain_mm_total = rain_count_total * MM_PER_TICK
-    print(f"Lluvia acumulada (min): {rain_mm_minute:.2f} mm")
-    print(f"Lluvia total (dia): {rain_mm_total:.2f} mm")
-    terminal_rain_count = 0
 
-    # === DHT22 ===
-    print("\n--- DHT22 ---")
-    with data_lock:
-        avg_temp_dht = calculate_average(list(dht_temps))
-        avg_hum_dht = calculate_average(list(dht_hums))
+###################################
+# open_csv_file
+# Argumentos: mode (str) - "w" para archivo nuevo, "a" para continuar uno existente
+# Return: file - Archivo diario abierto con buffer
+# Descripcion: Abre current_csv_file una sola vez y lo reutiliza en cada fila
+###################################
+def open_csv_file(mode="a"):
+    global _csv_fp, _csv_path, _csv_pending_rows
 
-    if avg_temp_dht is not None:
-        print(f"Temperatura DHT: {avg_temp_dht:.1f}C")
-        print(f"Humedad DHT: {avg_hum_dht:.1f}%")
-    else:
-        print("Temperatura DHT: SIN DATOS")
-        print("Humedad DHT: SIN DATOS")
+    if _csv_fp is not None and _csv_path == current_csv_file and mode == "a":
+        return _csv_fp
+
+    close_csv_file()
+    _csv_fp = open(
+        current_csv_file,
+        mode,
+        newline="",
+        encoding="utf-8",
+        buffering=CSV_BUFFER_SIZE,
+    )
+    _csv_path = current_csv_file
+    _csv_pending_rows = 0
+    return _csv_fp
 
-    # === ESTADO DEL SISTEMA ===
-    print("\n--- ESTADO DEL SISTEMA ---")
-    csv_status = "SI" if file_recording_active else "NO"
-    print(f"Grabando CSV: {csv_status}")
 
-    print("=" * 120)
+###################################
+# write_csv_row
+# Argumentos: row (list) - Fila de datos ya formateada
+# Return: None
+# Descripcion: Escribe la fila en el buffer con una sola llamada write y lo vacía al SO
+#              cada CSV_FLUSH_ROWS filas
+###################################
+def write_csv_row(row):
+    global _csv_pending_rows
+
+    open_csv_file().write(",".join(row) + CSV_LINE_END)
+    _csv_pending_rows += 1
+    if _csv_pending_rows >= CSV_FLUSH_ROWS:
+        _csv_fp.flush()
+        _csv_pending_rows = 0
+
+
+###################################
+# csv_file_exists
+# Argumentos: Ninguno
+# Return: bool - True si current_csv_file sigue existiendo en disco
+# Descripcion: Si el archivo ya está abierto usa fstat sobre el descriptor (sin
+#              resolver la ruta); un archivo borrado queda con st_nlink == 0
+###################################
+def csv_file_exists():
+    if _csv_fp is not None and _csv_path == current_csv_file:
+        try:
+            return os.fstat(_csv_fp.fileno()).st_nlink > 0
+        except (OSError, ValueError):
+            return False
+    return os.path.exists(current_csv_file)
+
+
+###################################
+# close_csv_file
+# Argumentos: Ninguno
+# Return: None
+# Descripcion: Vacía, sincroniza a disco (fsync) y cierra el CSV abierto
+###################################
+def close_csv_file():
+    global _csv_fp, _csv_path, _csv_pending_rows
+
+    if _csv_fp is None:
+        return
+    try:
+        _csv_fp.flush()
+        os.fsync(_csv_fp.fileno())
+        _csv_fp.close()
+    except Exception as e:
+        print(f"Error cerrando CSV: {e}")
+    _csv_fp = None
+    _csv_path = None
+    _csv_pending_rows = 0
 
 
 ###################################
@@ -1326,41 +1974,14 @@ def create_csv_file(reset_energy=True):
 
     now = datetime.now()
     filename = f"data_{now.strftime('%Y%m%d_%H%M%S')}.csv"
-    mediciones_dir = "/home/pi/Desktop/Mediciones"
-    os.makedirs(mediciones_dir, exist_ok=True)
-    current_csv_file = f"{mediciones_dir}/{filename}"
+    os.makedirs(MEDICIONES_DIR, exist_ok=True)
+    current_csv_file = f"{MEDICIONES_DIR}/{filename}"
 
     try:
-        with open(current_csv_file, "w", newline="", encoding="utf-8") as file:
-            writer = csv.writer(file)
-
-            header = [
-                "V0[V]",
-                "V1[V]",
-                "I0[A]",
-                "I1[A]",
-                "P0[W]",
-                "P1[W]",
-                "E0[Wh]",
-                "E1[Wh]",
-                "Irr[W/m2]",
-            ]
-
-            for i in range(20):
-                header.append(f"T{i}[°C]")
+        csv_fp = open_csv_file("w")
 
-            header.extend(
-                [
-                    "Rain[mm]",
-                    "Wind_Speed[m/s]",
-                    "Wind_Direction",
-                    "DHT_HUM[%]",
-                    "DHT_TEMP[°C]",
-                    "DateTime",
-                ]
-            )
-
-            writer.writerow(header)
+        csv_fp.write(CSV_HEADER_LINE)
+        csv_fp.flush()
 
         # Reset daily counters only if this is a new day
         if reset_energy:
@@ -1388,7 +2009,7 @@ def create_csv_file(reset_energy=True):
 
         file_recording_active = True
         print(f"Archivo creado: {filename}")
-        save_system_state()
+        save_system_state(force=True)
         return True
 
     except Exception as e:
@@ -1398,42 +2019,44 @@ def create_csv_file(reset_energy=True):
 
 ###################################
 # record_measurement
-# Argumentos: Ninguno
+# Argumentos: now (datetime, opcional) - Momento de la medición, por defecto datetime.now()
 # Return: bool - True si medición exitosa, False si falla
 # Descripcion: Función principal que lee todos los sensores y registra datos en CSV
 ###################################
-def record_measurement():
+def record_measurement(now=None):
     """Registra una medición con validación completa de None"""
-    global rain_count
+    global rain_count_total, _rain_record_head
 
-    now = datetime.now()
+    if now is None:
+        now = datetime.now()
+    ts = now.strftime("%H:%M:%S")
 
     # Verificar horario
     if not is_within_operating_hours(now):
-        print(f"[{now.strftime('%H:%M:%S')}] ⏰ Fuera de horario de grabación")
+        print(f"[{ts}] ⏰ Fuera de horario de grabación")
         try:
-            print_detailed_measurement()
+            print_detailed_measurement(ts)
         except Exception as e:
             print(f"Error imprimiendo medición: {e}")
         return True
 
     if not file_recording_active or not current_csv_file:
-        print(f"[{now.strftime('%H:%M:%S')}] ⏸️  Grabación no activa")
+        print(f"[{ts}] ⏸️  Grabación no activa")
         try:
-            print_detailed_measurement()
+            print_detailed_measurement(ts)
         except Exception as e:
             print(f"Error imprimiendo medición: {e}")
         return True
 
     try:
-        print(f"[{now.strftime('%H:%M:%S')}] === MEDICIÓN PRINCIPAL ===")
+        print(f"[{ts}] === MEDICIÓN PRINCIPAL ===")
 
-        # PASO 1: INA228 (I2C diferente, no conflicta con ADS1115)
+        # PASO 1: INA228 en segundo plano, se solapa con las esperas del ADS1115
         print("[MAIN] Leyendo INA228...")
-        ina_data = {}
-        for addr in INA228_ADDRESSES:
-            name = f"INA{addr-0x3F}"
-            ina_data[addr] = read_ina228(addr, name)
+        ina_futures = {
+            addr: _acq_pool.submit(read_ina228, addr, name)
+            for addr, name in INA228_SHORT_NAMES
+        }
 
         # PASO 2: Hardware ADS1115 - UN SOLO MUTEX para toda la operación
         print("[MAIN] Accediendo hardware ADS1115...")
@@ -1447,6 +2070,9 @@ def record_measurement():
 
         print("[MAIN] Hardware ADS1115 completado y liberado")
 
+        # read_ina228 ya aplica su propio timeout
+        ina_data = {addr: future.result() for addr, future in ina_futures.items()}
+
         # PASO 3: Procesar datos sin hardware - CON VALIDACIÓN COMPLETA DE None
         # INA228 datos (sensor 1 = 0x40, sensor 2 = 0x41)
         ina1_validated = validate_ina228_data(ina_data.get(0x40), address=0x40)
@@ -1467,123 +2093,111 @@ def record_measurement():
         if irradiance is None:
             irradiance = 0.0
 
-        # VALIDACIÓN CRÍTICA RAIN_COUNT
-        if rain_count is None:
-            rain_count = 0
-            print("[WARNING] rain_count era None, corregido a 0")
+        # Pulsos de lluvia desde la fila anterior (el total del día se acumula aquí)
+        rain_count, _rain_record_head = rain_pulses.take(_rain_record_head)
+        rain_count_total += rain_count
 
-        # Promedios de datos thread
+        # Promedios de datos thread: bajo el lock solo se copian las ventanas
         with data_lock:
-            avg_temp_dht = calculate_average(list(dht_temps))
-            avg_hum_dht = calculate_average(list(dht_hums))
-            avg_wind = calculate_average(list(wind_speeds_second))
-
-            # Termistores promediados
-            avg_thermistors = {}
-            for sensor in thermistor_readings.keys():
-                avg_thermistors[sensor] = calculate_average(
-                    list(thermistor_readings[sensor])
-                )
+            dht_temp_values = dht_temps.snapshot()
+            dht_hum_values = dht_hums.snapshot()
+            wind_values = wind_speeds_second.snapshot()
+            thermistor_history = snapshot_thermistors()
+
+        avg_temp_dht = RingBuffer.average(dht_temp_values)
+        avg_hum_dht = RingBuffer.average(dht_hum_values)
+        avg_wind = RingBuffer.average(wind_values)
+        avg_thermistors = get_thermistor_averages(thermistor_history)
 
         # Escribir archivo
         if file_recording_active and current_csv_file:
             print("[MAIN] Escribiendo a CSV...")
 
-            if not os.path.exists(current_csv_file):
+            if not csv_file_exists():
                 print("Archivo CSV no existe, creando...")
                 # No resetear energía - archivo desapareció durante operación
                 if not create_csv_file(reset_energy=False):
                     return False
 
-            with open(current_csv_file, "a", newline="", encoding="utf-8") as file:
-                writer = csv.writer(file)
-
-                # Crear fila de datos - TODOS LOS VALORES VALIDADOS
-                row = [
-                    f"{v0:.4f}",
-                    f"{v1:.4f}",
-                    f"{i0:.4f}",
-                    f"{i1:.4f}",
-                    f"{p0:.4f}",
-                    f"{p1:.4f}",
-                    f"{e0:.4f}",
-                    f"{e1:.4f}",
-                    f"{irradiance:.2f}",
-                ]
-
-                # Añadir termistores T0-T19
-                for i in range(20):
-                    sensor_key = f"T{i}"
-                    temp_val = avg_thermistors.get(sensor_key, float("nan"))
-                    if temp_val is None or math.isnan(temp_val):
-                        row.append("N/A")
-                    else:
-                        row.append(f"{temp_val:.2f}")
-
-                # Dirección del viento
-                wind_dir_str = (
-                    f"{wind_angle:.1f}°({wind_dir})"
-                    if wind_angle is not None
-                    else "N/A"
-                )
+            # Crear fila de datos - TODOS LOS VALORES VALIDADOS
+            # INA228 + irradiancia con un solo formateo (9 columnas)
+            row = [
+                CSV_POWER_FMT % (v0, v1, i0, i1, p0, p1, e0, e1, irradiance),
+            ]
 
-                # Lluvia acumulada - VALIDADO
-                rain_mm_minute = rain_count * MM_PER_TICK
-
-                # Añadir resto de datos
-                row.extend(
-                    [
-                        f"{rain_mm_minute:.2f}",
-                        f"{avg_wind:.2f}" if avg_wind is not None else "N/A",
-                        wind_dir_str,
-                        f"{avg_hum_dht:.1f}" if avg_hum_dht is not None else "N/A",
-                        f"{avg_temp_dht:.2f}" if avg_temp_dht is not None else "N/A",
-                        now.strftime("%Y-%m-%d %H:%M:%S"),
-                    ]
-                )
+            # Añadir termistores T0-T19
+            row.extend(format_thermistor_columns(avg_thermistors))
 
-                # Reset rain_count DESPUÉS de usar
-                rain_count = 0
+            # Dirección del viento
+            wind_dir_str = (
+                f"{wind_angle:.1f}°({wind_dir})" if wind_angle is not None else "N/A"
+            )
 
-                writer.writerow(row)
+            # Lluvia acumulada - VALIDADO
+            rain_mm_minute = rain_count * MM_PER_TICK
 
-                # Enviar datos a InfluxDB
-                if influx_initialized:
-                    try:
-                        influx_data = {
-                            "v0": v0,
-                            "v1": v1,
-                            "i0": i0,
-                            "i1": i1,
-                            "p0": p0,
-                            "p1": p1,
-                            "e0": e0,
-                            "e1": e1,
-                            "irradiance": irradiance,
-                            "rain_mm": rain_mm_minute,
-                            "wind_speed": avg_wind,
-                            "wind_direction": wind_angle,
-                            "wind_dir_str": wind_dir,
-                            "dht_temp": avg_temp_dht,
-                            "dht_humidity": avg_hum_dht,
-                        }
-
-                        # Añadir termistores
-                        for i in range(20):
-                            sensor_key = f"T{i}"
-                            temp_val = avg_thermistors.get(sensor_key)
-                            if temp_val is not None and not math.isnan(temp_val):
-                                influx_data[sensor_key] = temp_val
-
-                        send_measurement_to_influx(influx_data)
-                    except Exception as e:
-                        print(f"Error enviando a InfluxDB: {e}")
+            # Añadir resto de datos
+            row.extend(
+                [
+                    f"{rain_mm_minute:.2f}",
+                    f"{avg_wind:.2f}" if avg_wind is not None else "N/A",
+                    wind_dir_str,
+                    f"{avg_hum_dht:.1f}" if avg_hum_dht is not None else "N/A",
+                    f"{avg_temp_dht:.2f}" if avg_temp_dht is not None else "N/A",
+                    f"{now:%Y-%m-%d} {ts}",
+                ]
+            )
 
-        print(f"[{now.strftime('%H:%M:%S')}] ✓ Medición principal completada")
+            write_csv_row(row)
 
-        # Mostrar medición
+            # Encolar datos para el envío por lotes a InfluxDB
+            if influx_initialized:
+                try:
+                    influx_data = {
+                        "v0": v0,
+                        "v1": v1,
+                        "i0": i0,
+                        "i1": i1,
+                        "p0": p0,
+                        "p1": p1,
+                        "e0": e0,
+                        "e1": e1,
+                        "irradiance": irradiance,
+                        "rain_mm": rain_mm_minute,
+                        "wind_speed": avg_wind,
+                        "wind_direction": wind_angle,
+                        "wind_dir_str": wind_dir,
+                        "dht_temp": avg_temp_dht,
+                        "dht_humidity": avg_hum_dht,
+                    }
+
+                    # Añadir termistores
+                    for sensor_key in THERMISTOR_KEYS:
+                        temp_val = avg_thermistors.get(sensor_key)
+                        if temp_val is not None and not math.isnan(temp_val):
+                            influx_data[sensor_key] = temp_val
+
+                    queue_measurement(influx_data)
+                except Exception as e:
+                    print(f"Error encolando datos para InfluxDB: {e}")
+
+        print(f"[{ts}] ✓ Medición principal completada")
+
+        # Mostrar medición con los valores ya leídos (sin segunda pasada por el bus)
         try:
-            print_detailed_measurement()
+            print_detailed_measurement(
+                ts,
+                {
+                    "ina": ina_data,
+                    "irradiance": irradiance,
+                    "thermistors": avg_thermistors,
+                    "wind_angle": wind_angle,
+                    "wind_dir": wind_dir,
+                    "wind_avg": avg_wind,
+                    "dht_temp": avg_temp_dht,
+                    "dht_hum": avg_hum_dht,
+                },
+            )
         except Exception as e:
             print(f"Error imprimiendo medición: {e}")
 
@@ -1614,13 +2228,18 @@ def record_measurement():
 def process_end_of_day():
     global current_csv_file, file_recording_active
 
-    if not current_csv_file or not os.path.exists(current_csv_file):
+    if not current_csv_file or not csv_file_exists():
         return
 
     file_recording_active = False
     print("FIN DEL DÍA - Archivo completado")
 
-    save_system_state()
+    close_csv_file()
+    save_system_state(force=True)
+
+    # Enviar lo que quede del día sin esperar al siguiente lote
+    if influx_initialized and INFLUX_AVAILABLE:
+        flush_influx()
 
     try:
         file_size = os.path.getsize(current_csv_file) / 1024
@@ -1648,18 +2267,22 @@ def is_valid_temperature(temp):
 # measurement_thread
 # Argumentos: Ninguno
 # Return: None
-# Descripcion: Hilo secundario para lectura continua de sensores ambientales
+# Descripcion: Hilo secundario para lectura continua de sensores ambientales.
+#              Anemómetro cada segundo; DHT22 y termistores cada
+#              SLOW_SENSOR_PERIOD segundos, con plazos fijos sobre time.monotonic()
 ###################################
 def measurement_thread():
     global last_watchdog
 
-    dht_counter = 0
-    last_thermistor_read = 0
+    next_tick = time.monotonic()
+    next_slow_read = next_tick
 
     while running:
         try:
-            current_time = time.time()
-            last_watchdog = current_time
+            last_watchdog = time.time()
+
+            # Avisos de lluvia pendientes (el callback no imprime)
+            log_rain_pulses()
 
             if measuring_active:
                 # Wind speed
@@ -1668,27 +2291,39 @@ def measurement_thread():
                     with data_lock:
                         wind_speeds_second.append(wind_speed)
 
-                # Thermistors every 5 seconds
-                if current_time - last_thermistor_read >= 5.0:
-                    temps = read_thermistors()
-                    with data_lock:
-                        for sensor, temp in temps.items():
-                            if is_valid_temperature(temp):
-                                thermistor_readings[sensor].append(temp)
-                    last_thermistor_read = current_time
+            # Fuera de horario solo se atienden los contadores: termistores y DHT22
+            # (I2C, MUX y GPIO) quedan en pausa
+            if (
+                measuring_active
+                and is_within_operating_hours()
+                and time.monotonic() >= next_slow_read
+            ):
+                next_slow_read += SLOW_SENSOR_PERIOD
 
-                # Irradiance reading removed - now only instantaneous during main measurement
+                # DHT22 en paralelo con el barrido de termistores
+                dht_future = _acq_pool.submit(read_dht22)
+
+                temps = read_thermistors()
+                with data_lock:
+                    push_thermistor_temps(temps)
 
-                # DHT22 every 5 seconds
-                if dht_counter % 5 == 0:
-                    temp_dht, hum_dht = read_dht22()
-                    if temp_dht is not None:
-                        with data_lock:
-                            dht_temps.append(temp_dht)
-                            dht_hums.append(hum_dht)
+                # Irradiance reading removed - now only instantaneous during main measurement
 
-            dht_counter += 1
-            time.sleep(1)
+                temp_dht, hum_dht = dht_future.result()
+                if temp_dht is not None:
+                    with data_lock:
+                        dht_temps.append(temp_dht)
+                        dht_hums.append(hum_dht)
+
+            # Dormir hasta el próximo plazo de 1 s: el tiempo de lectura
+            # no se acumula como deriva. Si una iteración se atrasó, se resincroniza
+            next_tick += MEASUREMENT_PERIOD
+            now_mono = time.monotonic()
+            if next_tick <= now_mono:
+                next_tick = now_mono + MEASUREMENT_PERIOD
+            if next_slow_read <= now_mono - SLOW_SENSOR_PERIOD:
+                next_slow_read = now_mono
+            time.sleep(next_tick - now_mono)
 
         except Exception:
             time.sleep(2)
@@ -1723,31 +2358,35 @@ def main():
     measure_thread.daemon = True
     measure_thread.start()
 
-    loop_counter = 0
     consecutive_errors = 0
     last_minute_processed = -1
     last_hour_processed = -1
     last_influx_health_check = time.time()
+    off_hours = False
     INFLUX_HEALTH_CHECK_INTERVAL = 3600  # Chequear cada 1 hora
 
     try:
         print("Sistema iniciado")
 
         now = datetime.now()
+        hhmm = now.strftime("%H:%M")
         if is_within_operating_hours(now):
-            print(f"HORARIO ACTIVO ({now.strftime('%H:%M')})")
+            print(f"HORARIO ACTIVO ({hhmm})")
         else:
-            print(f"Esperando horario activo ({now.strftime('%H:%M')})")
+            print(f"Esperando horario activo ({hhmm})")
 
         time.sleep(5)
 
         while True:
             try:
-                loop_counter += 1
+                # Un solo datetime.now() por iteración y sus derivados
                 now = datetime.now()
                 current_day = now.timetuple().tm_yday
                 current_hour = now.hour
                 current_minute = now.minute
+                ts = now.strftime("%H:%M:%S")
+                within = is_within_operating_hours(now)
+                end_of_day = is_end_of_day(now)
 
                 # Chequeo periódico de salud de InfluxDB (cada hora)
                 current_time = time.time()
@@ -1757,42 +2396,55 @@ def main():
                     and (current_time - last_influx_health_check)
                     >= INFLUX_HEALTH_CHECK_INTERVAL
                 ):
-                    print(
-                        f"[{now.strftime('%H:%M:%S')}] Ejecutando chequeo de salud InfluxDB..."
-                    )
+                    print(f"[{ts}] Ejecutando chequeo de salud InfluxDB...")
                     try:
                         periodic_health_check()
                     except Exception as e:
                         print(f"Error en chequeo de salud InfluxDB: {e}")
                     last_influx_health_check = current_time
 
-                # Check for missing files every 5 minutes
-                if loop_counter % 300 == 0:
-                    loop_status = enhanced_main_loop_check()
+                # Fuera de horario: sin lecturas de hardware ni escrituras a la SD,
+                # se duerme hasta el inicio (el minuto de cierre se procesa abajo)
+                if not within and not end_of_day:
+                    if not off_hours:
+                        off_hours = True
+                        hours_left = seconds_until_operating_start(now) / 3600
+                        print(f"[{ts}] Fuera de horario - pausa ({hours_left:.1f} h)")
+                        if file_recording_active:
+                            process_end_of_day()  # Cierre no procesado
+                        if influx_initialized and INFLUX_AVAILABLE:
+                            flush_influx()  # No dejar puntos en cola durante la noche
+                    time.sleep(seconds_until_next_minute())
+                    continue
+                off_hours = False
+
+                # Check for missing files (the check itself runs every 5 minutes)
+                daily_file_due = is_time_to_create_daily_file(now)
+                if not daily_file_due:
+                    loop_status = enhanced_main_loop_check(now, within)
                     if loop_status == "file_created":
                         consecutive_errors = 0
 
                 # Create daily file at start hour
-                if (
-                    is_time_to_create_daily_file(now)
-                    and current_day != last_file_creation_day
-                ):
+                file_created = False
+                if daily_file_due and current_day != last_file_creation_day:
 
-                    print(f"[{now.strftime('%H:%M:%S')}] Creando archivo diario")
+                    print(f"[{ts}] Creando archivo diario")
                     try:
                         # Nuevo día - resetear energía
                         if create_csv_file(reset_energy=True):
                             last_file_creation_day = current_day
                             last_measurement_minute = -1
                             consecutive_errors = 0
+                            file_created = True
                         else:
                             consecutive_errors += 1
                     except Exception:
                         consecutive_errors += 1
 
                 # End of day at end hour
-                elif is_end_of_day(now):
-                    print(f"[{now.strftime('%H:%M:%S')}] Finalizando día")
+                elif end_of_day:
+                    print(f"[{ts}] Finalizando día")
                     try:
                         process_end_of_day()
                         consecutive_errors = 0
@@ -1809,7 +2461,7 @@ def main():
                         try:
                             last_minute_processed = current_minute
                             measurement_start = time.time()
-                            success = record_measurement()
+                            success = record_measurement(now)
                             measurement_time = time.time() - measurement_start  # noqa: F841
 
                             if success:
@@ -1831,11 +2483,13 @@ def main():
                         pass
                     time.sleep(30)
 
-                # Adaptive sleep
-                if is_within_operating_hours(now):
+                # Sin sondeo a 1 Hz: se duerme hasta el próximo cambio de minuto.
+                # Tras crear el archivo diario se vuelve enseguida para tomar la
+                # medición de ese mismo minuto
+                if file_created:
                     time.sleep(1)
                 else:
-                    time.sleep(5)
+                    time.sleep(seconds_until_next_minute())
 
                 if current_hour != last_hour_processed:
                     last_minute_processed = -1
@@ -1871,6 +2525,9 @@ def main():
             except Exception:
                 pass
 
+        # El CSV puede seguir abierto aunque la grabación ya no esté activa
+        close_csv_file()
+
         if measure_thread and measure_thread.is_alive():
             measure_thread.join(timeout=5)
 
@@ -1891,14 +2548,25 @@ def main():
         except Exception:
             pass
 
+        # Liberar conexión con pigpiod
+        try:
+            if pi is not None:
+                pi.stop()
+        except Exception:
+            pass
+
+        _acq_pool.shutdown(wait=False, cancel_futures=True)
+        _ina_executor.shutdown(wait=False, cancel_futures=True)
+
         try:
             dhtDevice.exit()
         except Exception:
             pass
 
-        # Cerrar InfluxDB
+        # Drenar la cola pendiente y cerrar InfluxDB
         if influx_initialized and INFLUX_AVAILABLE:
             try:
+                stop_influx_flusher()
                 close_influxdb()
             except Exception:
                 pass
@@ -1,13 +1,19 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import atexit
+import math
 import os
+import socket
 import threading
 import time
-from datetime import datetime
+from collections import deque
 
-from influxdb_client import InfluxDBClient, Point, WritePrecision
+from influxdb_client import InfluxDBClient, WritePrecision
 from influxdb_client.client.write_api import SYNCHRONOUS
+from urllib3 import Retry
+
+UDP_DEFAULT_PORT = 8089
 
 # Configuración InfluxDB
 # IMPORTANTE: Configurar variables de entorno o editar estos valores
@@ -17,21 +23,103 @@ INFLUX_CONFIG = {
     "org": os.getenv("INFLUX_ORG", "your-org"),
     "bucket": os.getenv("INFLUX_BUCKET", "your-bucket"),
     "timeout": 10000,  # 10 segundos timeout en milisegundos
+    "enable_gzip": True,  # Comprimir line protocol (nombres de campo muy repetitivos)
+    "pool_maxsize": 4,  # Conexiones keep-alive reutilizadas por el cliente
+    "connect_retries": 3,  # Reintentos de conexión TCP/TLS antes de fallar
+    # "udp" envía line protocol sin handshake ni respuesta a un listener UDP en la
+    # LAN (InfluxDB 1.x [[udp]] o socket_listener de Telegraf); "http" sigue siendo
+    # el camino para servidores remotos con token
+    "transport": os.getenv("INFLUX_TRANSPORT", "http"),
+    "udp_host": os.getenv("INFLUX_UDP_HOST", "127.0.0.1"),
+    # Texto tal cual del entorno; init_udp lo convierte (solo si se usa UDP)
+    "udp_port": os.getenv("INFLUX_UDP_PORT", str(UDP_DEFAULT_PORT)),
+    "udp_payload_size": 1400,  # Bytes por datagrama, por debajo del MTU de Ethernet
 }
 
-# Lock para thread safety
+# Protege solo las extracciones y devoluciones de lotes en la cola;
+# queue_measurement no lo toma
 influx_lock = threading.Lock()
+# Marca un vaciado en curso: flush_influx lo toma sin esperar durante todo su
+# cuerpo (envío HTTP y contadores incluidos) y, si ya está tomado, no hace nada
+_flush_running = threading.Lock()
 
 # Cliente y write_api globales
 influx_client = None
 write_api = None
 
+# Socket del transporte UDP (solo si INFLUX_CONFIG["transport"] == "udp")
+_udp_sock = None
+
+# Envío por lotes en segundo plano: el lazo de medición solo encola líneas y un hilo
+# las drena periódicamente, así ninguna medición espera un round-trip HTTP
+FLUSH_INTERVAL_S = 10  # Segundos entre revisiones del hilo de envío
+FLUSH_MIN_POINTS = 5  # Puntos (minutos) que se juntan antes de una petición
+FLUSH_MAX_DELAY_S = 300  # Tope de espera aunque no se junten FLUSH_MIN_POINTS
+FLUSH_BATCH_SIZE = 1000  # Líneas máximas por petición HTTP
+MAX_PENDING_POINTS = 20000  # Tope del buffer sin conexión (~2 semanas a 1/min)
+
+# Puntos encolados con queue_measurement pendientes de flush_influx. append y
+# popleft de deque son atómicos, y maxlen descarta el más antiguo al llenarse
+pending_points = deque(maxlen=MAX_PENDING_POINTS)
+
+_flush_stop = threading.Event()
+_flush_thread = None
+_last_flush_time = 0.0
+dropped_points = 0  # Puntos descartados por superar MAX_PENDING_POINTS
+# Contadores de envío; se informan en periodic_health_check en vez de imprimir
+# una línea por cada lote
+sent_points = 0
+failed_batches = 0
+
+MEASUREMENT_NAME = "solar_panel_measurement"
+STATIC_TAGS = (("location", "solar_farm"), ("system", "raspberry_pi"))
+
+# Measurement + tags fijos serializados una sola vez (line protocol, tags ordenados)
+LINE_PREFIX = (
+    ",".join([MEASUREMENT_NAME, *(f"{k}={v}" for k, v in sorted(STATIC_TAGS))]) + " "
+)
+
+# Los termistores se envían con la resolución real del sensor (0.001 °C) en vez de
+# los ~17 dígitos de repr: menos bytes por línea y el gzip comprime mejor
+THERMISTOR_FIELD_FMT = "thermistor_%02d_temp"
+THERMISTOR_VALUE_FMT = "%.3f"
+
+# Clave en measurement_data -> nombre de campo en InfluxDB
+FIELD_KEYS = (
+    ("v0", "panel1_voltage"),
+    ("i0", "panel1_current"),
+    ("p0", "panel1_power"),
+    ("e0", "panel1_energy"),
+    ("v1", "panel2_voltage"),
+    ("i1", "panel2_current"),
+    ("p1", "panel2_power"),
+    ("e1", "panel2_energy"),
+    ("irradiance", "irradiance"),
+    *((f"T{i}", THERMISTOR_FIELD_FMT % i) for i in range(20)),
+    ("rain_mm", "rain_accumulation"),
+    ("wind_speed", "wind_speed"),
+    ("wind_direction", "wind_direction"),
+    ("dht_temp", "ambient_temperature"),
+    ("dht_humidity", "ambient_humidity"),
+)
+
+# Clave en measurement_data -> plantilla "campo=valor" ya armada para line protocol
+# (termistores con 3 decimales, el resto con repr), así el lazo solo aplica un %
+LINE_FIELD_FMTS = tuple(
+    (key, f"{field}={THERMISTOR_VALUE_FMT if key[0] == 'T' else '%r'}")
+    for key, field in FIELD_KEYS
+)
+
 # Variables de control para monitoreo de salud
 last_successful_write = None
 consecutive_failures = 0
 connection_init_time = None
+_refresh_deadline = None  # time.monotonic() a partir del cual renovar la conexión
+_last_health_ok = None  # time.monotonic() del último health check exitoso
+HEALTH_CHECK_CACHE_S = 60  # Un health check exitoso vale por este tiempo
 MAX_CONSECUTIVE_FAILURES = 5
 CONNECTION_REFRESH_HOURS = 12  # Renovar conexión cada 12 horas
+RECONNECT_BACKOFF_S = 1  # Segundos antes del 2º intento; luego se duplica
 
 
 ###################################
@@ -41,7 +129,10 @@ CONNECTION_REFRESH_HOURS = 12  # Renovar conexión cada 12 horas
 # Descripcion: Inicializa cliente InfluxDB y API de escritura con timeout y manejo robusto
 ###################################
 def init_influxdb(force_reconnect=False):
-    global influx_client, write_api, consecutive_failures, connection_init_time, last_successful_write
+    global influx_client, write_api, consecutive_failures, last_successful_write
+
+    if use_udp():
+        return init_udp()
 
     # Si force_reconnect, cerrar conexión existente primero
     if force_reconnect and (influx_client is not None or write_api is not None):
@@ -50,7 +141,6 @@ def init_influxdb(force_reconnect=False):
             close_influxdb()
         except Exception as e:
             print(f"Advertencia cerrando conexión previa: {e}")
-        time.sleep(2)  # Esperar a que se liberen recursos
 
     try:
         # Crear cliente con timeout configurado
@@ -59,18 +149,29 @@ def init_influxdb(force_reconnect=False):
             token=INFLUX_CONFIG["token"],
             org=INFLUX_CONFIG["org"],
             timeout=INFLUX_CONFIG["timeout"],
+            enable_gzip=INFLUX_CONFIG["enable_gzip"],
+            connection_pool_maxsize=INFLUX_CONFIG["pool_maxsize"],
+            retries=Retry(
+                total=INFLUX_CONFIG["connect_retries"],
+                connect=INFLUX_CONFIG["connect_retries"],
+                backoff_factor=0.5,
+            ),
         )
 
+        # SYNCHRONOUS a propósito: el lote ya lo arma _flush_loop fuera del lazo de
+        # medición, y flush_influx necesita la excepción para devolver el lote a la
+        # cola en orden (el modo batching del cliente reintenta y descarta solo)
         write_api = influx_client.write_api(write_options=SYNCHRONOUS)
 
         # Test conexión con timeout
         health = influx_client.health()
         if health.status == "pass":
-            connection_init_time = time.time()
+            _start_refresh_timer()
             consecutive_failures = 0
             last_successful_write = time.time()
             print(
-                f"✓ InfluxDB conectado correctamente (timeout: {INFLUX_CONFIG['timeout']}ms)"
+                f"✓ InfluxDB conectado correctamente (timeout: {INFLUX_CONFIG['timeout']}ms, "
+                f"gzip: {'sí' if INFLUX_CONFIG['enable_gzip'] else 'no'})"
             )
             return True
         else:
@@ -92,9 +193,13 @@ def init_influxdb(force_reconnect=False):
 # Descripcion: Cierra conexión InfluxDB de forma segura
 ###################################
 def close_influxdb():
-    global influx_client, write_api
+    global influx_client, write_api, _udp_sock, _last_health_ok
 
+    _last_health_ok = None
     try:
+        if _udp_sock:
+            _udp_sock.close()
+            _udp_sock = None
         if write_api:
             write_api.close()
             write_api = None
@@ -107,21 +212,153 @@ def close_influxdb():
 
 
 ###################################
-# check_connection_health
+# get_client
+# Argumentos: Ninguno
+# Return: InfluxDBClient o None - Cliente compartido, None si no se pudo conectar
+# Descripcion: Devuelve el cliente único del módulo (un solo pool keep-alive),
+#              inicializándolo solo si todavía no existe
+###################################
+def get_client():
+    if influx_client is None or write_api is None:
+        init_influxdb()
+    return influx_client
+
+
+###################################
+# _close_at_exit
+# Argumentos: Ninguno
+# Return: None
+# Descripcion: Al salir hace un solo intento de envío de lo encolado, sin
+#              reconexión (sin red no debe demorar el cierre), y cierra el cliente
+#              compartido si quedó abierto; informa cuántos puntos se pierden
+###################################
+def _close_at_exit():
+    if influx_client is not None or write_api is not None or _udp_sock is not None:
+        if pending_points:
+            try:
+                flush_influx(recover=False, max_batches=1)
+            except Exception as e:
+                print(f"Error drenando cola InfluxDB al salir: {e}")
+            left = len(pending_points)
+            if left:
+                print(f"⚠ {left} puntos sin enviar a InfluxDB al salir")
+        close_influxdb()
+
+
+atexit.register(_close_at_exit)
+
+
+###################################
+# use_udp
+# Argumentos: Ninguno
+# Return: bool - True si el transporte configurado es UDP
+# Descripcion: Indica si los envíos van por datagramas UDP en lugar de HTTP
+###################################
+def use_udp():
+    return INFLUX_CONFIG["transport"] == "udp"
+
+
+###################################
+# parse_udp_port
+# Argumentos: value (str o int) - Puerto configurado (INFLUX_UDP_PORT)
+# Return: int - Puerto válido; UDP_DEFAULT_PORT si el valor no sirve
+# Descripcion: Valida el puerto UDP con aviso en vez de lanzar ValueError
+###################################
+def parse_udp_port(value):
+    try:
+        port = int(value)
+    except (TypeError, ValueError):
+        port = None
+    if port is None or not 0 < port < 65536:
+        print(
+            f"⚠ INFLUX_UDP_PORT inválido ({value!r}), "
+            f"se usa el puerto {UDP_DEFAULT_PORT}"
+        )
+        return UDP_DEFAULT_PORT
+    return port
+
+
+###################################
+# init_udp
 # Argumentos: Ninguno
+# Return: bool - True si el socket quedó creado
+# Descripcion: Crea el socket UDP. No hay health check posible: UDP no tiene respuesta
+###################################
+def init_udp():
+    global _udp_sock, consecutive_failures
+
+    INFLUX_CONFIG["udp_port"] = parse_udp_port(INFLUX_CONFIG["udp_port"])
+    try:
+        if _udp_sock is None:
+            _udp_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        _start_refresh_timer()
+        consecutive_failures = 0
+        print(
+            f"✓ InfluxDB por UDP hacia "
+            f"{INFLUX_CONFIG['udp_host']}:{INFLUX_CONFIG['udp_port']}"
+        )
+        return True
+    except OSError as e:
+        print(f"✗ Error creando socket UDP para InfluxDB: {e}")
+        _udp_sock = None
+        return False
+
+
+###################################
+# send_lines_udp
+# Argumentos: lines (list) - Líneas en line protocol
+# Return: None
+# Descripcion: Agrupa las líneas en datagramas de hasta udp_payload_size bytes
+#              y los envía; lanza OSError si el socket falla
+###################################
+def send_lines_udp(lines):
+    if _udp_sock is None and not init_udp():
+        raise OSError("socket UDP no disponible")
+
+    addr = (INFLUX_CONFIG["udp_host"], INFLUX_CONFIG["udp_port"])
+    max_size = INFLUX_CONFIG["udp_payload_size"]
+    payload = bytearray()
+    for line in lines:
+        data = line.encode() + b"\n"
+        if payload and len(payload) + len(data) > max_size:
+            _udp_sock.sendto(payload, addr)
+            payload = bytearray()
+        payload += data
+    if payload:
+        _udp_sock.sendto(payload, addr)
+
+
+###################################
+# check_connection_health
+# Argumentos: force (bool) - Consultar al servidor aunque haya un resultado reciente
 # Return: bool - True si conexión está saludable, False si no
 # Descripcion: Verifica el estado de salud de la conexión InfluxDB
 ###################################
-def check_connection_health():
+def check_connection_health(force=False):
+    global _last_health_ok
+
     if not influx_client:
         return False
 
+    # Un "pass" reciente se reutiliza: a lo sumo una petición /health por minuto
+    if (
+        not force
+        and _last_health_ok is not None
+        and time.monotonic() - _last_health_ok < HEALTH_CHECK_CACHE_S
+    ):
+        return True
+
     try:
         health = influx_client.health()
-        return health.status == "pass"
     except Exception as e:
         print(f"⚠ Health check falló: {e}")
-        return False
+        health = None
+
+    if health is not None and health.status == "pass":
+        _last_health_ok = time.monotonic()
+        return True
+    _last_health_ok = None
+    return False
 
 
 ###################################
@@ -131,11 +368,49 @@ def check_connection_health():
 # Descripcion: Determina si la conexión debe renovarse por antigüedad
 ###################################
 def needs_connection_refresh():
-    if connection_init_time is None:
-        return True
+    return _refresh_deadline is None or time.monotonic() >= _refresh_deadline
+
 
-    hours_since_init = (time.time() - connection_init_time) / 3600
-    return hours_since_init >= CONNECTION_REFRESH_HOURS
+###################################
+# _start_refresh_timer
+# Argumentos: Ninguno
+# Return: None
+# Descripcion: Registra el inicio de la conexión y fija, en reloj monotónico, el
+#              momento de renovarla (needs_connection_refresh queda en una comparación)
+###################################
+def _start_refresh_timer():
+    global connection_init_time, _refresh_deadline
+
+    connection_init_time = time.time()
+    _refresh_deadline = time.monotonic() + CONNECTION_REFRESH_HOURS * 3600
+
+
+###################################
+# reopen_write_api
+# Argumentos: Ninguno
+# Return: bool - True si el cliente existente sigue sano y se renovó write_api
+# Descripcion: Renueva solo write_api sobre el cliente (y pool keep-alive) actual.
+#              Si no hay cliente o el servidor no responde devuelve False
+###################################
+def reopen_write_api():
+    global write_api, consecutive_failures, last_successful_write
+
+    if influx_client is None or not check_connection_health(force=True):
+        return False
+
+    try:
+        if write_api is not None:
+            write_api.close()
+        write_api = influx_client.write_api(write_options=SYNCHRONOUS)
+    except Exception as e:
+        print(f"✗ Error renovando write_api: {e}")
+        write_api = None
+        return False
+
+    _start_refresh_timer()
+    consecutive_failures = 0
+    last_successful_write = time.time()
+    return True
 
 
 ###################################
@@ -147,170 +422,271 @@ def needs_connection_refresh():
 def auto_recover_connection():
     print("🔧 Intentando recuperar conexión InfluxDB...")
 
-    # Intentar reconexión con 3 intentos
+    # Con el servidor respondiendo basta con un write_api nuevo sobre el mismo pool:
+    # se evitan el handshake TCP/TLS y la espera de una reconexión completa
+    if not use_udp() and reopen_write_api():
+        print("✓ Conexión recuperada reutilizando el cliente existente")
+        return True
+
+    # Intentar reconexión con 3 intentos; espera creciente solo entre intentos
     for attempt in range(3):
+        if attempt:
+            time.sleep(min(RECONNECT_BACKOFF_S * 2 ** (attempt - 1), 5))
         try:
             if init_influxdb(force_reconnect=True):
                 print(f"✓ Conexión recuperada en intento {attempt + 1}")
                 return True
             else:
                 print(f"✗ Intento {attempt + 1} falló")
-                time.sleep(5)  # Esperar entre intentos
         except Exception as e:
             print(f"✗ Error en intento {attempt + 1}: {e}")
-            time.sleep(5)
 
     print("✗ No se pudo recuperar la conexión después de 3 intentos")
     return False
 
 
 ###################################
-# create_measurement_point
+# create_measurement_line
 # Argumentos: measurement_data (dict) - Datos de medición del sistema
-# Return: Point - Objeto Point para InfluxDB
-# Descripcion: Crea punto de datos InfluxDB con todas las mediciones
+# Return: str o None - Línea en line protocol, None si no hay campos válidos
+# Descripcion: Arma la línea sobre el prefijo fijo; solo se formatean los campos
 ###################################
-def create_measurement_point(measurement_data):
-    try:
-        point = Point("solar_panel_measurement").time(
-            datetime.utcnow(), WritePrecision.NS
-        )
-
-        # Datos INA228 - Panel Solar 1
-        if "v0" in measurement_data and measurement_data["v0"] is not None:
-            point.field("panel1_voltage", float(measurement_data["v0"]))
-        if "i0" in measurement_data and measurement_data["i0"] is not None:
-            point.field("panel1_current", float(measurement_data["i0"]))
-        if "p0" in measurement_data and measurement_data["p0"] is not None:
-            point.field("panel1_power", float(measurement_data["p0"]))
-        if "e0" in measurement_data and measurement_data["e0"] is not None:
-            point.field("panel1_energy", float(measurement_data["e0"]))
-
-        # Datos INA228 - Panel Solar 2
-        if "v1" in measurement_data and measurement_data["v1"] is not None:
-            point.field("panel2_voltage", float(measurement_data["v1"]))
-        if "i1" in measurement_data and measurement_data["i1"] is not None:
-            point.field("panel2_current", float(measurement_data["i1"]))
-        if "p1" in measurement_data and measurement_data["p1"] is not None:
-            point.field("panel2_power", float(measurement_data["p1"]))
-        if "e1" in measurement_data and measurement_data["e1"] is not None:
-            point.field("panel2_energy", float(measurement_data["e1"]))
-
-        # Irradiancia
-        if (
-            "irradiance" in measurement_data
-            and measurement_data["irradiance"] is not None
-        ):
-            point.field("irradiance", float(measurement_data["irradiance"]))
-
-        # Termistores T0-T19
-        for i in range(20):
-            temp_key = f"T{i}"
-            if temp_key in measurement_data and measurement_data[temp_key] is not None:
-                try:
-                    temp_val = float(measurement_data[temp_key])
-                    if not (temp_val != temp_val):  # Check for NaN
-                        point.field(f"thermistor_{i:02d}_temp", temp_val)
-                except (ValueError, TypeError):
-                    pass
-
-        # Datos climáticos
-        if "rain_mm" in measurement_data and measurement_data["rain_mm"] is not None:
-            point.field("rain_accumulation", float(measurement_data["rain_mm"]))
-        if (
-            "wind_speed" in measurement_data
-            and measurement_data["wind_speed"] is not None
-        ):
-            point.field("wind_speed", float(measurement_data["wind_speed"]))
-        if (
-            "wind_direction" in measurement_data
-            and measurement_data["wind_direction"] is not None
-        ):
-            point.field("wind_direction", float(measurement_data["wind_direction"]))
-
-        # DHT22
-        if "dht_temp" in measurement_data and measurement_data["dht_temp"] is not None:
-            point.field("ambient_temperature", float(measurement_data["dht_temp"]))
-        if (
-            "dht_humidity" in measurement_data
-            and measurement_data["dht_humidity"] is not None
-        ):
-            point.field("ambient_humidity", float(measurement_data["dht_humidity"]))
-
-        # Tags adicionales
-        point.tag("system", "raspberry_pi")
-        point.tag("location", "solar_farm")
-
-        return point
-
-    except Exception as e:
-        print(f"Error creando punto InfluxDB: {e}")
+def create_measurement_line(measurement_data):
+    fields = []
+    get = measurement_data.get
+    for key, fmt in LINE_FIELD_FMTS:
+        value = get(key)
+        if value is None:
+            continue
+        try:
+            value = float(value)
+        except (ValueError, TypeError):
+            continue
+        if not math.isfinite(value):  # Line protocol no acepta NaN/inf
+            continue
+        fields.append(fmt % value)
+
+    if not fields:
         return None
+    return f"{LINE_PREFIX}{','.join(fields)} {time.time_ns()}"
 
 
 ###################################
 # send_measurement_to_influx
 # Argumentos: measurement_data (dict) - Datos de medición
 # Return: bool - True si envío exitoso, False si falla
-# Descripcion: Envía datos de medición a InfluxDB con recuperación automática
+# Descripcion: Encola la medición y envía en una sola escritura todo lo pendiente,
+#              con recuperación automática tras MAX_CONSECUTIVE_FAILURES fallos
 ###################################
 def send_measurement_to_influx(measurement_data):
-    global consecutive_failures, last_successful_write
-
-    # Verificar si necesitamos refrescar la conexión por antigüedad
-    if needs_connection_refresh():
+    if not use_udp() and needs_connection_refresh():
         print("⏰ Conexión InfluxDB antigua - refrescando preventivamente...")
         auto_recover_connection()
 
-    if not influx_client or not write_api:
+    if not queue_measurement(measurement_data):
+        return False
+
+    if flush_influx():
+        return True
+
+    # Si tenemos muchos fallos consecutivos, intentar recuperar conexión
+    if not use_udp() and consecutive_failures >= MAX_CONSECUTIVE_FAILURES:
+        print(
+            f"⚠ {consecutive_failures} fallos consecutivos - iniciando recuperación automática..."
+        )
+        # Reintentar el envío una vez después de recuperar
+        if auto_recover_connection() and flush_influx():
+            print("✓ Datos enviados exitosamente después de recuperación")
+            return True
+
+    return False
+
+
+###################################
+# queue_measurement
+# Argumentos: measurement_data (dict) - Datos de medición
+# Return: bool - True si el punto quedó encolado, False si no se pudo crear
+# Descripcion: Encola la línea del punto para enviarla junto con otras en flush_influx
+###################################
+def queue_measurement(measurement_data):
+    global dropped_points
+
+    line = create_measurement_line(measurement_data)
+    if line is None:
+        return False
+
+    # Sin conexión por mucho tiempo se descartan los puntos más antiguos
+    if len(pending_points) >= MAX_PENDING_POINTS:
+        dropped_points += 1
+    pending_points.append(line)
+    return True
+
+
+###################################
+# flush_influx
+# Argumentos: recover (bool) - Intentar reconectar si no hay conexión,
+#             max_batches (int, opcional) - Tope de lotes a enviar en esta llamada
+# Return: bool - True si todos los puntos encolados se enviaron, False si falla
+# Descripcion: Envía los puntos encolados en lotes de hasta FLUSH_BATCH_SIZE líneas.
+#              Si otro hilo ya está vaciando la cola devuelve False sin esperar;
+#              queue_measurement nunca espera a ningún envío
+###################################
+def flush_influx(recover=True, max_batches=None):
+    if not pending_points:
+        return True
+    if not _flush_running.acquire(blocking=False):
+        return False
+    try:
+        return _flush_batches(recover, max_batches)
+    finally:
+        _flush_running.release()
+
+
+###################################
+# _flush_batches
+# Argumentos: recover (bool) - Intentar reconectar si no hay conexión,
+#             max_batches (int, opcional) - Tope de lotes a enviar en esta llamada
+# Return: bool - True si todos los puntos encolados se enviaron, False si falla
+# Descripcion: Cuerpo de flush_influx; se ejecuta siempre con _flush_running
+#              tomado, así que los contadores solo los actualiza un hilo a la vez
+###################################
+def _flush_batches(recover, max_batches):
+    global consecutive_failures, last_successful_write, sent_points, failed_batches
+    global dropped_points
+
+    udp = use_udp()
+    if not udp and (not influx_client or not write_api):
+        if not recover:
+            return False
         print("InfluxDB no inicializado - intentando reconectar...")
         if not auto_recover_connection():
             return False
 
-    with influx_lock:
-        try:
-            point = create_measurement_point(measurement_data)
-            if point is None:
-                consecutive_failures += 1
-                return False
-
-            write_api.write(INFLUX_CONFIG["bucket"], INFLUX_CONFIG["org"], point)
-
-            # Actualizar estado de éxito
-            last_successful_write = time.time()
-            consecutive_failures = 0
-            print("✓ Datos enviados a InfluxDB")
-            return True
+    # Configuración y write_api leídos una vez para todos los lotes; además un
+    # close_influxdb concurrente no deja a mitad de lote un write_api en None
+    bucket = INFLUX_CONFIG["bucket"]
+    org = INFLUX_CONFIG["org"]
+    wapi = write_api
+
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        batches += 1
+        with influx_lock:
+            count = min(len(pending_points), FLUSH_BATCH_SIZE)
+            batch = [pending_points.popleft() for _ in range(count)]
+        if not batch:
+            break
 
+        try:
+            if udp:
+                send_lines_udp(batch)
+            else:
+                # Un solo cuerpo ya serializado: el cliente envía bytes tal cual,
+                # sin recorrer ni codificar línea por línea
+                wapi.write(
+                    bucket,
+                    org,
+                    record="\n".join(batch).encode(),
+                    write_precision=WritePrecision.NS,
+                )
         except Exception as e:
+            # Devolver el lote al frente de la cola para reintentarlo en orden. Si
+            # mientras tanto se llenó, se recortan los más antiguos del lote (y se
+            # cuentan): extendleft sobre el deque lleno descartaría los más nuevos
+            with influx_lock:
+                overflow = len(pending_points) + len(batch) - MAX_PENDING_POINTS
+                if overflow > 0:
+                    dropped_points += min(overflow, len(batch))
+                    batch = batch[overflow:]
+                pending_points.extendleft(reversed(batch))
             consecutive_failures += 1
+            failed_batches += 1
             print(
-                f"✗ Error enviando datos a InfluxDB (fallo #{consecutive_failures}): {e}"
+                f"✗ Error enviando lote a InfluxDB (fallo #{consecutive_failures}): {e}"
             )
+            return False
 
-            # Si tenemos muchos fallos consecutivos, intentar recuperar conexión
-            if consecutive_failures >= MAX_CONSECUTIVE_FAILURES:
-                print(
-                    f"⚠ {consecutive_failures} fallos consecutivos - iniciando recuperación automática..."
-                )
-                if auto_recover_connection():
-                    # Reintentar el envío una vez después de recuperar
-                    try:
-                        point = create_measurement_point(measurement_data)
-                        if point:
-                            write_api.write(
-                                INFLUX_CONFIG["bucket"], INFLUX_CONFIG["org"], point
-                            )
-                            last_successful_write = time.time()
-                            consecutive_failures = 0
-                            print(
-                                "✓ Datos enviados exitosamente después de recuperación"
-                            )
-                            return True
-                    except Exception as retry_error:
-                        print(f"✗ Reintento falló: {retry_error}")
+        last_successful_write = time.time()
+        consecutive_failures = 0
+        sent_points += len(batch)
 
-            return False
+    return max_batches is None or not pending_points
+
+
+###################################
+# _flush_loop
+# Argumentos: Ninguno
+# Return: None
+# Descripcion: Hilo de envío: cada FLUSH_INTERVAL_S segundos vacía la cola si ya
+#              juntó FLUSH_MIN_POINTS puntos o si pasaron FLUSH_MAX_DELAY_S desde
+#              el último envío (una petición cada ~5 mediciones, no una por minuto).
+#              Tras MAX_CONSECUTIVE_FAILURES fallos intenta recuperar la conexión
+###################################
+def _flush_loop():
+    global _last_flush_time
+
+    while not _flush_stop.wait(FLUSH_INTERVAL_S):
+        try:
+            pending = len(pending_points)
+            if not pending:
+                continue
+            now = time.time()
+            if (
+                pending >= FLUSH_MIN_POINTS
+                or now - _last_flush_time >= FLUSH_MAX_DELAY_S
+            ):
+                _last_flush_time = now
+                if (
+                    not flush_influx()
+                    and not use_udp()
+                    and consecutive_failures >= MAX_CONSECUTIVE_FAILURES
+                ):
+                    # Un write_api que falla seguido no se arregla reintentando:
+                    # recuperar la conexión (init/reopen reinician el contador)
+                    print(
+                        f"⚠ {consecutive_failures} fallos consecutivos - "
+                        "iniciando recuperación automática..."
+                    )
+                    auto_recover_connection()
+        except Exception as e:
+            print(f"Error en hilo de envío InfluxDB: {e}")
+
+
+###################################
+# start_influx_flusher
+# Argumentos: Ninguno
+# Return: None
+# Descripcion: Arranca (una sola vez) el hilo daemon que envía los lotes encolados
+###################################
+def start_influx_flusher():
+    global _flush_thread
+
+    if _flush_thread is not None and _flush_thread.is_alive():
+        return
+    _flush_stop.clear()
+    _flush_thread = threading.Thread(target=_flush_loop, daemon=True)
+    _flush_thread.start()
+
+
+###################################
+# stop_influx_flusher
+# Argumentos: timeout (float) - Segundos máximos de espera por el hilo
+# Return: bool - True si la cola quedó vacía
+# Descripcion: Detiene el hilo de envío y hace un solo intento de envío de lo que
+#              quede, sin reconexión: sin red el cierre no debe demorarse
+###################################
+def stop_influx_flusher(timeout=5):
+    global _flush_thread
+
+    _flush_stop.set()
+    if _flush_thread is not None:
+        _flush_thread.join(timeout)
+        _flush_thread = None
+    flushed = flush_influx(recover=False, max_batches=1)
+    left = len(pending_points)
+    if left:
+        print(f"⚠ {left} puntos sin enviar a InfluxDB al detener el envío")
+    return flushed and not left
 
 
 ###################################
@@ -323,6 +699,10 @@ def get_connection_stats():
     stats = {
         "is_connected": influx_client is not None and write_api is not None,
         "consecutive_failures": consecutive_failures,
+        "pending_points": len(pending_points),
+        "dropped_points": dropped_points,
+        "sent_points": sent_points,
+        "failed_batches": failed_batches,
         "last_successful_write": last_successful_write,
         "connection_init_time": connection_init_time,
         "connection_age_hours": None,
@@ -343,6 +723,10 @@ def get_connection_stats():
 def periodic_health_check():
     global consecutive_failures
 
+    # UDP no tiene respuesta del servidor: solo se puede verificar el socket local
+    if use_udp():
+        return _udp_sock is not None or init_udp()
+
     # Verificar si la conexión está inicializada
     if not influx_client or not write_api:
         print("⚠ Chequeo periódico: InfluxDB no inicializado")
@@ -362,7 +746,9 @@ def periodic_health_check():
     # Todo bien
     stats = get_connection_stats()
     print(
-        f"✓ Chequeo periódico InfluxDB: OK (edad: {stats['connection_age_hours']:.1f}h, fallos: {consecutive_failures})"
+        f"✓ Chequeo periódico InfluxDB: OK (edad: {stats['connection_age_hours']:.1f}h, fallos: {consecutive_failures}, "
+        f"enviados: {stats['sent_points']}, lotes fallidos: {stats['failed_batches']}, "
+        f"en cola: {stats['pending_points']}, descartados: {stats['dropped_points']})"
     )
     return True
 
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Prueba de main() de InfluxService/upload_csv_to_influx.py con un cliente simulado.
+
+Uso: python -m unittest discover -s tests
+"""
+
+import importlib
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+INFLUX_SERVICE_DIR = Path(__file__).resolve().parent.parent / "InfluxService"
+
+CSV_CONTENT = (
+    "DateTime,V0[V],I0[A],T0[°C],Wind_Direction\r\n"
+    "2025-01-15 08:00:00,12.50,1.20,25.50,45.0°(NE)\r\n"
+    "2025-01-15 09:30:00,12.60,1.30,26.00,N/A\r\n"
+    "2025-01-15 18:00:00,12.70,1.40,27.00,N/A\r\n"
+)
+
+
+###################################
+# load_uploader
+# Argumentos: Ninguno
+# Return: module - upload_csv_to_influx importado
+# Descripcion: Importa el script; si influxdb-client no está instalado se sustituye por
+#              módulos simulados (la prueba reemplaza InfluxDBClient de todos modos)
+###################################
+def load_uploader():
+    sys.path.insert(0, str(INFLUX_SERVICE_DIR))
+    try:
+        try:
+            import influxdb_client  # noqa: F401
+        except ImportError:
+            fake = mock.MagicMock()
+            with mock.patch.dict(
+                sys.modules,
+                {
+                    "influxdb_client": fake,
+                    "influxdb_client.client": fake.client,
+                    "influxdb_client.client.write_api": fake.client.write_api,
+                },
+            ):
+                return importlib.import_module("upload_csv_to_influx")
+        return importlib.import_module("upload_csv_to_influx")
+    finally:
+        sys.path.remove(str(INFLUX_SERVICE_DIR))
+
+
+class UploadMainTest(unittest.TestCase):
+    def setUp(self):
+        self.uploader = load_uploader()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        csv_dir = Path(self.tmp.name) / self.uploader.CSV_FOLDER
+        csv_dir.mkdir()
+        (csv_dir / "data_20250115_050000.csv").write_text(CSV_CONTENT, encoding="utf-8")
+
+        cwd = os.getcwd()
+        os.chdir(self.tmp.name)
+        self.addCleanup(os.chdir, cwd)
+
+    def test_main_uploads_selected_file_in_range(self):
+        client = mock.MagicMock()
+        client.health.return_value.status = "pass"
+        client_cls = mock.MagicMock()
+        client_cls.return_value.__enter__.return_value = client
+        answers = iter(["1", "07:00", "10:00", "si"])
+
+        with (
+            mock.patch.object(self.uploader, "InfluxDBClient", client_cls),
+            mock.patch("builtins.input", lambda _prompt="": next(answers)),
+            mock.patch.object(sys, "argv", ["upload_csv_to_influx.py"]),
+        ):
+            self.uploader.main()  # Un error en la subida termina con sys.exit(1)
+
+        write_api = client.write_api.return_value
+        self.assertEqual(write_api.write.call_count, 1)
+        lines = write_api.write.call_args.kwargs["record"]
+        self.assertEqual(len(lines), 2)  # La fila de las 18:00 queda fuera del rango
+        self.assertTrue(lines[0].startswith("solar_panel_measurement,"))
+        self.assertIn("panel1_voltage=12.5", lines[0])
+        write_api.close.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()